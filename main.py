@@ -1,23 +1,171 @@
 import argparse
-from src.configLoader import load_config
-from src.CemantixSolver import CemantixSolver
-from src.initialFiltering import filter_model_from_config
-from src.generateStatsGraph import create_graph_stats
+import importlib
+import sys
+from src.configLoader import apply_overrides, load_config
+
+# Modules imported by each command. They are only imported when the command runs, so a
+# command does not pay for the dependencies of the others (see import-budget).
+COMMAND_MODULES = {
+    "solve": ["src.CemantixSolver", "src.solverDaemon", "src.batchSolver"],
+    "init": ["src.initialFiltering"],
+    "generate-stat-graph": ["src.generateStatsGraph"],
+    "compact": ["src.modelTombstones"],
+    "bench": ["src.benchmark"],
+    "microbench": ["src.microBenchmark"],
+    "precision-report": ["src.quantizedVectors"],
+    "serve": ["src.solverDaemon"],
+    "import-budget": ["src.importBudget"]
+}
+
+
+def import_command(command):
+    """
+    Import the modules of a command.
+
+    :param str command: The command name.
+    :returns: The imported modules.
+    :rtype: list
+    """
+    return [importlib.import_module(name) for name in COMMAND_MODULES[command]]
+
+
+def run_solve(cfg, args):
+    from src.CemantixSolver import CemantixSolver
+    from src.solverDaemon import request_solve
+    from src.batchSolver import parse_days, solve_days
+
+    if args.days:
+        solve_days(cfg, parse_days(args.days), args.workers)
+    elif args.daemon:
+        print(request_solve(cfg, args.day))
+    else:
+        solver = CemantixSolver(cfg)
+        if args.profile:
+            import cProfile
+            profiler = cProfile.Profile()
+            profiler.runcall(solver.solve, day=args.day)
+            profiler.dump_stats(args.profile)
+        else:
+            solver.solve(day=args.day)
+
+
+def run_init(cfg, args):
+    from src.initialFiltering import filter_model_from_config
+    filter_model_from_config(cfg)
+
+
+def run_generate_stat_graph(cfg, args):
+    from src.generateStatsGraph import create_graph_stats
+    create_graph_stats(cfg, force=args.force)
+
+
+def run_compact(cfg, args):
+    from src.modelTombstones import compact_model_from_config
+    compact_model_from_config(cfg)
+
+
+def run_bench(cfg, args):
+    from src.benchmark import compare_seed_strategies, run_benchmark
+    bench = compare_seed_strategies if args.compare_seeds else run_benchmark
+    bench(cfg, count=args.count, seed=args.seed, latency=args.latency,
+          error_rate=args.error_rate, invalid_rate=args.invalid_rate,
+          hidden_words_path=args.hidden_words, simulator_model_path=args.simulator_model,
+          output_path=args.output)
+
+
+def run_microbench(cfg, args):
+    from src.microBenchmark import run_microbenchmarks
+    results = run_microbenchmarks(cfg, words=args.words, dims=args.dims, repeat=args.repeat, seed=args.seed,
+                                  only=args.only, baseline_path=args.baseline, tolerance=args.tolerance,
+                                  output_path=args.output)
+    if results.get("regressions"):
+        sys.exit(1)
+
+
+def run_precision_report(cfg, args):
+    from src.quantizedVectors import run_recall_report
+    run_recall_report(cfg, sample=args.sample, seed=args.seed, output_path=args.output)
+
+
+def run_serve(cfg, args):
+    import signal
+    from src.solverDaemon import SolverDaemon
+
+    daemon = SolverDaemon(cfg)
+    signal.signal(signal.SIGTERM, lambda signum, frame: daemon.stop())
+    try:
+        daemon.run()
+    except KeyboardInterrupt:
+        daemon.stop()
+
+
+def run_import_budget(cfg, args):
+    from src.importBudget import check_import_budgets
+    if not check_import_budgets(cfg, list(COMMAND_MODULES), runs=args.runs, output_path=args.output):
+        sys.exit(1)
+
+
+COMMANDS = {
+    "solve": run_solve,
+    "init": run_init,
+    "generate-stat-graph": run_generate_stat_graph,
+    "compact": run_compact,
+    "bench": run_bench,
+    "microbench": run_microbench,
+    "precision-report": run_precision_report,
+    "serve": run_serve,
+    "import-budget": run_import_budget
+}
+
 
 def main():
     parser = argparse.ArgumentParser(description="Cemantix solver and model initializer")
-    parser.add_argument("command", choices=["solve", "init", "generate-stat-graph"], help="Command to run: solve, generate-stat-graph or init")
+    parser.add_argument("command", choices=list(COMMANDS), help=f"Command to run: {', '.join(COMMANDS)}")
+    parser.add_argument("--set", action="append", default=[], metavar="KEY=VALUE", help="Override a configuration value (can be repeated)")
+
+    solve = parser.add_argument_group("solve options")
+    solve.add_argument("--day", type=int, default=None, help="Puzzle number to solve (default: the current puzzle)")
+    solve.add_argument("--daemon", action="store_true", help="Ask the running solver daemon (see serve) to solve instead")
+    solve.add_argument("--profile", default=None, metavar="PATH", help="Profile the solve with cProfile and dump the stats to PATH")
+    solve.add_argument("--days", default=None, metavar="A-B", help="Puzzle numbers to solve in parallel, e.g. 1200-1284 or 1200,1210-1212")
+    solve.add_argument("--workers", type=int, default=1, help="Number of worker processes solving the --days puzzles")
+
+    graphs = parser.add_argument_group("generate-stat-graph options")
+    graphs.add_argument("--force", action="store_true", help="Redraw the graphs even if no statistics were saved since the last drawing")
+
+    bench = parser.add_argument_group("bench options")
+    bench.add_argument("--count", type=int, default=20, help="Number of simulated puzzles to solve")
+    bench.add_argument("--seed", type=int, default=0, help="Seed used to pick hidden words and inject failures")
+    bench.add_argument("--latency", type=float, default=0.0, help="Mean latency (sec) of the simulated API")
+    bench.add_argument("--error-rate", type=float, default=0.0, help="Probability of a simulated server error")
+    bench.add_argument("--invalid-rate", type=float, default=0.0, help="Share of the vocabulary refused as unknown words")
+    bench.add_argument("--hidden-words", default=None, help="File with the candidate hidden words, one per line")
+    bench.add_argument("--simulator-model", default=None, help="Word2vec binary used by the simulator to score guesses")
+    bench.add_argument("--compare-seeds", action="store_true", help="Benchmark every seed strategy on the same puzzles and compare them")
+    bench.add_argument("--output", default=None, help="JSON file to write the benchmark (or micro-benchmark, precision report, import budget) results to")
+
+    microbench = parser.add_argument_group("microbench options")
+    microbench.add_argument("--words", type=int, default=100000, help="Number of words of the synthetic model")
+    microbench.add_argument("--dims", type=int, default=300, help="Dimension of the synthetic vectors")
+    microbench.add_argument("--repeat", type=int, default=5, help="Number of measures of each micro-benchmark")
+    microbench.add_argument("--only", action="append", default=None, metavar="NAME", help="Only run this micro-benchmark (can be repeated)")
+    microbench.add_argument("--baseline", default=None, help="JSON results of a previous run to compare with, exits with an error if slower")
+    microbench.add_argument("--tolerance", type=float, default=0.2, help="Accepted slowdown compared with the baseline (0.2 = 20%%)")
+
+    report = parser.add_argument_group("precision-report options")
+    report.add_argument("--sample", type=int, default=1000, help="Number of words whose neighbours are compared")
+
+    budget = parser.add_argument_group("import-budget options")
+    budget.add_argument("--runs", type=int, default=5, help="Number of cold starts measured for each command, the fastest is kept")
     args = parser.parse_args()
 
     cfg = load_config()
+    if args.command == "bench":
+        # Against the local simulator, requests are not rate limited unless asked with --set
+        cfg.update(rate_limit=0.0, api_delay=0.01)
+    apply_overrides(cfg, args.set)
 
-    if args.command == "init":
-        filter_model_from_config(cfg)
-    elif args.command == "solve":
-        solver = CemantixSolver(cfg)
-        result = solver.solve()
-    elif args.command == "generate-stat-graph":
-        create_graph_stats(cfg)
+    COMMANDS[args.command](cfg, args)
 
 
 if __name__ == "__main__":
@@ -7,6 +7,11 @@ set -e
 cd "$(dirname "$0")"
 word=$(.venv/bin/python main.py solve)
 
-git add src/resources/frWac.bin src/resources/invalid_words.pkl src/resources/stats.csv
+# The tombstones, invalid words and statistics files only exist once a solve has written to them
+for file in src/resources/frWac.bin src/resources/frWac.tombstones src/resources/invalid_words.txt src/resources/stats.sqlite3; do
+    if [ -e "$file" ]; then
+        git add "$file"
+    fi
+done
 git commit -m "Daily dictionary update"
 git push
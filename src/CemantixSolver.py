@@ -2,85 +2,112 @@
 # @file CemantixSolver.py
 # @brief Contains the CemantixSolver class to solve the Cemantix word puzzle game.
 #
-# This module implements an automatic solver using a Word2Vec model and a beam search
-# strategy to guess the hidden word by interacting with the Cemantix API.
+# This module implements an automatic solver using a Word2Vec model and a search
+# strategy (see searchStrategies) to guess the hidden word by interacting with the Cemantix API.
 
+import asyncio
 import logging
 import time
-import re
-import heapq
-import requests
-import pickle
-from requests.structures import CaseInsensitiveDict
-from gensim.models import KeyedVectors
-import logging
 from src.configLoader import setup_logging
+from src.modelCache import load_model, model_signature
+from src.neighborTable import load_neighbor_table
+from src.quantizedVectors import build_quantized_vectors, load_quantized_vectors
+from src.modelTombstones import append_tombstones, compact_model, load_tombstones, removed_mask
+from src.vectorIndex import VectorIndex
+from src.searchStrategies import make_strategy
+from src.seedWords import build_seed_clusters, choose_seed_words, load_seed_clusters
+from src.scoringEngine import ScoringEngine
+from src.cemantixClient import CemantixClient
+from src.scoreJournal import ScoreJournal
+from src.statsStore import StatsStore
+from src.invalidWordStore import InvalidWordStore
+from src.notifier import Notifier
 import os
 import time
+import numpy as np
 from dotenv import load_dotenv
-import csv
 from datetime import datetime
 
+# Ways to choose the start words: the configured list, or one word per cluster of the model (see seedWords)
+SEED_STRATEGIES = ("fixed", "clusters")
+
+# Number of failed requests (after the client retries) after which a word is no longer guessed
+MAX_GUESS_FAILURES = 2
+
+# Number of rounds in a row without any answer of the API after which the search is stopped
+MAX_FAILED_ROUNDS = 3
+
 class CemantixSolver:
     """
     Automatic solver for the Cemantix word game.
 
-    This solver uses a Word2Vec model and a beam search strategy
-    to guess the hidden word by querying the Cemantix API for similarity scores.
+    This solver uses a Word2Vec model and a search strategy (beam search by default,
+    see searchStrategies) to guess the hidden word by querying the Cemantix API for similarity scores.
     """
 
-    def __init__(self, config):
+    def __init__(self, config, notify=True, read_only=False):
         """
         Initialize the solver with the provided configuration.
 
         :param dict config: Dictionary containing configuration keys (see configLoader).
+        :param bool notify: Whether to send a ntfy notification when a puzzle is solved.
+        :param bool read_only: Whether to open the invalid words store read-only, e.g. in batch workers.
+            Such a solver can only solve with ``filter_model=False``.
         """
+        self.config = config
+        self.notify = notify
         load_dotenv()
         setup_logging(config["log_level"], config["log_file"])
         self.logger = logging.getLogger(__name__)
 
-        if not(os.getenv("NTFY_URL") and os.getenv("NTFY_SUBJECT")):
+        self.notifier = None
+        if notify and not(os.getenv("NTFY_URL") and os.getenv("NTFY_SUBJECT")):
             self.logger.warn("No NTFY config found")
+        elif notify:
+            self.notifier = Notifier(os.getenv("NTFY_URL"), os.getenv("NTFY_SUBJECT"), os.getenv("NTFY_TOKEN"),
+                                     config["max_retries"], config["api_delay"], config["http_timeout"])
 
-        self.invalid_words_file = config["invalid_dict_path"]
-        self.invalid_words = self.__load_invalid_words()
+        self.invalid_words = InvalidWordStore(config["invalid_dict_path"], config["legacy_invalid_dict_path"], read_only)
         self.daily_invalid_words = set()  # Temporary invalid words for this solving session
 
+        self.strategy = config["strategy"]
         self.start_words = config["start_words"]
+        self.seed_strategy = config["seed_strategy"]
+        self.seed_count = config["seed_count"]
+        self.seed_random_state = config["seed_random_state"]
+        if self.seed_strategy not in SEED_STRATEGIES:
+            raise ValueError(f"Unknown seed strategy '{self.seed_strategy}'. "
+                             f"Available seed strategies: {', '.join(SEED_STRATEGIES)}")
         self.beam_size = config["beam_size"]
         self.topn = config["topn"]
         self.api_delay = config["api_delay"]
+        self.rate_burst = config["rate_burst"]
         self.model_path = config["model_path"]
-        self.schema = config["schema"]
-        self.url = config["url"]
-        self.user_agent = config["user_agent"]
-        self.content_type = config["content_type"]
-        self.max_retries = config["max_retries"]
-
-        self.headers = CaseInsensitiveDict({
-            "Content-Type": self.content_type,
-            "Host": self.url,
-            "Origin": f"{self.schema}://{self.url}",
-            "referrer": f"{self.schema}://{self.url}/",
-            "User-Agent": self.user_agent
-        })
-        self.similar_cache = {}
-        self.stats_file = config["stats_file"]
-        if self.stats_file is None:
+        self.model_cache_path = config["model_cache_path"]
+        self.vector_precision = config.get("vector_precision", "float32")
+        self.tombstones_path = config["tombstones_path"]
+        self.compaction_threshold = config["compaction_threshold"]
+        self.client = CemantixClient(config)
+        self.journal = ScoreJournal(config["score_journal_path"]) if config["score_journal_path"] else None
+        self.timings = {}  # Duration of each phase of the last solve, in seconds
+        self.index = None  # Indexed model kept warm between solves
+        self.index_source = None  # Signature of the model binary the index was loaded from
+        self.last_stats = None  # Statistics of the last solve
+        self.stats = StatsStore(config["stats_file"], config["legacy_stats_file"]) if config["stats_file"] else None
+        if self.stats is None:
             self.logger.warn("No statistics file given, statistics will not be saved")
 
 
     def __record_stats(self, puzzle_number, word, score, exec_time):
         """
-        Record solving statistics into a CSV file.
+        Record solving statistics into the statistics store.
+
+        A puzzle is logged once per search strategy. The row is also kept in ``last_stats``.
 
         :param int puzzle_number: The puzzle number solved.
         :param str word: The word that solved the puzzle.
         :param float exec_time: Total time taken to solve the puzzle.
         """
-        if not self.stats_file:
-            return
-
         stats_row = {
             "timestamp": datetime.now().isoformat(),
             "puzzle_number": puzzle_number,
@@ -89,59 +116,22 @@ class CemantixSolver:
             "solving_time": round(exec_time, 2),
             "requests_count": self.request_count,
             "api_delay": self.api_delay,
-            "invalid_word_removed_count": len(self.daily_invalid_words)
+            "invalid_word_removed_count": len(self.daily_invalid_words),
+            "strategy": self.strategy,
+            **{name: round(value, 4) for name, value in self.timings.items()}
         }
-
-        file_exists = os.path.isfile(self.stats_file)
-        already_logged = False
-
-        if file_exists:
-            try:
-                with open(self.stats_file, newline='', encoding='utf-8') as csvfile:
-                    reader = csv.DictReader(csvfile)
-                    already_logged = any(row.get('puzzle_number') == str(puzzle_number) for row in reader)
-            except Exception as e:
-                self.logger.warning("Failed to read stats file: %s", e)
-
-        if already_logged:
-            self.logger.info("Puzzle #%d already logged in stats file → skipping", puzzle_number)
+        self.last_stats = stats_row
+        if not self.stats:
             return
 
         try:
-            with open(self.stats_file, 'a', newline='', encoding='utf-8') as csvfile:
-                fieldnames = list(stats_row.keys())
-                writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-
-                if not file_exists:
-                    self.logger.info("Stats file doesn't exist — creating it with headers.")
-                    writer.writeheader()
-
-                writer.writerow(stats_row)
-
-            self.logger.info("Statistics saved for puzzle #%d: %s", puzzle_number, stats_row)
+            if self.stats.record(stats_row):
+                self.logger.info("Statistics saved for puzzle #%d: %s", puzzle_number, stats_row)
+            else:
+                self.logger.info("Puzzle #%d already logged in statistics for strategy '%s' → skipping", puzzle_number, self.strategy)
         except Exception as e:
             self.logger.error("Failed to write statistics: %s", e)
 
-    def __load_invalid_words(self):
-        """
-        Load the set of invalid words from the pickle file.
-
-        :returns: A set of invalid words if the file exists, otherwise an empty set.
-        :rtype: set
-        """
-        try:
-            with open(self.invalid_words_file, "rb") as f:
-                return pickle.load(f)
-        except (FileNotFoundError, EOFError):
-            return set()
-
-    def __save_invalid_words(self):
-        """
-        Save the current global invalid word list to the pickle file.
-        """
-        with open(self.invalid_words_file, "wb") as f:
-            pickle.dump(self.invalid_words, f)
-
     def __mark_invalid(self, word):
         """
         Mark a word as invalid for the current solving session only.
@@ -158,13 +148,10 @@ class CemantixSolver:
         :rtype: int or None
         """
         self.logger.info("Getting puzzle number")
-        resp = requests.get(f"{self.schema}://{self.url}", headers=self.headers, timeout=30)
-        if resp.status_code == 200:
-            match = re.search(r'data-puzzle-number="(\d+)"', resp.text)
-            if match:
-                puzzle_number = int(match.group(1))
-                self.logger.info("Puzzle number: %d", puzzle_number)
-                return puzzle_number
+        puzzle_number = self.client.get_puzzle_number()
+        if puzzle_number is not None:
+            self.logger.info("Puzzle number: %d", puzzle_number)
+            return puzzle_number
         self.logger.error("No puzzle number found")
         return None
 
@@ -178,161 +165,335 @@ class CemantixSolver:
         :returns: The similarity score (float between 0.0 and 1.0), or None if the request failed or word is invalid.
         :rtype: float or None
         """
-        for attempt in range(self.max_retries):
-            try:
-                url = f"{self.schema}://{self.url}/score?n={day}"
-                resp = requests.post(url, headers=self.headers, data=f"word={word}".encode("utf-8"), timeout=30)
-                resp_json = resp.json()
-                if resp.status_code != 200:
-                    return None
-                if 'e' in resp_json:
-                    self.logger.warning("Word '%s' error: %s", word, resp_json['e'])
-                    self.__mark_invalid(word)
-                    return None
-                return resp_json['s']
-            except Exception as e:
-                self.logger.warning("Error fetching score for '%s': %s (retry %d/%d)", word, e, attempt+1, self.max_retries)
-                time.sleep(self.api_delay)
-        return None
+        resp_json = self.client.get_score(word, day)
+        if resp_json is None:
+            return None
+        if 'e' in resp_json:
+            self.logger.warning("Word '%s' error: %s", word, resp_json['e'])
+            self.__mark_invalid(word)
+            return None
+        return resp_json['s']
 
     def __log_and_notify(self, word, score, exec_time):
         """
-        Send a notification when the solution is found.
+        Log the result and queue a notification, sent in the background (see notifier).
 
         :param str word: The found word (the solution).
         :param float exec_time: Execution time in seconds.
         """
         msg = f"Mot trouvé: {word} (score : {score}), Requêtes: {self.request_count}, Temps: {exec_time:.2f} sec"
         self.logger.info("Résultat final → %s", msg)
-        token = os.getenv("NTFY_TOKEN")
-        subject = os.getenv("NTFY_SUBJECT")
-        ntfy_url = os.getenv("NTFY_URL")
-        if  subject and ntfy_url:
-            os.system(f'ntfy publish --token {token} {ntfy_url}/{subject} "{msg}"')
+        if self.notifier is not None:
+            self.notifier.send(msg)
 
-    def __filter_dictionnary(self, model):
+    def __filter_dictionnary(self, index, words):
         """
-        Filter the Word2Vec model by removing both global and session invalid words.
+        Remove invalid words from the Word2Vec model.
 
-        This also saves the merged invalid word list back to disk to allow future re-filtering.
+        This also appends the invalid words to the invalid word store to allow future
+        re-filtering. The removed words are appended to the tombstone sidecar applied at load time, and the
+        model binary is only rewritten when the sidecar reaches the compaction threshold.
 
-        :param KeyedVectors model: The original Word2Vec model to filter.
+        :param VectorIndex index: The indexed Word2Vec model to filter.
+        :param set words: The invalid words.
         """
         self.logger.info("Filtering model using invalid words")
 
-        # Combine all invalid words (persistent + session)
-        all_invalid = self.invalid_words.union(self.daily_invalid_words)
+        # Persist the invalid words for future use
+        newly_added = self.invalid_words.add(words)
+        self.logger.info("Persisted %d new invalid words to global dictionary (%d in total)", newly_added, len(self.invalid_words))
+
+        removed = [word for word in words if word in index]
+        if not self.tombstones_path:
+            compact_model(self.model_path, self.model_cache_path, None, removed)
+            return
+
+        append_tombstones(self.tombstones_path, removed)
+        tombstone_count = int(index.removed.sum()) + len(removed)
+        self.logger.info("Added %d words to tombstones (%d pending)", len(removed), tombstone_count)
+        if tombstone_count >= self.compaction_threshold:
+            self.logger.info("Compaction threshold reached (%d words)", self.compaction_threshold)
+            compact_model(self.model_path, self.model_cache_path, self.tombstones_path)
+
+    def __choose_start_words(self, index, day, excluded):
+        """
+        Choose the start words of a puzzle.
+
+        With the "clusters" seed strategy, one word is taken from each cluster of the model, building
+        the clusters if they are missing. The configured start words are used otherwise, or if no
+        cluster word can be guessed.
+
+        :param VectorIndex index: The indexed Word2Vec model.
+        :param int day: The puzzle number, mixed with the random state when seeds are randomized.
+        :param numpy.ndarray excluded: Mask of the vocabulary words that must not be guessed.
+        :returns: The start words.
+        :rtype: list
+        """
+        if self.seed_strategy == "fixed":
+            return self.start_words
+        if not self.model_cache_path:
+            self.logger.warning("Seed clusters need a model cache, using the configured start words")
+            return self.start_words
+
+        clusters = load_seed_clusters(self.model_cache_path, self.seed_count)
+        if clusters is None:
+            self.logger.warning("Seed clusters are missing or stale, rebuilding them")
+            clusters = build_seed_clusters(index.model, self.model_cache_path, self.seed_count)
+
+        def usable(word):
+            idx = index.key_to_index.get(word)
+            return idx is not None and not excluded[idx]
+
+        rng = np.random.default_rng([self.seed_random_state, day]) if self.seed_random_state else None
+        seeds = choose_seed_words(clusters, usable, rng)
+        if not seeds:
+            self.logger.warning("No seed cluster word can be guessed, using the configured start words")
+            return self.start_words
+        self.logger.info("Start words: %s", ", ".join(seeds))
+        return seeds
+
+    async def __search(self, day, index, strategy, scorer, excluded, start_words):
+        """
+        Replay the score journal, play the initial guesses, then the strategy guesses until the hidden word is found.
+
+        Each batch of guesses is scored concurrently by the scoring engine, and every result
+        is journaled and handed to the strategy as soon as it arrives. A word whose request
+        failed may be guessed again, up to MAX_GUESS_FAILURES times, and the search stops
+        after MAX_FAILED_ROUNDS rounds without any answer of the API.
+
+        :param int day: The puzzle number.
+        :param VectorIndex index: The indexed Word2Vec model.
+        :param SearchStrategy strategy: The search strategy choosing the guesses.
+        :param ScoringEngine scorer: The engine sending the guesses to the API.
+        :param numpy.ndarray excluded: Mask of the vocabulary words that must not be guessed, updated in place.
+        :param list start_words: The initial guesses.
+        :returns: A tuple (best_word, best_score), or (None, None) if no starting word is valid.
+        :rtype: tuple
+        """
+        best_word, best_score = None, None
+        initial = True
+        tested = set()  # Scored words outside of the vocabulary, the others are in the excluded mask
+        failures = {}  # Number of failed requests of each word
+        answered = 0  # Number of answers (scores or invalid words) received
+
+        def is_excluded(word):
+            idx = index.key_to_index.get(word)
+            if idx is not None:
+                return excluded[idx]
+            return word in tested or word in self.invalid_words or word in self.daily_invalid_words
+
+        def accept(word, score):
+            nonlocal best_word, best_score
+            idx = index.key_to_index.get(word)
+            if idx is not None:
+                excluded[idx] = True
+                if index.removed[idx]:
+                    idx = None  # Removed words are unknown to the strategies
+            if score is None:
+                self.__mark_invalid(word)
+                if idx is not None:
+                    self.__timed("similarity_time", strategy.reject, idx)
+                return False
+            if idx is None:
+                tested.add(word)
+            else:
+                self.__timed("similarity_time", strategy.observe, idx, score)
+            if best_word is None or score > best_score:
+                best_score, best_word = score, word
+                if not initial:
+                    self.logger.info("New best: %s → %.4f", word, score)
+            return best_score >= 1.0
+
+        def give_up(word):
+            failures[word] = failures.get(word, 0) + 1
+            if failures[word] < MAX_GUESS_FAILURES:
+                return  # The word may be guessed again
+            self.logger.warning("Request for '%s' failed %d times, it will not be guessed again", word, failures[word])
+            idx = index.key_to_index.get(word)
+            if idx is None:
+                tested.add(word)
+                return
+            excluded[idx] = True
+            if not index.removed[idx]:
+                self.__timed("similarity_time", strategy.reject, idx)
+
+        def on_result(word, score):
+            nonlocal answered
+            if score is None and word not in self.daily_invalid_words:
+                give_up(word)
+                return False
+            answered += 1
+            if self.journal:
+                self.journal.record(day, strategy.name, word, score)
+            if initial and score is not None:
+                self.logger.info("Initial: %s → %.4f", word, score)
+            if accept(word, score):
+                self.logger.info("Solution found: %s → %.4f", best_word, best_score)
+                return True
+            return False
+
+        if self.journal:
+            replayed = self.journal.replay(day, strategy.name)
+            for word, score in replayed:
+                accept(word, score)
+            self.replayed_count = len(replayed)
+            if replayed:
+                self.logger.info("Replayed %d journaled answers, best: %s → %.4f", len(replayed), best_word, best_score)
+            if best_score is not None and best_score >= 1.0:
+                return best_word, best_score
+
+        await scorer.score_batch([w for w in start_words if not is_excluded(w)], on_result)
+        if best_word is None:
+            return None, None
+        initial = False
+
+        failed_rounds = 0
+        while best_score < 1.0:
+            guesses = self.__timed("similarity_time", strategy.next_guesses)
+            guesses = guesses[~excluded[guesses]]
+            if not len(guesses):
+                self.logger.warning("No new candidates found, stopping.")
+                break
+            answered_before = answered
+            await scorer.score_batch([index.words[idx] for idx in guesses.tolist()], on_result)
+            failed_rounds = failed_rounds + 1 if answered == answered_before else 0
+            if failed_rounds >= MAX_FAILED_ROUNDS:
+                self.logger.error("No answer from the API for %d rounds, stopping.", failed_rounds)
+                break
+
+        return best_word, best_score
+
+    def __load_quantized(self, model):
+        """
+        Load the model vectors with the configured precision, quantizing them if needed.
+
+        :param KeyedVectors model: The loaded model.
+        :returns: The quantized vectors, or None to use the float32 vectors.
+        :rtype: QuantizedVectors or None
+        """
+        if self.vector_precision == "float32":
+            return None
+        if not self.model_cache_path:
+            self.logger.warning("Vector precision %s needs a model cache, using float32", self.vector_precision)
+            return None
+        quantized = load_quantized_vectors(self.model_cache_path, self.vector_precision)
+        if quantized is None:
+            self.logger.warning("Quantized vectors are missing or stale, rebuilding them")
+            quantized = build_quantized_vectors(model, self.model_cache_path, self.vector_precision)
+        if quantized is not None:
+            self.logger.info("Using %s vectors (%.1f MiB)", quantized.precision, quantized.nbytes / 2 ** 20)
+        return quantized
+
+    def __load_index(self):
+        """
+        Get the indexed model, reusing the one of the previous solve when the model binary has not changed.
+
+        The removed words are read again, so the words removed by the previous solve are hidden.
+
+        :returns: The indexed model.
+        :rtype: VectorIndex
+        """
+        source = model_signature(self.model_path)
+        if self.index is None or source != self.index_source:
+            model = load_model(self.model_path, self.model_cache_path)
+            neighbor_table = load_neighbor_table(self.model_cache_path) if self.model_cache_path else None
+            self.index = VectorIndex(model, None, neighbor_table, self.__load_quantized(model))
+            self.index_source = source
+            if neighbor_table is not None:
+                self.logger.info("Neighbour table loaded (top %d)", neighbor_table.k)
+        else:
+            self.logger.info("Reusing the model loaded by the previous solve")
+
+        tombstones = load_tombstones(self.tombstones_path) if self.tombstones_path else set()
+        self.index.removed = removed_mask(self.index.model, tombstones)
+        self.logger.info("Model loaded (%d words, %d removed)", len(self.index), int(self.index.removed.sum()))
+        return self.index
+
+    def filter_invalid_words(self, words):
+        """
+        Remove invalid words found by solves run with ``filter_model=False`` from the model.
 
-        # Save the updated invalid word set to disk for future use
-        with open(self.invalid_words_file, "wb") as f:
-            pickle.dump(all_invalid, f)
-        self.logger.info("Saved %d invalid words to %s", len(all_invalid), self.invalid_words_file)
+        :param iterable words: The invalid words.
+        """
+        words = set(words)
+        if words:
+            self.__filter_dictionnary(self.__load_index(), words)
 
-        # Filter model
-        valid_words = [word for word in model.key_to_index if word not in self.daily_invalid_words]
-        valid_vectors = [model[word] for word in valid_words]
-        filtered_model = KeyedVectors(vector_size=model.vector_size)
-        filtered_model.add_vectors(valid_words, valid_vectors)
+    def __timed(self, phase, function, *args):
+        """
+        Call a function and add its duration to a phase of the solve timings.
 
-        # Save filtered model
-        filtered_model.save_word2vec_format(self.model_path, binary=True)
-        self.logger.info("Filtered model saved to %s with %d words", self.model_path, len(valid_words))
+        :param str phase: Name of the timing.
+        :param callable function: The function to call.
+        :returns: The result of the function.
+        """
+        start = time.perf_counter()
+        try:
+            return function(*args)
+        finally:
+            self.timings[phase] += time.perf_counter() - start
 
-    def solve(self, day=None):
+    def solve(self, day=None, filter_model=True):
         """
-        Start solving the Cemantix puzzle using beam search and a Word2Vec model.
+        Start solving the Cemantix puzzle using the configured search strategy and a Word2Vec model.
+
+        The duration of each phase is measured and recorded with the statistics: model loading,
+        puzzle number fetch, API latency percentiles, time waiting for the rate limiter and retries,
+        similarity computations of the strategy, and model filtering.
 
         :param int day: (Optional) Puzzle number to solve. If None, the current day's puzzle will be used.
+        :param bool filter_model: Whether to remove the invalid words found from the model at the end of the solve.
+            If False, they are left in ``daily_invalid_words`` (see filter_invalid_words).
         :returns: A tuple (best_word, best_score) or None if no solution was found.
         :rtype: tuple or None
         """
         self.logger.info("Solver started")
+        self.last_stats = None
         start_time = time.time()
         self.request_count = 0
+        self.daily_invalid_words = set()
+        self.client.reset_metrics()
+        self.timings = dict.fromkeys(("load_time", "puzzle_fetch_time", "latency_p50", "latency_p95", "latency_max",
+                                      "sleep_time", "similarity_time", "filter_time"), 0.0)
 
-        self.logger.info("Loading model '%s'", self.model_path)
-        model = KeyedVectors.load_word2vec_format(self.model_path, binary=True, unicode_errors="ignore")
-        self.logger.info("Model loaded")
+        index = self.__timed("load_time", self.__load_index)
 
         if day is None:
-            day = self.__get_puzzle_number()
+            day = self.__timed("puzzle_fetch_time", self.__get_puzzle_number)
             if day is None:
                 return None
 
-        tested = set()
-        beam = []
-
-        # Initial guesses
-        for w in self.start_words:
-            if w in self.invalid_words or w in self.daily_invalid_words:
-                continue
-            self.request_count += 1
-            score = self.__get_score(w, day)
-            if score is not None:
-                tested.add(w)
-                heapq.heappush(beam, (-score, w))
-                self.logger.info("Initial: %s → %.4f", w, score)
-
-        if not beam:
+        excluded = index.removed | self.invalid_words.mask(index.key_to_index, len(index))
+        strategy = self.__timed("similarity_time", make_strategy, index, self.config, excluded)
+        self.logger.info("Search strategy: %s", strategy.name)
+        start_words = self.__timed("similarity_time", self.__choose_start_words, index, day, excluded)
+
+        scorer = ScoringEngine(lambda word: self.__get_score(word, day), self.client.current_rate, self.rate_burst)
+        self.replayed_count = 0
+        try:
+            best_word, best_score = asyncio.run(self.__search(day, index, strategy, scorer, excluded, start_words))
+        finally:
+            strategy.close()
+        # Journaled answers were requests sent by a previous run of this strategy for this puzzle
+        self.request_count = scorer.request_count + self.replayed_count
+        metrics = self.client.metrics()
+        self.logger.info("API metrics: %s", metrics)
+        for name in ("latency_p50", "latency_p95", "latency_max"):
+            self.timings[name] = metrics[name]
+        self.timings["sleep_time"] = scorer.wait_time + metrics["backoff_time"]
+        if strategy.metrics():
+            self.logger.info("Strategy metrics: %s", strategy.metrics())
+
+        if best_word is None:
             self.logger.error("No valid starting words")
             return None
 
-        best_score, best_word = -beam[0][0], beam[0][1]
-
-        while best_score < 1.0:
-            new_candidates = []
-
-            for _ in range(min(self.beam_size, len(beam))):
-                _, word = heapq.heappop(beam)
-                if word not in model:
-                    continue
-
-                if word in self.similar_cache:
-                    neighbors = self.similar_cache[word]
-                else:
-                    neighbors = model.most_similar(word, topn=self.topn)
-                    self.similar_cache[word] = neighbors
-
-                for neigh, _ in neighbors:
-                    if neigh in tested or neigh in self.invalid_words or neigh in self.daily_invalid_words:
-                        continue
-                    self.request_count += 1
-                    score = self.__get_score(neigh, day)
-                    if score is None:
-                        continue
-                    tested.add(neigh)
-                    heapq.heappush(new_candidates, (-score, neigh))
-
-                    if score > best_score:
-                        best_score, best_word = score, neigh
-                        self.logger.info("New best: %s → %.4f", neigh, score)
-                        if best_score >= 1.0:
-                            self.logger.info("Solution found: %s → %.4f", best_word, best_score)
-                            break
-
-                    time.sleep(self.api_delay)
-            if best_score >= 1.0:
-                break
-
-            for item in new_candidates:
-                heapq.heappush(beam, item)
-
-            beam = heapq.nsmallest(self.beam_size, beam)
-
-            if not new_candidates:
-                self.logger.warning("No new candidates found, stopping.")
-                break
-
         self.logger.info("Solving ended")
 
         exec_time = time.time() - start_time
         self.__log_and_notify(best_word, best_score, exec_time)
-        self.__filter_dictionnary(model)
-
-        # Merge invalid word sets and persist
-        newly_added = self.daily_invalid_words - self.invalid_words
-        self.invalid_words.update(self.daily_invalid_words)
-        self.__save_invalid_words()
-        self.logger.info("Persisted %d new invalid words to global dictionary", len(newly_added))
+        if filter_model:
+            self.__timed("filter_time", self.__filter_dictionnary, index, self.daily_invalid_words)
+        self.logger.info("Timings: %s", {name: round(value, 4) for name, value in self.timings.items()})
         self.__record_stats(day, best_word, best_score, exec_time)
         return best_word, best_score
@@ -0,0 +1,136 @@
+##
+# @file batchSolver.py
+# @brief Module to solve a range of puzzles in parallel, e.g. to back-test or catch up after downtime.
+#
+# Puzzles are fanned out to a pool of processes. Each worker keeps one warm solver for
+# all its puzzles and memory-maps the model cache read-only, so every worker shares the
+# same physical pages of the vectors. Workers never modify the model nor the stores: the
+# parent migrates the stores before starting the pool and the workers open them read-only,
+# the statistics are saved by the parent as each puzzle finishes, and the invalid words
+# found by every worker are removed from the model once, at the end.
+
+import logging
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from src.configLoader import setup_logging
+from src.CemantixSolver import CemantixSolver
+from src.invalidWordStore import InvalidWordStore
+from src.modelCache import load_model
+from src.scoreJournal import ScoreJournal
+from src.statsStore import StatsStore
+
+logger = logging.getLogger(__name__)
+
+# Solver of the current worker process
+_worker_solver = None
+
+
+def parse_days(days):
+    """
+    Parse a list of puzzle numbers, e.g. "1200-1284" or "1200,1210-1212".
+
+    :param str days: Comma separated puzzle numbers or inclusive ranges.
+    :raises ValueError: If the list is malformed.
+    :returns: The puzzle numbers, in order, without duplicates.
+    :rtype: list
+    """
+    numbers = []
+    for part in days.split(","):
+        first, _, last = part.strip().partition("-")
+        first = int(first)
+        last = int(last) if last else first
+        if last < first:
+            raise ValueError(f"Invalid puzzle range '{part.strip()}'")
+        numbers.extend(range(first, last + 1))
+    return list(dict.fromkeys(numbers))
+
+
+def _init_worker(config):
+    """
+    Create the solver of a worker process.
+
+    :param dict config: Configuration of the workers (see solve_days).
+    """
+    global _worker_solver
+    # Pool processes exit without running the exit handlers that write the queued log records
+    setup_logging(config.get("log_level", "INFO"), config.get("log_file", None), background=False)
+    _worker_solver = CemantixSolver(config, notify=False, read_only=True)
+
+
+def _solve_day(day):
+    """
+    Solve a puzzle in a worker process, without modifying the model.
+
+    :param int day: The puzzle number.
+    :returns: The result: puzzle number, best word, best score, requests count, statistics row
+        and invalid words found.
+    :rtype: dict
+    """
+    result = _worker_solver.solve(day=day, filter_model=False)
+    return {
+        "puzzle_number": day,
+        "word": result[0] if result else None,
+        "score": result[1] if result else None,
+        "requests_count": _worker_solver.request_count,
+        "stats": _worker_solver.last_stats,
+        "invalid_words": sorted(_worker_solver.daily_invalid_words)
+    }
+
+
+def solve_days(cfg, days, workers=1):
+    """
+    Solve several puzzles with a pool of worker processes.
+
+    Each puzzle has its own tested and invalid words and its own rate limit. The statistics
+    of each puzzle are saved as soon as it is solved.
+
+    :param dict cfg: Configuration dictionary (see configLoader).
+    :param list days: The puzzle numbers to solve.
+    :param int workers: Number of worker processes.
+    :returns: The result of each puzzle (see _solve_day), in the order of ``days``.
+    :rtype: list
+    """
+    setup_logging(cfg.get("log_level", "INFO"), cfg.get("log_file", None))
+    if cfg["model_cache_path"]:
+        # Build the cache once, so that the workers only memory-map it
+        load_model(cfg["model_path"], cfg["model_cache_path"])
+    else:
+        logger.warning("No model cache configured, each worker loads its own copy of the model")
+
+    # Open the stores once, so that a first run migrates them before the workers read them
+    InvalidWordStore(cfg["invalid_dict_path"], cfg["legacy_invalid_dict_path"])
+    if cfg["score_journal_path"]:
+        ScoreJournal(cfg["score_journal_path"]).close()
+
+    worker_cfg = dict(cfg, stats_file=None)
+    stats = StatsStore(cfg["stats_file"], cfg["legacy_stats_file"]) if cfg["stats_file"] else None
+    workers = max(1, min(workers, len(days)))
+    logger.info("Solving %d puzzles with %d workers", len(days), workers)
+
+    results = {}
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(worker_cfg,)) as executor:
+            futures = {executor.submit(_solve_day, day): day for day in days}
+            for future in as_completed(futures):
+                day = futures[future]
+                try:
+                    result = future.result()
+                except Exception:
+                    logger.exception("Puzzle #%d failed", day)
+                    continue
+                results[day] = result
+                if stats and result["stats"] and not stats.record(result["stats"]):
+                    logger.info("Puzzle #%d already logged in statistics for strategy '%s' → skipping", day, cfg["strategy"])
+                logger.info("Puzzle #%d (%d/%d): %s → %s in %d requests", day, len(results), len(days),
+                            result["word"], result["score"], result["requests_count"])
+    finally:
+        if stats:
+            stats.close()
+
+        # Invalid words are removed once, by this process only
+        invalid_words = {word for result in results.values() for word in result["invalid_words"]}
+        if invalid_words:
+            CemantixSolver(cfg, notify=False).filter_invalid_words(invalid_words)
+
+    solved = sum(result["score"] is not None and result["score"] >= 1.0 for result in results.values())
+    logger.info("Solved %d/%d puzzles", solved, len(days))
+    return [results[day] for day in days if day in results]
@@ -0,0 +1,206 @@
+##
+# @file benchmark.py
+# @brief Module to benchmark the solver end to end against the Cemantix simulator.
+#
+# The solver is run over N hidden words picked from the model, against a local
+# simulator, and the distribution of the requests count, wall time and invalid words
+# hit is reported. Strategy and configuration changes can then be compared with numbers,
+# e.g. the seed strategies, which can be benchmarked side by side on the same puzzles.
+
+import json
+import logging
+import os
+import statistics
+import tempfile
+import time
+from src.configLoader import setup_logging
+from src.modelCache import load_model
+from src.modelTombstones import append_tombstones, load_tombstones
+from src.cemantixSimulator import CemantixSimulator, pick_hidden_words
+from src.CemantixSolver import CemantixSolver, SEED_STRATEGIES
+
+def summarize(values):
+    """
+    Compute the distribution of a list of measures.
+
+    :param list values: The measures.
+    :returns: A dictionary with the min, median, mean, 90th percentile and max values.
+    :rtype: dict
+    """
+    if not values:
+        return {}
+    ordered = sorted(values)
+    return {
+        "min": ordered[0],
+        "p50": statistics.median(ordered),
+        "mean": statistics.fmean(ordered),
+        "p90": ordered[min(len(ordered) - 1, int(0.9 * len(ordered)))],
+        "max": ordered[-1]
+    }
+
+
+def run_benchmark(cfg, count=20, seed=0, latency=0.0, error_rate=0.0, invalid_rate=0.0,
+                  hidden_words_path=None, simulator_model_path=None, output_path=None):
+    """
+    Run the solver over several simulated puzzles and report the distribution of its measures.
+
+    Each puzzle is solved with a fresh solver whose invalid words, tombstones and journal
+    live in a temporary folder, so the real resources are never modified and puzzles do not
+    depend on each other. The configured tombstones are read, never written: they are copied
+    into each temporary tombstone file, so the benchmarked model is the production one, without
+    the words removed since the last compaction. Statistics and notifications are disabled.
+
+    :param dict cfg: Configuration dictionary (see configLoader), already including overrides.
+    :param int count: Number of puzzles to solve.
+    :param int seed: Seed used to pick the hidden words and inject failures.
+    :param float latency: Mean latency (in seconds) of the simulated API.
+    :param float error_rate: Probability of a server error on each request.
+    :param float invalid_rate: Share of the vocabulary refused as unknown words.
+    :param str hidden_words_path: (Optional) File with the candidate hidden words, one per line.
+        If None, they are picked from the model vocabulary.
+    :param str simulator_model_path: (Optional) Word2vec binary used by the simulator to score
+        guesses. If None, the solver model is used.
+    :param str output_path: (Optional) Path of a JSON file to write the results to.
+    :returns: The benchmark results: configuration summary, per-puzzle runs and distributions.
+    :rtype: dict
+    """
+    setup_logging(cfg.get("log_level", "INFO"), cfg.get("log_file", None))
+    logger = logging.getLogger(__name__)
+
+    solver_model = load_model(cfg["model_path"], cfg["model_cache_path"])
+    tombstones = load_tombstones(cfg["tombstones_path"]) if cfg.get("tombstones_path") else set()
+    if tombstones:
+        logger.info("Applying %d tombstones from %s", len(tombstones), cfg["tombstones_path"])
+    if simulator_model_path:
+        simulator_model = load_model(simulator_model_path)
+    else:
+        simulator_model = solver_model
+
+    if hidden_words_path:
+        with open(hidden_words_path, encoding="utf-8") as f:
+            candidates = [line.strip() for line in f if line.strip() in simulator_model]
+    else:
+        candidates = [word for word in solver_model.index_to_key
+                      if word in simulator_model and word not in tombstones]
+    hidden_words = pick_hidden_words(candidates, count, seed)
+
+    simulator = CemantixSimulator(simulator_model, hidden_words, latency=latency, error_rate=error_rate,
+                                  invalid_rate=invalid_rate, seed=seed).start()
+    runs = []
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            for i, hidden in enumerate(hidden_words):
+                puzzle_number = simulator.first_puzzle + i
+                simulator.puzzle_number = puzzle_number
+                workdir = os.path.join(tmp, str(puzzle_number))
+                os.makedirs(workdir)
+                tombstones_path = os.path.join(workdir, "tombstones")
+                append_tombstones(tombstones_path, tombstones)
+                solver_cfg = dict(
+                    cfg,
+                    schema="http",
+                    url=simulator.url,
+                    stats_file=None,
+                    score_journal_path=None,
+                    invalid_dict_path=os.path.join(workdir, "invalid_words.txt"),
+                    legacy_invalid_dict_path=None,
+                    tombstones_path=tombstones_path,
+                    compaction_threshold=float("inf")
+                )
+
+                solver = CemantixSolver(solver_cfg, notify=False)
+                start = time.perf_counter()
+                result = solver.solve(day=puzzle_number)
+                wall_time = time.perf_counter() - start
+
+                run = {
+                    "puzzle_number": puzzle_number,
+                    "hidden_word": hidden,
+                    "solved": result is not None and result[0] == hidden,
+                    "requests_count": solver.request_count,
+                    "wall_time": round(wall_time, 3),
+                    "invalid_words": len(solver.daily_invalid_words)
+                }
+                runs.append(run)
+                logger.info("Benchmark %d/%d: %s", i + 1, len(hidden_words), run)
+    finally:
+        simulator.stop()
+
+    results = {
+        "config": {
+            "strategy": cfg["strategy"],
+            "count": len(runs),
+            "seed": seed,
+            "latency": latency,
+            "error_rate": error_rate,
+            "invalid_rate": invalid_rate,
+            "tombstones": len(tombstones)
+        },
+        "solved_rate": sum(run["solved"] for run in runs) / len(runs) if runs else 0.0,
+        "requests_count": summarize([run["requests_count"] for run in runs]),
+        "wall_time": summarize([run["wall_time"] for run in runs]),
+        "invalid_words": summarize([run["invalid_words"] for run in runs]),
+        "runs": runs
+    }
+
+    logger.info("Benchmark of strategy '%s' over %d puzzles, %.0f%% solved",
+                cfg["strategy"], len(runs), 100 * results["solved_rate"])
+    for measure in ("requests_count", "wall_time", "invalid_words"):
+        logger.info("  %-15s %s", measure, ", ".join(f"{k}={v:.2f}" for k, v in results[measure].items()))
+
+    if output_path:
+        with open(output_path, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+        logger.info("Benchmark results saved to %s", output_path)
+    return results
+
+
+def compare_seed_strategies(cfg, output_path=None, **options):
+    """
+    Benchmark every seed strategy on the same simulated puzzles, and compare them with the fixed start words.
+
+    For each puzzle, the requests count of each seed strategy is compared with the one of the
+    configured start words (the "fixed" seed strategy).
+
+    :param dict cfg: Configuration dictionary (see configLoader), already including overrides.
+    :param str output_path: (Optional) Path of a JSON file to write the results to.
+    :param options: Options of the benchmark of each seed strategy (see run_benchmark).
+    :returns: The benchmark results of each seed strategy, and for each seed strategy other than
+        "fixed" the mean difference of requests per puzzle and the number of puzzles solved in fewer,
+        as many and more requests.
+    :rtype: dict
+    """
+    logger = logging.getLogger(__name__)
+    results = {"benchmarks": {}, "comparison": {}}
+    for name in SEED_STRATEGIES:
+        logger.info("Benchmark of the '%s' seed strategy", name)
+        results["benchmarks"][name] = run_benchmark(dict(cfg, seed_strategy=name), **options)
+
+    reference = results["benchmarks"]["fixed"]["runs"]
+    for name in SEED_STRATEGIES:
+        if name == "fixed":
+            continue
+        differences = [run["requests_count"] - fixed["requests_count"]
+                       for run, fixed in zip(results["benchmarks"][name]["runs"], reference)
+                       if run["solved"] and fixed["solved"]]
+        results["comparison"][name] = {
+            "mean_difference": statistics.fmean(differences) if differences else None,
+            "fewer": sum(difference < 0 for difference in differences),
+            "same": sum(difference == 0 for difference in differences),
+            "more": sum(difference > 0 for difference in differences)
+        }
+
+    for name, benchmark in results["benchmarks"].items():
+        logger.info("  %-10s solved %3.0f%%, requests %s", name, 100 * benchmark["solved_rate"],
+                    ", ".join(f"{k}={v:.1f}" for k, v in benchmark["requests_count"].items()))
+    for name, comparison in results["comparison"].items():
+        if comparison["mean_difference"] is not None:
+            logger.info("  %s vs fixed: %+.1f requests per puzzle, fewer on %d puzzles, same on %d, more on %d",
+                        name, comparison["mean_difference"], comparison["fewer"], comparison["same"],
+                        comparison["more"])
+
+    if output_path:
+        with open(output_path, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+        logger.info("Seed strategies comparison saved to %s", output_path)
+    return results
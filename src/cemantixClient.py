@@ -0,0 +1,247 @@
+##
+# @file cemantixClient.py
+# @brief Contains the CemantixClient class used to talk to the Cemantix API.
+#
+# All requests go through one pooled keep-alive session, so the TCP and TLS handshakes
+# are paid once per connection instead of once per request. Failures are retried with an
+# exponential backoff, and the allowed request rate adapts to the API answers.
+
+import logging
+import random
+import re
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+# Status codes worth a retry: throttling and server errors
+RETRY_STATUS = {429, 500, 502, 503, 504}
+# Status codes telling that we are sending requests too fast
+THROTTLE_STATUS = {429, 503}
+
+class CemantixClient:
+    """
+    HTTP client of the Cemantix website and API.
+
+    The client is thread safe: the scoring engine calls it from several worker threads.
+    """
+
+    def __init__(self, config):
+        """
+        Initialize the client with the provided configuration.
+
+        :param dict config: Dictionary containing configuration keys (see configLoader).
+        """
+        self.logger = logging.getLogger(__name__)
+        self.base_url = f"{config['schema']}://{config['url']}"
+        self.max_retries = config["max_retries"]
+        self.backoff_base = config["api_delay"]
+        self.backoff_max = config["backoff_max"]
+        self.timeout = config["http_timeout"]
+
+        # Adaptive rate: halved when throttled, increased back while responses are healthy
+        self.max_rate = config["rate_limit"]
+        self.min_rate = min(config["adaptive_rate_min"], self.max_rate)
+        self.rate = self.max_rate
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=config["http_pool_size"])
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers.update(CaseInsensitiveDict({
+            "Content-Type": config["content_type"],
+            "Host": config["url"],
+            "Origin": self.base_url,
+            "referrer": f"{self.base_url}/",
+            "User-Agent": config["user_agent"]
+        }))
+
+        self.lock = threading.Lock()
+        self.reset_metrics()
+
+    def reset_metrics(self):
+        """
+        Reset the latency and retry counters.
+        """
+        with self.lock:
+            self.latencies = []
+            self.retries = 0
+            self.throttled = 0
+            self.timeouts = 0
+            self.failures = 0
+            self.backoff_time = 0.0
+
+    def metrics(self):
+        """
+        Get the request counters since the last reset.
+
+        :returns: A dictionary with the number of requests, retries, throttled answers, timeouts,
+            failed requests, time slept before retries, latency percentiles (in seconds) and the current request rate.
+        :rtype: dict
+        """
+        with self.lock:
+            latencies = sorted(self.latencies)
+            metrics = {
+                "requests": len(latencies),
+                "retries": self.retries,
+                "throttled": self.throttled,
+                "timeouts": self.timeouts,
+                "failures": self.failures,
+                "backoff_time": round(self.backoff_time, 3),
+                "rate": self.rate
+            }
+        for name, q in (("latency_p50", 0.5), ("latency_p95", 0.95), ("latency_max", 1.0)):
+            metrics[name] = latencies[min(len(latencies) - 1, int(q * len(latencies)))] if latencies else 0.0
+        return metrics
+
+    def current_rate(self):
+        """
+        Get the number of requests per second currently allowed.
+
+        :returns: The current rate, 0 or less meaning no limit.
+        :rtype: float
+        """
+        return self.rate
+
+    def __slow_down(self):
+        """
+        Halve the allowed request rate after a throttling answer.
+        """
+        with self.lock:
+            self.throttled += 1
+            if self.max_rate > 0:
+                self.rate = max(self.min_rate, self.rate / 2)
+
+    def __speed_up(self):
+        """
+        Increase the allowed request rate after a healthy answer, up to the configured rate.
+        """
+        with self.lock:
+            if self.max_rate > 0 and self.rate < self.max_rate:
+                self.rate = min(self.max_rate, self.rate + self.max_rate / 20)
+
+    def __backoff(self, attempt, retry_after):
+        """
+        Compute the delay before the next attempt.
+
+        :param int attempt: Number of the failed attempt, starting at 0.
+        :param float retry_after: Delay requested by the server, or None.
+        :returns: The delay in seconds: the server one if given, otherwise an exponential backoff with jitter.
+        :rtype: float
+        """
+        if retry_after is not None:
+            return min(retry_after, self.backoff_max)
+        delay = min(self.backoff_max, self.backoff_base * 2 ** attempt)
+        return random.uniform(delay / 2, delay)
+
+    @staticmethod
+    def __retry_after(resp):
+        """
+        Read the ``Retry-After`` header of a response.
+
+        :param requests.Response resp: The response.
+        :returns: The delay in seconds, or None if the header is missing or invalid.
+        :rtype: float or None
+        """
+        value = resp.headers.get("Retry-After")
+        if value is None:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            return max(0.0, (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds())
+        except (TypeError, ValueError):
+            return None
+
+    def __request(self, method, path, parse, description, **kwargs):
+        """
+        Send a request, retrying on throttling, server errors, timeouts and unreadable answers.
+
+        :param str method: HTTP method.
+        :param str path: Path of the URL on the Cemantix website.
+        :param callable parse: Function extracting the result from the response. It may raise
+            ValueError or KeyError if the answer is unreadable, in which case the request is retried.
+        :param str description: Description of the request used in logs.
+        :returns: The value returned by ``parse``, or None if every attempt failed.
+        """
+        for attempt in range(self.max_retries):
+            retry_after = None
+            start = time.perf_counter()
+            try:
+                resp = self.session.request(method, self.base_url + path, timeout=self.timeout, **kwargs)
+                latency = time.perf_counter() - start
+                if resp.status_code in RETRY_STATUS:
+                    retry_after = self.__retry_after(resp)
+                    if resp.status_code in THROTTLE_STATUS:
+                        self.__slow_down()
+                    raise requests.HTTPError(f"HTTP {resp.status_code}")
+                result = parse(resp)
+                with self.lock:
+                    self.latencies.append(latency)
+                self.__speed_up()
+                return result
+            except (requests.RequestException, ValueError, KeyError) as e:
+                with self.lock:
+                    self.latencies.append(time.perf_counter() - start)
+                    if isinstance(e, requests.Timeout):
+                        self.timeouts += 1
+                if isinstance(e, requests.Timeout):
+                    self.__slow_down()
+                self.logger.warning("Error fetching %s: %s (retry %d/%d)", description, e, attempt + 1, self.max_retries)
+                if attempt + 1 < self.max_retries:
+                    delay = self.__backoff(attempt, retry_after)
+                    with self.lock:
+                        self.retries += 1
+                        self.backoff_time += delay
+                    time.sleep(delay)
+
+        with self.lock:
+            self.failures += 1
+        return None
+
+    def get_puzzle_number(self):
+        """
+        Fetch the current day's puzzle number from the Cemantix website.
+
+        :returns: The puzzle number as an integer if found, otherwise None.
+        :rtype: int or None
+        """
+        def parse(resp):
+            if resp.status_code != 200:
+                return None
+            match = re.search(r'data-puzzle-number="(\d+)"', resp.text)
+            return int(match.group(1)) if match else None
+
+        return self.__request("GET", "", parse, "puzzle number")
+
+    def get_score(self, word, day):
+        """
+        Send a word to the API.
+
+        :param str word: The word to test.
+        :param int day: The puzzle number for which to retrieve the score.
+        :returns: The JSON answer, holding the score in ``s`` or an error in ``e`` if the word
+            is invalid. None if the request failed.
+        :rtype: dict or None
+        """
+        def parse(resp):
+            if resp.status_code != 200:
+                return None
+            resp_json = resp.json()
+            if 'e' not in resp_json and 's' not in resp_json:
+                raise KeyError("no score in answer")
+            return resp_json
+
+        return self.__request("POST", f"/score?n={day}", parse, f"score for '{word}'",
+                              data=f"word={word}".encode("utf-8"))
+
+    def close(self):
+        """
+        Close the pooled connections.
+        """
+        self.session.close()
@@ -0,0 +1,181 @@
+##
+# @file cemantixSimulator.py
+# @brief Contains the CemantixSimulator class, a local stand-in for the Cemantix website and API.
+#
+# The simulator serves the puzzle number page and the ``/score?n=`` endpoint, scoring
+# guesses by cosine similarity in a given model. Latency, server errors and invalid word
+# answers can be injected, so the solver can be measured without the live site.
+
+import json
+import logging
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+def pick_hidden_words(words, count, seed=None):
+    """
+    Pick the hidden words of the simulated puzzles.
+
+    :param list words: The candidate words.
+    :param int count: Number of hidden words to pick.
+    :param int seed: (Optional) Seed of the random generator, for reproducible picks.
+    :returns: The hidden words.
+    :rtype: list
+    """
+    return random.Random(seed).sample(list(words), min(count, len(words)))
+
+
+class CemantixSimulator:
+    """
+    Local HTTP server answering like the Cemantix website and API.
+
+    Puzzle ``first_puzzle + i`` has ``hidden_words[i]`` as answer.
+    """
+
+    def __init__(self, model, hidden_words, first_puzzle=1, latency=0.0, error_rate=0.0, invalid_rate=0.0,
+                 seed=None, host="127.0.0.1", port=0):
+        """
+        Initialize the simulator.
+
+        :param KeyedVectors model: The Word2Vec model used to score the guesses.
+        :param list hidden_words: The answers of the simulated puzzles.
+        :param int first_puzzle: Number of the first puzzle.
+        :param float latency: Mean delay (in seconds) added to each answer.
+        :param float error_rate: Probability of answering with a server error (HTTP 500).
+        :param float invalid_rate: Share of the vocabulary refused as unknown words (``e`` answers).
+        :param int seed: (Optional) Seed used for the injected latency, errors and invalid words.
+        :param str host: Host to listen on.
+        :param int port: Port to listen on, 0 to pick a free one.
+        """
+        self.logger = logging.getLogger(__name__)
+        self.model = model
+        self.hidden_words = list(hidden_words)
+        self.first_puzzle = first_puzzle
+        self.puzzle_number = first_puzzle
+        self.latency = latency
+        self.error_rate = error_rate
+        self.invalid_rate = invalid_rate
+        self.seed = seed
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.server = ThreadingHTTPServer((host, port), self.__make_handler())
+        self.server.daemon_threads = True
+        self.thread = None
+
+    @property
+    def url(self):
+        """
+        Address of the simulator, to be used as the ``url`` configuration value with the ``http`` schema.
+
+        :rtype: str
+        """
+        host, port = self.server.server_address[:2]
+        return f"{host}:{port}"
+
+    def hidden_word(self, puzzle_number):
+        """
+        Get the answer of a simulated puzzle.
+
+        :param int puzzle_number: The puzzle number.
+        :returns: The hidden word, or None if the puzzle does not exist.
+        :rtype: str or None
+        """
+        position = puzzle_number - self.first_puzzle
+        if 0 <= position < len(self.hidden_words):
+            return self.hidden_words[position]
+        return None
+
+    def is_invalid(self, word):
+        """
+        Tell if a word is refused by the simulated API.
+
+        The choice only depends on the word and the seed, so a word is refused consistently.
+
+        :param str word: The guessed word.
+        :rtype: bool
+        """
+        if word not in self.model:
+            return True
+        return self.invalid_rate > 0 and random.Random(f"{self.seed}-{word}").random() < self.invalid_rate
+
+    def score(self, word, puzzle_number):
+        """
+        Compute the answer of the simulated API.
+
+        :param str word: The guessed word.
+        :param int puzzle_number: The puzzle number.
+        :returns: The JSON answer, with the score in ``s`` or an error in ``e``.
+        :rtype: dict
+        """
+        hidden = self.hidden_word(puzzle_number)
+        if hidden is None:
+            return {"e": f"Le puzzle {puzzle_number} n'existe pas."}
+        if word == hidden:
+            return {"s": 1.0}
+        if self.is_invalid(word):
+            return {"e": f"Je ne connais pas le mot <i>{word}</i>."}
+        return {"s": round(float(self.model.similarity(word, hidden)), 4)}
+
+    def __make_handler(self):
+        """
+        Build the request handler class bound to this simulator.
+
+        :rtype: type
+        """
+        simulator = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                simulator.logger.debug(format, *args)
+
+            def __answer(self, status, body, content_type):
+                with simulator.lock:
+                    delay = simulator.random.uniform(0, 2 * simulator.latency) if simulator.latency > 0 else 0
+                    failed = simulator.random.random() < simulator.error_rate
+                time.sleep(delay)
+                if failed:
+                    status, body = 500, b"Internal Server Error"
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                body = f'<html><body data-puzzle-number="{simulator.puzzle_number}"></body></html>'
+                self.__answer(200, body.encode("utf-8"), "text/html; charset=utf-8")
+
+            def do_POST(self):
+                query = parse_qs(urlparse(self.path).query)
+                form = parse_qs(self.rfile.read(int(self.headers.get("Content-Length", 0))).decode("utf-8"))
+                try:
+                    puzzle_number = int(query["n"][0])
+                    word = form["word"][0]
+                except (KeyError, ValueError):
+                    self.__answer(400, b"Bad Request", "text/plain")
+                    return
+                body = json.dumps(simulator.score(word, puzzle_number)).encode("utf-8")
+                self.__answer(200, body, "application/json")
+
+        return Handler
+
+    def start(self):
+        """
+        Start serving in a background thread.
+
+        :returns: The simulator itself.
+        :rtype: CemantixSimulator
+        """
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        self.logger.info("Cemantix simulator listening on %s", self.url)
+        return self
+
+    def stop(self):
+        """
+        Stop serving and close the socket.
+        """
+        self.server.shutdown()
+        self.server.server_close()
@@ -2,10 +2,17 @@
 # @file configLoader.py
 # @brief Module to load configuration and set up logging.
 
+import atexit
 import configparser
 import logging
 import os
+import queue
 import sys
+from logging.handlers import QueueHandler, QueueListener
+
+# Background thread writing the queued log records, and process that configured logging
+_log_listener = None
+_log_pid = None
 
 def load_config(filename="src/resources/config.ini"):
     """
@@ -31,34 +38,123 @@ def load_config(filename="src/resources/config.ini"):
     cfg = parser["GENERAL"]
 
     config = {
+        "strategy": cfg.get("strategy", "beam").strip().lower(),
+        "pruning_tolerance": cfg.getfloat("pruning_tolerance", 0.01),
+        "triangulation_ridge": cfg.getfloat("triangulation_ridge", 0.01),
         "start_words": [w.strip() for w in cfg.get("start_words", "").split(",")],
+        "seed_strategy": cfg.get("seed_strategy", "fixed").strip().lower(),
+        "seed_count": cfg.getint("seed_count", 5),
+        "seed_random_state": cfg.getint("seed_random_state", 0),
         "beam_size": cfg.getint("beam_size", 5),
         "topn": cfg.getint("topn", 20),
+        "prefetch_workers": cfg.getint("prefetch_workers", 1),
+        "hot_vocabulary_size": cfg.getint("hot_vocabulary_size", 0),
+        "hot_patience": cfg.getint("hot_patience", 3),
         "api_delay": cfg.getfloat("api_delay", 1.0),
+        "rate_limit": cfg.getfloat("rate_limit", 2.0),
+        "rate_burst": cfg.getint("rate_burst", 4),
         "model_path": cfg.get("model_path", "frWac.bin"),
-        "invalid_dict_path": cfg.get("invalid_dict_path", "invalid_words.pkl"),
+        "model_cache_path": cfg.get("model_cache_path", "").strip() or None,
+        "tombstones_path": cfg.get("tombstones_path", "").strip() or None,
+        "compaction_threshold": cfg.getint("compaction_threshold", 500),
+        "neighbor_table_k": cfg.getint("neighbor_table_k", 50),
+        "neighbor_table_workers": cfg.getint("neighbor_table_workers", 0),
+        "vector_precision": cfg.get("vector_precision", "float32").strip().lower(),
+        "invalid_dict_path": cfg.get("invalid_dict_path", "invalid_words.txt"),
+        "legacy_invalid_dict_path": cfg.get("legacy_invalid_dict_path", "").strip() or None,
         "schema": cfg.get("schema", "https"),
         "url": cfg.get("url", "cemantix.certitudes.org"),
         "user_agent": cfg.get("user_agent", ""),
         "content_type": cfg.get("content_type", "application/x-www-form-urlencoded"),
         "max_retries": cfg.getint("max_retries", 3),
+        "backoff_max": cfg.getfloat("backoff_max", 30.0),
+        "adaptive_rate_min": cfg.getfloat("adaptive_rate_min", 0.2),
+        "http_timeout": cfg.getfloat("http_timeout", 30.0),
+        "http_pool_size": cfg.getint("http_pool_size", 8),
+        "serve_host": cfg.get("serve_host", "127.0.0.1"),
+        "serve_port": cfg.getint("serve_port", 8787),
+        "serve_solve_timeout": cfg.getfloat("serve_solve_timeout", 900.0),
+        "serve_schedule": cfg.get("serve_schedule", "08:00").strip(),
+        "serve_poll_interval": cfg.getfloat("serve_poll_interval", 300.0),
+        "serve_post_solve_command": cfg.get("serve_post_solve_command", "").strip() or None,
         "log_level": cfg.get("log_level", "INFO").upper(),
         "log_file": cfg.get("log_file", "").strip(),
+        "score_journal_path": cfg.get("score_journal_path", "").strip() or None,
         "glossary": cfg.get("glossary_path", None),
         "stats_file": cfg.get("statistics_path", None),
+        "legacy_stats_file": cfg.get("legacy_statistics_path", "").strip() or None,
         "graphs_saving_folder": cfg.get("graphs_saving_folder", "doc/img")
     }
 
     return config
 
 
-def setup_logging(log_level: str, log_file: str):
+def apply_overrides(config, overrides):
+    """
+    Override configuration values, e.g. from the command line.
+
+    Each value is converted to the type of the value it replaces.
+
+    :param dict config: Configuration dictionary, updated in place.
+    :param list overrides: Overrides as "key=value" strings.
+    :raises KeyError: If a key is not a configuration key.
+    :raises ValueError: If an override is not formatted as "key=value" or has a wrong type.
+    :returns: The updated configuration dictionary.
+    :rtype: dict
+    """
+    for override in overrides:
+        if "=" not in override:
+            raise ValueError(f"Invalid override '{override}', expected key=value")
+        key, value = (part.strip() for part in override.split("=", 1))
+        if key not in config:
+            raise KeyError(f"Unknown configuration key '{key}'")
+
+        current = config[key]
+        if isinstance(current, list):
+            config[key] = [w.strip() for w in value.split(",")]
+        elif isinstance(current, bool) or current is None:
+            config[key] = value or None
+        else:
+            config[key] = type(current)(value)
+    return config
+
+
+def _stop_log_listener():
+    """
+    Stop the background logging thread, once every queued record is written.
+    """
+    global _log_listener
+    if _log_listener is not None:
+        _log_listener.stop()
+        _log_listener = None
+
+
+def setup_logging(log_level: str, log_file: str, background: bool = True):
     """
     Set up global logging based on configuration.
 
+    By default, records are put in a queue and written to the file and stdout by a
+    background thread, so logging never blocks the solver on disk or terminal I/O. The
+    queued records are written when the program exits.
+
+    Only the first call of a process configures logging. A process forked from a
+    configured one configures its own logging, as the background thread is not forked.
+
     :param str log_level: Logging level as a string (e.g., 'INFO', 'DEBUG').
     :param str log_file: Path to the log file. If empty, logs are output to stdout.
+    :param bool background: Whether to write the records from a background thread. If False,
+        they are written by the thread logging them.
     """
+    global _log_listener, _log_pid
+    root = logging.getLogger()
+    if root.handlers:
+        if _log_pid is None or _log_pid == os.getpid():
+            return  # Already configured, here or by the program using this module
+        # Inherited from the parent process, whose background thread does not run here
+        _log_listener = None
+        for handler in root.handlers[:]:
+            root.removeHandler(handler)
+
     numeric_level = getattr(logging, log_level.upper(), logging.INFO)
 
     handlers = []
@@ -67,9 +163,18 @@ def setup_logging(log_level: str, log_file: str):
 
     handlers.append(logging.StreamHandler(sys.stdout))
 
-    logging.basicConfig(
-        level=numeric_level,
-        format="[%(asctime)s] %(levelname)s - %(message)s",
-        datefmt="%H:%M:%S",
-        handlers=handlers
-    )
+    formatter = logging.Formatter("[%(asctime)s] %(levelname)s - %(message)s", datefmt="%H:%M:%S")
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    if background:
+        log_queue = queue.SimpleQueue()
+        _log_listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+        _log_listener.start()
+        atexit.register(_stop_log_listener)
+        handlers = [QueueHandler(log_queue)]
+
+    root.setLevel(numeric_level)
+    for handler in handlers:
+        root.addHandler(handler)
+    _log_pid = os.getpid()
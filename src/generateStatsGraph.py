@@ -1,68 +1,175 @@
 """
-Module to generate statistics graphs based on the file defined in the config.
+Module to generate statistics graphs based on the statistics store defined in the config.
 
 Generates:
 - invalid_word_removed_count_per_day.png
 - requests_count_per_day.png
 - solving_time_per_day.png
+- requests_count_rolling.png and solving_time_rolling.png
+- time_breakdown_per_day.png (when the statistics hold the per-phase timings)
+
+The aggregates are computed by the statistics store (see statsStore).
 """
 
 
+import logging
 import pandas as pd
 import matplotlib.pyplot as plt
 import matplotlib.dates as mdates
 import os
+from src.configLoader import setup_logging
+from src.statsStore import StatsStore
 
-def create_graph_stats(cfg):
-    """
-    Create three graphs based on statistics file in folder specified by config file. It creates :
-    - invalid_word_removed_count_per_day.png
-    - requests_count_per_day.png
-    - solving_time_per_day.png
-    If the folder doesn't exists, it will be created.
-
-    :param dict cfg Config file as python dictionary
-    :returns: None
-    """
-
-    os.makedirs(cfg['graphs_saving_folder'], exist_ok=True)
-
-    df = pd.read_csv(cfg["stats_file"], parse_dates=["timestamp"])
-    df["day"] = df["timestamp"].dt.date
-
-    grouped = df.groupby("day").mean(numeric_only=True)
-
-    avg_api_delay = df["api_delay"].mean()
+# Columns drawn day by day
+DAILY_COLUMNS = ["invalid_word_removed_count", "solving_time", "requests_count"]
 
-    for column in ["invalid_word_removed_count", "solving_time", "requests_count"]:
-        plt.figure(figsize=(10, 5))
+# Columns drawn as rolling mean and percentile, over ROLLING_DAYS days
+ROLLING_COLUMNS = ["requests_count", "solving_time"]
+ROLLING_DAYS = 7
 
-        # Adding api_delay if the graph concern time
-        if column == "solving_time":
-            title = f"{column.replace('_', ' ').title()} per day ({avg_api_delay:.1f} sec of average API delay)"
-        else:
-            title = f"{column.replace('_', ' ').title()} per day"
+# Phases of the solving time stacked on the time breakdown graph, the rest of the solving time
+# being spent on the API requests
+TIME_PHASES = ["load_time", "puzzle_fetch_time", "similarity_time", "sleep_time"]
 
-        # Plotting
-        grouped[column].plot(marker="o")
+logger = logging.getLogger(__name__)
 
+def create_time_breakdown_graph(store, saving_folder):
+    """
+    Create a stacked bar graph of the time spent in each phase of the solve, per day.
 
-        plt.title(title)
-        plt.xlabel("Day")
-        if column == "solving_time":
-            plt.ylabel(column.replace("_", " ").title() + " (sec)")
-        else :
-            plt.ylabel(column.replace("_", " ").title())
-        plt.grid(True)
+    Solves recorded before the per-phase timings were added are skipped.
 
-        # Show one date per point on the graph
-        plt.gca().xaxis.set_major_locator(mdates.DayLocator(interval=1))
-        plt.gca().xaxis.set_major_formatter(mdates.DateFormatter('%Y-%m-%d'))
-        plt.xticks(rotation=45)
+    :param StatsStore store: The statistics store.
+    :param str saving_folder: Folder to save the graph in.
+    :returns: None
+    """
+    breakdown = pd.DataFrame(store.daily_means(TIME_PHASES + ["filter_time", "solving_time"], by_strategy=False,
+                                               required=TIME_PHASES))
+    if breakdown.empty:
+        return
+    breakdown = breakdown.set_index("day").astype(float)
+
+    breakdown["api_requests_time"] = (breakdown["solving_time"] - breakdown[TIME_PHASES].sum(axis=1)).clip(lower=0)
+    breakdown = breakdown[TIME_PHASES + ["api_requests_time", "filter_time"]]
+    breakdown.columns = [column.replace("_time", "").replace("_", " ") for column in breakdown.columns]
+
+    breakdown.plot(kind="bar", stacked=True, figsize=(10, 5))
+    plt.title("Solving time breakdown per day")
+    plt.xlabel("Day")
+    plt.ylabel("Time (sec)")
+    plt.grid(True, axis="y")
+    plt.xticks(rotation=45)
+    plt.tight_layout()
+    plt.savefig(f"{saving_folder}/time_breakdown_per_day.png")
+    plt.close()
+
+
+def create_rolling_graph(store, column, saving_folder):
+    """
+    Create a graph of the mean and 90th percentile of a column over the last ROLLING_DAYS days,
+    with one color per search strategy.
 
-        plt.tight_layout()
+    :param StatsStore store: The statistics store.
+    :param str column: The column to draw.
+    :param str saving_folder: Folder to save the graph in.
+    :returns: None
+    """
+    rolling = pd.DataFrame(store.rolling_percentiles(column, ROLLING_DAYS))
+    if rolling.empty:
+        return
+    rolling["day"] = pd.to_datetime(rolling["day"])
+
+    plt.figure(figsize=(10, 5))
+    for i, (strategy, rows) in enumerate(rolling.groupby("strategy")):
+        color = f"C{i}"
+        plt.plot(rows["day"], rows["mean"], marker="o", color=color, label=f"{strategy} mean")
+        plt.plot(rows["day"], rows["p90"], linestyle="--", color=color, label=f"{strategy} p90")
+
+    label = column.replace("_", " ").title()
+    plt.title(f"{label} over the last {ROLLING_DAYS} days")
+    plt.xlabel("Day")
+    plt.ylabel(label + (" (sec)" if column == "solving_time" else ""))
+    plt.grid(True)
+    plt.legend()
+    plt.gca().xaxis.set_major_formatter(mdates.DateFormatter('%Y-%m-%d'))
+    plt.xticks(rotation=45)
+    plt.tight_layout()
+    plt.savefig(f"{saving_folder}/{column}_rolling.png")
+    plt.close()
+
+
+def create_graph_stats(cfg, force=False):
+    """
+    Create graphs based on the statistics store specified by config file, with one line
+    per search strategy. It creates :
+    - invalid_word_removed_count_per_day.png
+    - requests_count_per_day.png
+    - solving_time_per_day.png
+    - requests_count_rolling.png and solving_time_rolling.png (see create_rolling_graph)
+    - time_breakdown_per_day.png (see create_time_breakdown_graph)
+    If the folder doesn't exists, it will be created. The graphs are only redrawn when statistics
+    were saved since they were last drawn.
 
-        # Saving
-        output_path = f"{cfg['graphs_saving_folder']}/{column}_per_day.png"
-        plt.savefig(output_path)
-        plt.close()
+    :param dict cfg Config file as python dictionary
+    :param bool force: Redraw the graphs even if no statistics were saved since they were last drawn.
+    :returns: None
+    """
+    setup_logging(cfg.get("log_level", "INFO"), cfg.get("log_file", None))
+    saving_folder = cfg['graphs_saving_folder']
+    os.makedirs(saving_folder, exist_ok=True)
+
+    store = StatsStore(cfg["stats_file"], cfg["legacy_stats_file"])
+    try:
+        missing = any(not os.path.exists(f"{saving_folder}/{column}_per_day.png") for column in DAILY_COLUMNS)
+        if not (force or missing or store.has_new_rows(saving_folder)):
+            logger.info("No new statistics since the graphs were last drawn in %s, skipping", saving_folder)
+            return
+
+        avg_api_delay = store.average("api_delay") or 0.0
+        daily = pd.DataFrame(store.daily_means(DAILY_COLUMNS))
+        if daily.empty:
+            logger.warning("No statistics to draw")
+            return
+        daily["day"] = pd.to_datetime(daily["day"])
+        daily[DAILY_COLUMNS] = daily[DAILY_COLUMNS].astype(float)
+
+        for column in DAILY_COLUMNS:
+            plt.figure(figsize=(10, 5))
+
+            # Adding api_delay if the graph concern time
+            if column == "solving_time":
+                title = f"{column.replace('_', ' ').title()} per day ({avg_api_delay:.1f} sec of average API delay)"
+            else:
+                title = f"{column.replace('_', ' ').title()} per day"
+
+            # Plotting, one line per search strategy
+            grouped = daily.pivot(index="day", columns="strategy", values=column)
+            grouped.plot(marker="o", ax=plt.gca())
+
+
+            plt.title(title)
+            plt.xlabel("Day")
+            if column == "solving_time":
+                plt.ylabel(column.replace("_", " ").title() + " (sec)")
+            else :
+                plt.ylabel(column.replace("_", " ").title())
+            plt.grid(True)
+
+            # Show one date per point on the graph
+            plt.gca().xaxis.set_major_locator(mdates.DayLocator(interval=1))
+            plt.gca().xaxis.set_major_formatter(mdates.DateFormatter('%Y-%m-%d'))
+            plt.xticks(rotation=45)
+
+            plt.tight_layout()
+
+            # Saving
+            output_path = f"{saving_folder}/{column}_per_day.png"
+            plt.savefig(output_path)
+            plt.close()
+
+        for column in ROLLING_COLUMNS:
+            create_rolling_graph(store, column, saving_folder)
+        create_time_breakdown_graph(store, saving_folder)
+        store.mark_rendered(saving_folder)
+    finally:
+        store.close()
@@ -0,0 +1,119 @@
+##
+# @file importBudget.py
+# @brief Module to check the cold-start import time of each command against a budget.
+#
+# Each command of main.py only imports its own dependencies when it runs. This module
+# measures, in fresh interpreters started with ``python -X importtime``, the time spent
+# importing main.py and the modules of each command, and reports the commands going over
+# their budget, so an import added at the wrong place is caught. The budgets of the commands
+# are relative to the import time of main.py measured in the same run, so that they hold on
+# slower machines.
+
+import json
+import logging
+import os
+import subprocess
+import sys
+from src.configLoader import setup_logging
+
+# Cold-start import budget of main.py alone (i.e. --help), in milliseconds. Importing gensim,
+# pandas or matplotlib there costs several hundred milliseconds more
+CLI_BUDGET = 300
+
+# Cold-start import budget of each command, as a multiple of the import time of main.py alone.
+# They are about twice the ratios measured when they were set (e.g. 11 for solve)
+IMPORT_BUDGETS = {
+    "solve": 20,
+    "init": 25,
+    "generate-stat-graph": 25,
+    "compact": 20,
+    "bench": 20,
+    "microbench": 25,
+    "precision-report": 20,
+    "serve": 16,
+    "import-budget": 2
+}
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+logger = logging.getLogger(__name__)
+
+
+def parse_import_time(output):
+    """
+    Compute the total import time from the output of ``python -X importtime``.
+
+    :param str output: The standard error of the interpreter.
+    :returns: The sum of the cumulative times of the top-level imports, in milliseconds.
+    :rtype: float
+    """
+    total = 0
+    for line in output.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        # Nested imports are indented below their parent
+        if cumulative.strip().isdigit() and not name[1:].startswith(" "):
+            total += int(cumulative)
+    return total / 1000
+
+
+def measure_import_time(command=None, runs=5):
+    """
+    Measure the cold-start import time of a command.
+
+    :param str command: (Optional) The command name. If None, only main.py is imported.
+    :param int runs: Number of fresh interpreters started, the fastest one is kept.
+    :raises RuntimeError: If the modules of the command cannot be imported.
+    :returns: The import time, in milliseconds.
+    :rtype: float
+    """
+    code = "import main" + (f"; main.import_command({command!r})" if command else "")
+    times = []
+    for _ in range(runs):
+        completed = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=ROOT,
+                                   capture_output=True, text=True)
+        if completed.returncode != 0:
+            raise RuntimeError(f"Failed to import command '{command}':\n{completed.stderr}")
+        times.append(parse_import_time(completed.stderr))
+    return min(times)
+
+
+def check_import_budgets(cfg, commands, runs=5, output_path=None):
+    """
+    Measure the import time of main.py and of each command, and compare them to their budget.
+
+    main.py is measured first, and the budget of each command is its ratio in ``IMPORT_BUDGETS``
+    times this measure.
+
+    :param dict cfg: Configuration dictionary (see configLoader).
+    :param list commands: The command names.
+    :param int runs: Number of cold starts measured for each command.
+    :param str output_path: (Optional) Path of a JSON file to write the measures to.
+    :returns: True if every command is within its budget, False otherwise.
+    :rtype: bool
+    """
+    setup_logging(cfg.get("log_level", "INFO"), cfg.get("log_file", None))
+    report = {}
+    cli_time = None
+    for command in [None] + list(commands):
+        name = command or "cli"
+        elapsed = measure_import_time(command, runs)
+        if command is None:
+            cli_time = elapsed
+            budget = CLI_BUDGET
+        else:
+            budget = round(IMPORT_BUDGETS[name] * cli_time, 1) if name in IMPORT_BUDGETS else None
+        report[name] = {"import_time": round(elapsed, 1), "budget": budget,
+                        "within_budget": budget is None or elapsed <= budget}
+        logger.info("%-20s %7.1f ms (budget %s ms)%s", name, elapsed, budget if budget is not None else "-",
+                    "" if report[name]["within_budget"] else "  OVER BUDGET")
+
+    if output_path:
+        with open(output_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        logger.info("Import times saved to %s", output_path)
+    over = [name for name, measure in report.items() if not measure["within_budget"]]
+    if over:
+        logger.error("Import time over budget: %s", ", ".join(over))
+    return not over
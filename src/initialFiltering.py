@@ -2,12 +2,92 @@
 # @file initialFiltering.py
 # @brief Module to initally filter model to remove plural, conjugated and previously founded invalid words
 
-import pickle
-import re
+import numpy as np
 import pandas as pd
 import logging
 from gensim.models import KeyedVectors
 from src.configLoader import setup_logging
+from src.modelCache import build_model_cache, load_cached_model, save_word2vec_binary
+from src.neighborTable import build_neighbor_table
+from src.seedWords import build_seed_clusters
+from src.quantizedVectors import build_quantized_vectors, recall_report
+from src.modelTombstones import clear_tombstones
+from src.invalidWordStore import InvalidWordStore
+
+def index_glossary(df):
+    """
+    Preprocess the glossary into a lookup table indexed by word.
+
+    A word may have several entries in the glossary, only its first entry is used.
+
+    The frequency of a word is the mean of its ``freqfilms2`` and ``freqlivres`` frequencies (summed
+    over all its entries), or NaN if the glossary has no frequency columns.
+
+    :param pandas.DataFrame df: The glossary, with at least the ``ortho``, ``nombre`` and ``cgram`` columns.
+    :returns: A DataFrame indexed by word with the boolean columns ``plural`` and ``conjugated``, and the
+        float column ``frequency``.
+    :rtype: pandas.DataFrame
+    """
+    first = df.drop_duplicates("ortho", keep="first").dropna(subset=["ortho"])
+    if {"freqfilms2", "freqlivres"}.issubset(df.columns):
+        frequency = df.groupby("ortho")[["freqfilms2", "freqlivres"]].sum().mean(axis=1).reindex(first["ortho"])
+    else:
+        frequency = pd.Series(np.nan, index=first["ortho"])
+    return pd.DataFrame({
+        "plural": (first["nombre"] == "p").to_numpy(),
+        "conjugated": first["cgram"].str.contains("VER|AUX", regex=True, na=False).to_numpy(dtype=bool),
+        "frequency": frequency.to_numpy(dtype=float)
+    }, index=pd.Index(first["ortho"]))
+
+
+def filter_vocabulary(words, glossary, invalid_words):
+    """
+    Compute which words of the model vocabulary are kept.
+
+    A word is kept if it exists in the glossary, has at least 2 characters, starts with an
+    alphanumeric character, contains no non-alphanumeric character other than "-", is neither
+    plural nor conjugated, and is not a previously found invalid word.
+
+    :param list words: The model vocabulary.
+    :param pandas.DataFrame glossary: The glossary lookup table (see index_glossary).
+    :param set invalid_words: Previously found invalid words.
+    :returns: A boolean mask of the kept words, aligned with ``words``.
+    :rtype: numpy.ndarray
+    """
+    vocabulary = pd.Series(words, dtype=object)
+    flags = glossary.reindex(vocabulary)
+
+    exists = vocabulary.isin(glossary.index).to_numpy()
+    valid = ((vocabulary.str.len() >= 2)
+             & vocabulary.str[0].str.isalnum().astype("boolean").fillna(False)
+             & vocabulary.str.replace("-", "", regex=False).str.isalnum().astype("boolean").fillna(False)
+             ).to_numpy(dtype=bool)
+    plural = flags["plural"].eq(True).to_numpy()
+    conjugated = flags["conjugated"].eq(True).to_numpy()
+    invalid = vocabulary.isin(invalid_words).to_numpy()
+
+    return exists & valid & ~plural & ~conjugated & ~invalid
+
+
+def order_by_frequency(words, glossary, keep):
+    """
+    Sort the kept words of the model vocabulary, most frequent first.
+
+    Words without a frequency in the glossary come last, and words with the same frequency
+    keep their order in the model, so the most frequent words form a contiguous block at the
+    start of the filtered model (see the hot tier of the beam search).
+
+    :param list words: The model vocabulary.
+    :param pandas.DataFrame glossary: The glossary lookup table (see index_glossary).
+    :param numpy.ndarray keep: Boolean mask of the kept words, aligned with ``words``.
+    :returns: The indices of the kept words, in their new order.
+    :rtype: numpy.ndarray
+    """
+    rows = np.flatnonzero(keep)
+    kept_words = pd.Series(words, dtype=object).to_numpy()[rows]
+    frequency = glossary["frequency"].reindex(kept_words).fillna(-1).to_numpy()
+    return rows[np.argsort(-frequency, kind="stable")]
+
 
 def filter_model_from_config(cfg):
     """
@@ -16,7 +96,8 @@ def filter_model_from_config(cfg):
 
     :param dict cfg: Configuration dictionary containing the following keys:
         - model_path (str): Path to the Word2Vec model file.
-        - invalid_dict_path (str): Path to the pickle file with invalid words.
+        - invalid_dict_path (str): Path to the file with invalid words (see invalidWordStore).
+        - legacy_invalid_dict_path (str or None): Path to the legacy pickle file with invalid words (optional).
         - glossary (str): Path to the TSV glossary file.
         - log_level (str): Logging level (e.g., 'INFO').
         - log_file (str or None): Logging output file (optional).
@@ -30,73 +111,43 @@ def filter_model_from_config(cfg):
     if cfg["glossary"] is None:
         logger.error("Glossary needs to be defined in configuration")
         return None
-    df = pd.read_csv(cfg["glossary"], sep="\t")
-
-    def is_valid_word(word):
-        if len(word) < 2:
-            return False
-        if not word[0].isalnum():
-            return False
-        if not word.replace("-","").isalnum():
-            if word == "détention":
-                print("Detected")
-            return False
-        if word == "détention":
-            print("ok")
-        return True
-
-    def is_plural(word):
-        word_data = df[df['ortho'] == word]
-        if not word_data.empty:
-            return word_data.iloc[0]['nombre'] == 'p'
-        return False
-
-    def is_conjugated(word):
-        word_data = df[df['ortho'] == word]
-        if not word_data.empty:
-            cgram = word_data.iloc[0]['cgram']
-            if type(cgram) != float:
-                return 'VER' in cgram or 'AUX' in cgram
-        return False
-
-    def exists(word):
-        word_data = df[df['ortho'] == word]
-        return not word_data.empty
+    glossary = index_glossary(pd.read_csv(cfg["glossary"], sep="\t"))
+    logger.info(f"Glossary indexed: {len(glossary)} words")
 
     logger.info(f"Loading model from {cfg['model_path']}")
     model = KeyedVectors.load_word2vec_format(cfg["model_path"], binary=True, unicode_errors="ignore")
 
-    try:
-        with open(cfg["invalid_dict_path"], "rb") as f:
-            invalid_words = pickle.load(f)
-            logger.info(f"Loaded {len(invalid_words)} invalid words.")
-    except (FileNotFoundError, EOFError):
-        invalid_words = set()
+    invalid_words = InvalidWordStore(cfg["invalid_dict_path"], cfg.get("legacy_invalid_dict_path")).words
+    if invalid_words:
+        logger.info(f"Loaded {len(invalid_words)} invalid words.")
+    else:
         logger.warning("No invalid words file found, starting with empty set.")
 
-    filtered_words = {}
     total_words = len(model.key_to_index)
-    for i, word in enumerate(model.key_to_index):
-        if i % (total_words // 100) == 0:
-            logger.info(f"Progress: {i/total_words*100:.2f}% ({i}/{total_words})")
-
-        if word in invalid_words:
-            continue
-        if not exists(word):
-            continue
-        if not is_valid_word(word):
-            continue
-        if is_plural(word):
-            continue
-        if is_conjugated(word):
-            continue
-
-        filtered_words[word] = model[word]
-
-    logger.info(f"{total_words - len(filtered_words)} invalid words found")
-    logger.info(f"{len(filtered_words)} valid words after filtering")
-    filtered_model = KeyedVectors(vector_size=model.vector_size)
-    filtered_model.add_vectors(list(filtered_words.keys()), list(filtered_words.values()))
-
-    filtered_model.save_word2vec_format(cfg["model_path"], binary=True)
+    keep = filter_vocabulary(model.index_to_key, glossary, invalid_words)
+    kept_count = int(np.count_nonzero(keep))
+
+    logger.info(f"{total_words - kept_count} invalid words found")
+    logger.info(f"{kept_count} valid words after filtering")
+    rows = order_by_frequency(model.index_to_key, glossary, keep)
+    save_word2vec_binary(cfg["model_path"], model.index_to_key, model.vectors, rows)
     logger.info(f"Filtered model saved to {cfg['model_path']}")
+
+    # Previously removed words are invalid words, already filtered out of the new model
+    if cfg.get("tombstones_path"):
+        clear_tombstones(cfg["tombstones_path"])
+
+    if cfg.get("model_cache_path"):
+        logger.info(f"Building model cache in {cfg['model_cache_path']}")
+        build_model_cache(cfg["model_path"], cfg["model_cache_path"], model, rows)
+        # The filtered model is read back from the cache instead of being copied
+        del model
+        filtered_model = load_cached_model(cfg["model_cache_path"])
+        if cfg.get("neighbor_table_k", 0) > 0:
+            build_neighbor_table(filtered_model, cfg["model_cache_path"], cfg["neighbor_table_k"],
+                                 cfg.get("neighbor_table_workers", 0))
+        if cfg.get("seed_count", 0) > 0:
+            build_seed_clusters(filtered_model, cfg["model_cache_path"], cfg["seed_count"])
+        if cfg.get("vector_precision", "float32") != "float32":
+            build_quantized_vectors(filtered_model, cfg["model_cache_path"], cfg["vector_precision"])
+            recall_report(filtered_model, [cfg["vector_precision"]], k=cfg["topn"])
@@ -0,0 +1,194 @@
+##
+# @file invalidWordStore.py
+# @brief Contains the InvalidWordStore class, the log-structured store of invalid words.
+#
+# Invalid words are appended to a text file, one per line, instead of rewriting a whole
+# pickled set at each solve. Several solvers may share the log: appends and compactions
+# hold an exclusive lock on a sidecar ``.lock`` file, and the lines appended by the other
+# processes are read back before appending, so a word is only logged once. A
+# vocabulary-indexed mask gives membership checks without hashing strings.
+
+import fcntl
+import logging
+import os
+import pickle
+import numpy as np
+
+class InvalidWordStore:
+    """
+    Append-only store of the words refused by the Cemantix API.
+    """
+
+    def __init__(self, path, legacy_path=None, read_only=False):
+        """
+        Open the store, importing the legacy pickle file if the log does not exist yet.
+
+        :param str path: Path to the log file.
+        :param str legacy_path: (Optional) Path to the pickled set of invalid words used by older versions.
+        :param bool read_only: Whether to only read the log, e.g. in batch workers. A read-only store
+            never imports the legacy file, the process owning the store must have opened it first.
+        """
+        self.logger = logging.getLogger(__name__)
+        self.path = path
+        self.lock_path = path + ".lock"
+        self.read_only = read_only
+        self.words = set()
+        self.line_count = 0  # Number of words in the log, duplicates included
+        self.offset = 0  # Size of the log already read, in bytes
+        self.file_id = None  # Device and inode of the log already read
+
+        if not read_only and not os.path.exists(path) and legacy_path and os.path.exists(legacy_path):
+            with self.__locked():
+                # Another process may have imported it while this one waited for the lock
+                if not os.path.exists(path):
+                    self.__import_pickle(legacy_path)
+        self.__read_new_lines()
+
+    def __locked(self):
+        """
+        Take the exclusive lock of the log, shared by every process using it.
+
+        The lock is held on a sidecar file, since compaction replaces the log file itself.
+        It is released when the returned file is closed.
+
+        :returns: The open lock file, to be used as a context manager.
+        :rtype: file
+        """
+        lock = open(self.lock_path, "a")
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        return lock
+
+    def __import_pickle(self, legacy_path):
+        """
+        Write every word of the legacy pickle file to the log.
+
+        :param str legacy_path: Path to the pickled set of invalid words.
+        """
+        try:
+            with open(legacy_path, "rb") as f:
+                words = pickle.load(f)
+        except EOFError:
+            words = set()
+        self.__write(sorted(words))
+        self.logger.info("Imported %d invalid words from %s to %s", len(words), legacy_path, self.path)
+
+    def __read_new_lines(self):
+        """
+        Read the lines appended to the log since it was last read, by this process or another one.
+
+        The log is read again from the start if another process compacted it in the meantime.
+        """
+        try:
+            with open(self.path, "rb") as f:
+                stat = os.fstat(f.fileno())
+                if (stat.st_dev, stat.st_ino) != self.file_id or stat.st_size < self.offset:
+                    self.file_id = (stat.st_dev, stat.st_ino)
+                    self.offset = 0
+                    self.line_count = 0
+                f.seek(self.offset)
+                data = f.read()
+        except FileNotFoundError:
+            return
+
+        # A line still being written by another process is read next time
+        end = data.rfind(b"\n") + 1
+        for word in data[:end].decode("utf-8").split("\n"):
+            if word:
+                self.words.add(word)
+                self.line_count += 1
+        self.offset += end
+
+    def __write(self, words):
+        """
+        Atomically replace the log with the given words.
+
+        :param list words: The words to write.
+        """
+        with open(self.path + ".tmp", "w", encoding="utf-8") as f:
+            for word in words:
+                f.write(f"{word}\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(self.path + ".tmp", self.path)
+
+    def __contains__(self, word):
+        return word in self.words
+
+    def __len__(self):
+        return len(self.words)
+
+    def __iter__(self):
+        return iter(self.words)
+
+    def add(self, words):
+        """
+        Append the new invalid words to the log.
+
+        The words are checked against the lines other processes appended, under the lock of the
+        log, so no word is appended twice. The log is still compacted if it holds more than twice
+        as many lines as words, e.g. when written by an older version without the lock: this only
+        guards against duplicates, a log written by this class never needs it.
+
+        :param iterable words: The invalid words, already known ones are ignored.
+        :raises RuntimeError: If the store is read-only.
+        :returns: The number of new words.
+        :rtype: int
+        """
+        if self.read_only:
+            raise RuntimeError(f"Invalid words log {self.path} is opened read-only")
+        with self.__locked():
+            self.__read_new_lines()
+            new_words = [word for word in dict.fromkeys(words) if word and word not in self.words]
+            if new_words:
+                with open(self.path, "a", encoding="utf-8") as f:
+                    for word in new_words:
+                        f.write(f"{word}\n")
+                    f.flush()
+                    os.fsync(f.fileno())
+                self.__read_new_lines()
+
+            if self.line_count > 2 * len(self.words):
+                self.__compact()
+        return len(new_words)
+
+    def compact(self):
+        """
+        Rewrite the log with each word once, in the order of their first appearance.
+
+        :raises RuntimeError: If the store is read-only.
+        """
+        if self.read_only:
+            raise RuntimeError(f"Invalid words log {self.path} is opened read-only")
+        with self.__locked():
+            self.__compact()
+
+    def __compact(self):
+        """
+        Rewrite the log with each word once. The caller holds the lock of the log.
+        """
+        words = []
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                words = [line.rstrip("\n") for line in f if line.strip()]
+        except FileNotFoundError:
+            pass
+        words = list(dict.fromkeys(words + sorted(self.words.difference(words))))
+        self.__write(words)
+        self.words = set(words)
+        self.file_id = None
+        self.__read_new_lines()
+        self.logger.info("Compacted invalid words log %s (%d words)", self.path, len(words))
+
+    def mask(self, key_to_index, size):
+        """
+        Compute the mask of the invalid words over a model vocabulary.
+
+        :param dict key_to_index: Mapping of the vocabulary words to their index.
+        :param int size: Size of the vocabulary.
+        :returns: A boolean mask, True for invalid words.
+        :rtype: numpy.ndarray
+        """
+        mask = np.zeros(size, dtype=bool)
+        indices = [key_to_index[word] for word in self.words if word in key_to_index]
+        mask[indices] = True
+        return mask
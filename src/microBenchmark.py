@@ -0,0 +1,444 @@
+##
+# @file microBenchmark.py
+# @brief Module to benchmark the building blocks of the solver on a synthetic model.
+#
+# The end-to-end benchmark (see benchmark.py) tells how many requests and how much time a
+# solve takes, but not which step got slower. This module generates a random model and
+# glossary of the requested size in a temporary folder, times the hot paths of the solver
+# and of init on them, and compares the results with a saved baseline.
+#
+# A copy of the beam search loop from before the strategies identified words by vocabulary
+# index is kept here, so the gain of the index-based state can be measured again at any time.
+
+import heapq
+import json
+import logging
+import os
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+from gensim.models import KeyedVectors
+from src.benchmark import summarize
+from src.configLoader import setup_logging
+from src.initialFiltering import filter_vocabulary, index_glossary, order_by_frequency
+from src.invalidWordStore import InvalidWordStore
+from src.modelCache import CHUNK_ROWS, build_model_cache, load_model, save_word2vec_binary
+from src.modelTombstones import compact_model, removed_mask
+from src.searchStrategies import BeamSearchStrategy
+from src.vectorIndex import VectorIndex
+
+# Share of the synthetic vocabulary already known as invalid or removed from the model
+INVALID_SHARE = 0.01
+
+# Number of scored words the beam is chosen from in the beam_round benchmark
+SCORED_WORDS = 200
+
+# Number of invalid words removed from the model at the end of a solve in the model_filter benchmark
+DAILY_INVALID_WORDS = 50
+
+# Number of requests of the simulated beam sessions in the beam_session benchmarks
+SESSION_REQUESTS = 200
+
+# Measure compared with the baseline: the fastest run is the least disturbed by the rest of the machine
+COMPARED_MEASURE = "min"
+
+logger = logging.getLogger(__name__)
+
+
+def synthetic_words(count, rng):
+    """
+    Generate a random vocabulary.
+
+    Most words are lowercase letters, some contain a hyphen and some start with a quote,
+    so every check of the glossary filtering is exercised.
+
+    :param int count: Number of words.
+    :param numpy.random.Generator rng: Random generator.
+    :returns: The unique words.
+    :rtype: list
+    """
+    letters = np.array(list("abcdefghijklmnopqrstuvwxyzéèàç"))
+    lengths = rng.integers(3, 12, size=count)
+    chars = letters[rng.integers(len(letters), size=(count, 12))]
+    words = []
+    for i, (length, row) in enumerate(zip(lengths.tolist(), chars)):
+        word = "".join(row[:length]) + np.base_repr(i, 36).lower()
+        draw = rng.random()
+        if draw < 0.02:
+            word = word[:length // 2] + "-" + word[length // 2:]
+        elif draw < 0.03:
+            word = "'" + word
+        words.append(word)
+    return words
+
+
+def synthetic_glossary(words, rng):
+    """
+    Generate a random glossary of a vocabulary, in the Lexique format.
+
+    90% of the words are in the glossary, some of them are plural or conjugated, and some
+    have a second entry.
+
+    :param list words: The vocabulary.
+    :param numpy.random.Generator rng: Random generator.
+    :returns: The glossary, with the ``ortho``, ``nombre``, ``cgram``, ``freqfilms2`` and ``freqlivres`` columns.
+    :rtype: pandas.DataFrame
+    """
+    known = np.asarray(words, dtype=object)[rng.random(len(words)) < 0.9]
+    ortho = np.concatenate([known, known[rng.random(len(known)) < 0.2]])
+    draw = rng.random(len(ortho))
+    return pd.DataFrame({
+        "ortho": ortho,
+        "nombre": np.where(draw < 0.1, "p", "s"),
+        "cgram": np.where(draw > 0.85, "VER", "NOM"),
+        "freqfilms2": rng.exponential(10, len(ortho)),
+        "freqlivres": rng.exponential(10, len(ortho))
+    })
+
+
+def write_synthetic_model(folder, words, dims, rng):
+    """
+    Write a random word2vec binary model and build its cache.
+
+    The vectors are generated chunk by chunk in a memory-mapped file, so a large model
+    never needs to fit in memory.
+
+    :param str folder: Folder of the model files.
+    :param list words: The vocabulary.
+    :param int dims: Dimension of the vectors.
+    :param numpy.random.Generator rng: Random generator.
+    :returns: A tuple (model path, cache path).
+    :rtype: tuple
+    """
+    vectors = np.lib.format.open_memmap(os.path.join(folder, "vectors.npy"), mode="w+", dtype=np.float32,
+                                        shape=(len(words), dims))
+    for start in range(0, len(words), CHUNK_ROWS):
+        stop = min(len(words), start + CHUNK_ROWS)
+        vectors[start:stop] = rng.standard_normal((stop - start, dims), dtype=np.float32)
+
+    model_path = os.path.join(folder, "model.bin")
+    cache_dir = os.path.join(folder, "model.cache")
+    save_word2vec_binary(model_path, words, vectors)
+    model = KeyedVectors(vector_size=dims)
+    model.vectors = vectors
+    model.index_to_key = words
+    model.key_to_index = {word: i for i, word in enumerate(words)}
+    build_model_cache(model_path, cache_dir, model)
+    del model, vectors
+    os.remove(os.path.join(folder, "vectors.npy"))
+    return model_path, cache_dir
+
+
+def word_keyed_session(model, config, invalid_words, api, start_words, requests):
+    """
+    Play a beam session the way the solver did before words were identified by index.
+
+    This is a copy of the former solving loop: tested and invalid words are sets of strings,
+    the neighbours of each beam word come from gensim ``most_similar`` and are cached by word,
+    and the beam is a heap of (-score, word) tuples. It is only kept as the reference of the
+    beam_session_words benchmark and of the beam search tests.
+
+    :param KeyedVectors model: The Word2Vec model.
+    :param dict config: Dictionary containing configuration keys (see configLoader).
+    :param set invalid_words: Words that must not be guessed.
+    :param callable api: Function giving the score of a word.
+    :param list start_words: The initial guesses.
+    :param int requests: Maximum number of requests of the session.
+    :returns: The guessed words, in order, until the hidden word is found.
+    :rtype: list
+    """
+    beam_size = config["beam_size"]
+    topn = config["topn"]
+    similar_cache = {}
+    tested = set()
+    daily_invalid_words = set()
+    guessed = []
+    beam = []
+
+    for word in start_words:
+        if word in invalid_words or word in daily_invalid_words:
+            continue
+        if len(guessed) >= requests:
+            return guessed
+        guessed.append(word)
+        score = api(word)
+        tested.add(word)
+        heapq.heappush(beam, (-score, word))
+        if score >= 1.0:
+            return guessed
+
+    while beam:
+        new_candidates = []
+        for _ in range(min(beam_size, len(beam))):
+            _, word = heapq.heappop(beam)
+            if word not in model:
+                continue
+            if word in similar_cache:
+                neighbors = similar_cache[word]
+            else:
+                neighbors = model.most_similar(word, topn=topn)
+                similar_cache[word] = neighbors
+            for neigh, _ in neighbors:
+                if neigh in tested or neigh in invalid_words or neigh in daily_invalid_words:
+                    continue
+                if len(guessed) >= requests:
+                    return guessed
+                guessed.append(neigh)
+                score = api(neigh)
+                tested.add(neigh)
+                heapq.heappush(new_candidates, (-score, neigh))
+                if score >= 1.0:
+                    return guessed
+
+        for item in new_candidates:
+            heapq.heappush(beam, item)
+        beam = heapq.nsmallest(beam_size, beam)
+        if not new_candidates:
+            break
+    return guessed
+
+
+def index_session(index, config, excluded, api, start_words, requests):
+    """
+    Play a beam session with the index-based state of the solver.
+
+    :param VectorIndex index: The indexed Word2Vec model.
+    :param dict config: Dictionary containing configuration keys (see configLoader).
+    :param numpy.ndarray excluded: Mask of the vocabulary words that must not be guessed, updated in place.
+    :param callable api: Function giving the score of a word.
+    :param list start_words: The initial guesses.
+    :param int requests: Maximum number of requests of the session.
+    :returns: The guessed words, in order, until the hidden word is found.
+    :rtype: list
+    """
+    strategy = BeamSearchStrategy(index, config, excluded)
+    guessed = []
+    guesses = np.asarray([index.key_to_index[word] for word in start_words], dtype=np.int32)
+    guesses = guesses[~excluded[guesses]]
+    try:
+        while len(guesses):
+            for idx in guesses.tolist():
+                if len(guessed) >= requests:
+                    return guessed
+                excluded[idx] = True
+                # Strings are only used at the API boundary
+                word = index.words[idx]
+                guessed.append(word)
+                score = api(word)
+                strategy.observe(idx, score)
+                if score >= 1.0:
+                    return guessed
+            guesses = strategy.next_guesses()
+            guesses = guesses[~excluded[guesses]]
+    finally:
+        strategy.close()
+    return guessed
+
+
+def measure(function, repeat, setup=None):
+    """
+    Time a function several times.
+
+    :param callable function: The function to time. It gets the result of ``setup``, if any.
+    :param int repeat: Number of measures.
+    :param callable setup: (Optional) Function called before each measure, not timed.
+    :returns: The durations, in seconds.
+    :rtype: list
+    """
+    times = []
+    for _ in range(repeat):
+        args = (setup(),) if setup is not None else ()
+        start = time.perf_counter()
+        function(*args)
+        times.append(round(time.perf_counter() - start, 6))
+    return times
+
+
+def compare_with_baseline(benchmarks, baseline, tolerance):
+    """
+    Compare the fastest time of each benchmark with a baseline.
+
+    :param dict benchmarks: Distribution of the durations of each benchmark (see summarize).
+    :param dict baseline: Results of a previous run (see run_microbenchmarks).
+    :param float tolerance: Accepted slowdown, e.g. 0.2 for 20%.
+    :returns: For each benchmark of both runs, the baseline and current fastest times, their ratio, and whether
+        it is a regression.
+    :rtype: dict
+    """
+    comparison = {}
+    for name, measures in benchmarks.items():
+        previous = baseline["benchmarks"].get(name, {}).get(COMPARED_MEASURE)
+        if not previous:
+            continue
+        ratio = measures[COMPARED_MEASURE] / previous
+        comparison[name] = {
+            "baseline": previous,
+            "current": measures[COMPARED_MEASURE],
+            "ratio": round(ratio, 3),
+            "regression": ratio > 1 + tolerance
+        }
+    return comparison
+
+
+def run_microbenchmarks(cfg, words=100000, dims=300, repeat=5, seed=0, only=None,
+                        baseline_path=None, tolerance=0.2, output_path=None):
+    """
+    Time the hot paths of the solver and of init on a synthetic model and glossary.
+
+    The benchmarks are:
+        - model_load_binary: parse the word2vec binary (init, or solve without cache)
+        - model_load_cache: memory-map the model cache and compute the norms (solve)
+        - exclusion_mask: mask of the removed and invalid words (solve)
+        - beam_neighbors: nearest neighbours of a beam in the whole vocabulary
+        - beam_neighbors_hot: the same in the hot tier, if ``hot_vocabulary_size`` is set
+        - beam_round: a beam search round, i.e. beam selection, neighbours and candidates filtering
+        - beam_session_words: a beam session of ``SESSION_REQUESTS`` requests, with the former word-keyed state
+        - beam_session_indices: the same session with the index-based state of the solver
+        - glossary_index: indexing of the glossary (init)
+        - glossary_filter: glossary checks of the vocabulary and frequency sort (init)
+        - model_filter: rewrite of the model and its cache without the invalid words of a solve
+
+    The files live in a temporary folder (see ``TMPDIR``), the real model is never used.
+
+    :param dict cfg: Configuration dictionary (see configLoader), for the beam search settings.
+    :param int words: Number of words of the synthetic model.
+    :param int dims: Dimension of the synthetic vectors.
+    :param int repeat: Number of measures of each benchmark.
+    :param int seed: Seed of the synthetic model and glossary.
+    :param list only: (Optional) Names of the benchmarks to run. If None, every benchmark is run.
+    :param str baseline_path: (Optional) Path of a JSON file written by a previous run to compare with.
+    :param float tolerance: Accepted slowdown compared with the baseline, e.g. 0.2 for 20%.
+    :param str output_path: (Optional) Path of a JSON file to write the results to.
+    :raises ValueError: If a benchmark name is unknown.
+    :returns: The results: configuration, distribution of the durations of each benchmark, the time per
+        request of both beam sessions if they were run, and the comparison with the baseline and the names of
+        the slower benchmarks if a baseline is given.
+    :rtype: dict
+    """
+    setup_logging(cfg.get("log_level", "INFO"), cfg.get("log_file", None))
+    rng = np.random.default_rng(seed)
+    beam_cfg = dict(cfg, prefetch_workers=0, hot_vocabulary_size=0)
+    hot_size = cfg.get("hot_vocabulary_size", 0)
+
+    with tempfile.TemporaryDirectory(prefix="microbench-") as tmp:
+        logger.info("Generating a synthetic model of %d words × %d dimensions in %s", words, dims, tmp)
+        vocabulary = synthetic_words(words, rng)
+        glossary_df = synthetic_glossary(vocabulary, rng)
+        model_path, cache_dir = write_synthetic_model(tmp, vocabulary, dims, rng)
+
+        model = load_model(model_path, cache_dir)
+        index = VectorIndex(model)
+        picked = rng.choice(words, size=2 * int(INVALID_SHARE * words), replace=False)
+        tombstones = {vocabulary[row] for row in picked[::2].tolist()}
+        invalid_path = os.path.join(tmp, "invalid_words.txt")
+        invalid_words = InvalidWordStore(invalid_path)
+        invalid_words.add({vocabulary[row] for row in picked[1::2].tolist()})
+        excluded = removed_mask(model, tombstones) | invalid_words.mask(model.key_to_index, words)
+        glossary = index_glossary(glossary_df)
+        beam = rng.choice(words, size=cfg["beam_size"], replace=False).tolist()
+
+        def beam_strategy():
+            scored = rng.choice(np.flatnonzero(~excluded), size=SCORED_WORDS, replace=False)
+            strategy = BeamSearchStrategy(index, beam_cfg, excluded.copy())
+            for idx, score in zip(scored.tolist(), rng.random(SCORED_WORDS).tolist()):
+                strategy.excluded[idx] = True
+                strategy.observe(idx, score)
+            return strategy
+
+        # Words the former solver could not guess: removed words were deleted from its model
+        skipped_words = tombstones | invalid_words.words
+
+        def beam_session():
+            # A random target, so that no session ends early on the hidden word
+            target = rng.standard_normal(dims).astype(np.float32)
+            scores = dict(zip(vocabulary, index.similarities(target / np.linalg.norm(target)).tolist()))
+            start_words = [vocabulary[row] for row in rng.choice(np.flatnonzero(~excluded), size=3, replace=False).tolist()]
+            return scores.__getitem__, start_words
+
+        def daily_invalid_words():
+            model = load_model(model_path, cache_dir)
+            rows = rng.choice(len(model.index_to_key), size=DAILY_INVALID_WORDS, replace=False)
+            return [model.index_to_key[row] for row in rows.tolist()]
+
+        benchmarks = {
+            "model_load_binary": (lambda: KeyedVectors.load_word2vec_format(model_path, binary=True,
+                                                                           unicode_errors="ignore"), None),
+            "model_load_cache": (lambda: VectorIndex(load_model(model_path, cache_dir)), None),
+            "exclusion_mask": (lambda: removed_mask(model, tombstones) | invalid_words.mask(model.key_to_index, words),
+                               None),
+            "beam_neighbors": (lambda: index.nearest_batch(beam, cfg["topn"]), None),
+            "beam_neighbors_hot": (lambda: index.nearest_batch(beam, cfg["topn"], hot_size), None),
+            "beam_round": (lambda strategy: strategy.next_guesses(), beam_strategy),
+            "beam_session_words": (lambda session: word_keyed_session(model, beam_cfg, skipped_words, *session,
+                                                                      SESSION_REQUESTS), beam_session),
+            "beam_session_indices": (lambda session: index_session(index, beam_cfg, excluded.copy(), *session,
+                                                                   SESSION_REQUESTS), beam_session),
+            "glossary_index": (lambda: index_glossary(glossary_df), None),
+            "glossary_filter": (lambda: order_by_frequency(
+                vocabulary, glossary, filter_vocabulary(vocabulary, glossary, invalid_words.words)), None),
+            # Last, as it removes words from the synthetic model
+            "model_filter": (lambda removed: compact_model(model_path, cache_dir, None, removed), daily_invalid_words)
+        }
+        if not 0 < hot_size < words:
+            del benchmarks["beam_neighbors_hot"]
+        unknown = set(only or ()) - set(benchmarks)
+        if unknown:
+            raise ValueError(f"Unknown benchmarks: {', '.join(sorted(unknown))}")
+
+        results = {
+            "config": {
+                "words": words,
+                "dims": dims,
+                "repeat": repeat,
+                "seed": seed,
+                "beam_size": cfg["beam_size"],
+                "topn": cfg["topn"],
+                "hot_vocabulary_size": hot_size
+            },
+            "benchmarks": {}
+        }
+        for name, (function, setup) in benchmarks.items():
+            if only and name not in only:
+                continue
+            # The logs of the measured functions are muted, and one warm-up run is done so the first
+            # measure does not pay for the page cache
+            logging.disable(logging.INFO)
+            try:
+                measure(function, 1, setup)
+                results["benchmarks"][name] = summarize(measure(function, repeat, setup))
+            finally:
+                logging.disable(logging.NOTSET)
+            logger.info("  %-20s %s", name, ", ".join(f"{k}={v * 1000:.2f} ms"
+                                                      for k, v in results["benchmarks"][name].items()))
+
+    sessions = {name: results["benchmarks"][f"beam_session_{name}"][COMPARED_MEASURE] / SESSION_REQUESTS
+                for name in ("words", "indices") if f"beam_session_{name}" in results["benchmarks"]}
+    if len(sessions) == 2:
+        results["state_comparison"] = {
+            "words_per_request": sessions["words"],
+            "indices_per_request": sessions["indices"],
+            "speedup": round(sessions["words"] / sessions["indices"], 3)
+        }
+        logger.info("Beam session state: %.1f µs per request with words, %.1f µs with indices (×%.2f)",
+                    sessions["words"] * 1e6, sessions["indices"] * 1e6, results["state_comparison"]["speedup"])
+
+    if baseline_path:
+        with open(baseline_path, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if any(baseline["config"].get(key) != results["config"][key] for key in ("words", "dims")):
+            logger.warning("Baseline %s was measured on a model of another size", baseline_path)
+        results["comparison"] = compare_with_baseline(results["benchmarks"], baseline, tolerance)
+        results["regressions"] = [name for name, entry in results["comparison"].items() if entry["regression"]]
+        for name, entry in results["comparison"].items():
+            logger.info("  %-20s %.2f ms → %.2f ms (×%.2f)%s", name, entry["baseline"] * 1000, entry["current"] * 1000,
+                        entry["ratio"], "  SLOWER" if entry["regression"] else "")
+        if results["regressions"]:
+            logger.error("Benchmarks slower than the baseline by more than %.0f%%: %s",
+                         100 * tolerance, ", ".join(results["regressions"]))
+
+    if output_path:
+        with open(output_path, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        logger.info("Micro-benchmark results saved to %s", output_path)
+    return results
@@ -0,0 +1,223 @@
+##
+# @file modelCache.py
+# @brief Module to build and load a memory-mapped cache of the Word2Vec model.
+#
+# Parsing the word2vec binary is the slowest part of a solver run. This module compiles
+# the model once into a raw ``.npy`` matrix plus a vocabulary index, which the solver
+# memory-maps read-only: startup becomes near-instant and several solver processes
+# share the same physical pages.
+
+import json
+import logging
+import os
+import numpy as np
+from gensim.models import KeyedVectors
+
+VECTORS_FILE = "vectors.npy"
+VOCAB_FILE = "vocab.txt"
+META_FILE = "meta.json"
+
+# Number of rows copied at once when a model is rewritten
+CHUNK_ROWS = 4096
+
+logger = logging.getLogger(__name__)
+
+
+def model_signature(model_path):
+    """
+    Build a signature of the word2vec binary used to detect a stale cache.
+
+    :param str model_path: Path to the word2vec binary model.
+    :returns: A dictionary with the size and modification time of the file.
+    :rtype: dict
+    """
+    stat = os.stat(model_path)
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def read_cache_meta(cache_dir):
+    """
+    Read the metadata of the cache.
+
+    :param str cache_dir: Path to the cache directory.
+    :returns: The metadata (source signature, word count and vector size), or None if the cache is missing.
+    :rtype: dict or None
+    """
+    try:
+        with open(os.path.join(cache_dir, META_FILE), encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def is_cache_fresh(model_path, cache_dir):
+    """
+    Check if the cache exists and was built from the current word2vec binary.
+
+    :param str model_path: Path to the word2vec binary model.
+    :param str cache_dir: Path to the cache directory.
+    :returns: True if the cache can be used as is, False otherwise.
+    :rtype: bool
+    """
+    meta = read_cache_meta(cache_dir)
+    return meta is not None and meta.get("source") == model_signature(model_path)
+
+
+def _kept_count(keep, count):
+    """
+    Count the kept rows of a matrix.
+
+    :param numpy.ndarray keep: Boolean mask or array of the kept rows, or None to keep every row.
+    :param int count: Number of rows of the matrix.
+    :rtype: int
+    """
+    if keep is None:
+        return count
+    return int(np.count_nonzero(keep)) if keep.dtype == bool else len(keep)
+
+
+def _chunks(keep, count):
+    """
+    Split the kept rows of a matrix into chunks.
+
+    :param numpy.ndarray keep: Boolean mask of the kept rows, array of the kept rows in their new order,
+        or None to keep every row.
+    :param int count: Number of rows of the matrix.
+    :returns: Generator of the arrays of kept row indices, in order.
+    :rtype: generator
+    """
+    if keep is not None and keep.dtype != bool:
+        for start in range(0, len(keep), CHUNK_ROWS):
+            yield np.asarray(keep[start:start + CHUNK_ROWS])
+        return
+    for start in range(0, count, CHUNK_ROWS):
+        stop = min(count, start + CHUNK_ROWS)
+        if keep is None:
+            yield np.arange(start, stop)
+        else:
+            yield start + np.flatnonzero(keep[start:stop])
+
+
+def save_word2vec_binary(path, words, vectors, keep=None):
+    """
+    Write a word2vec binary model from a matrix, without copying it.
+
+    The kept rows are streamed chunk by chunk to a temporary file, which is renamed over
+    ``path`` once fully written, so a crash never leaves a truncated model.
+
+    :param str path: Path to the word2vec binary model to write.
+    :param list words: The vocabulary, in the order of the matrix rows.
+    :param numpy.ndarray vectors: The (vocabulary × dimension) matrix, possibly memory-mapped.
+    :param numpy.ndarray keep: (Optional) Boolean mask of the words to write, or array of the rows to write
+        in their new order. If None, every word is written.
+    :returns: The number of words written.
+    :rtype: int
+    """
+    count = _kept_count(keep, len(words))
+    with open(path + ".tmp", "wb") as f:
+        f.write(f"{count} {vectors.shape[1]}\n".encode("utf-8"))
+        for rows in _chunks(keep, len(words)):
+            block = np.asarray(vectors[rows], dtype=np.float32)
+            f.write(b"".join(f"{words[row]} ".encode("utf-8") + vector.tobytes()
+                             for row, vector in zip(rows.tolist(), block)))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(path + ".tmp", path)
+    return count
+
+
+def build_model_cache(model_path, cache_dir, model=None, keep=None):
+    """
+    Compile the word2vec binary into the memory-mappable cache format.
+
+    Every file is written next to its final name then renamed, and the metadata file is
+    written last, so a crash never leaves a cache that looks fresh but is truncated.
+
+    :param str model_path: Path to the word2vec binary model the cache is built from.
+    :param str cache_dir: Path to the cache directory (created if needed).
+    :param KeyedVectors model: (Optional) Already loaded model matching ``model_path``, or whose
+        kept rows match it.
+    :param numpy.ndarray keep: (Optional) Boolean mask (or ordered array) of the rows of ``model`` written to
+        ``model_path``. The cache is then built from these rows only, without copying the matrix.
+    """
+    if model is None:
+        logger.info("Loading model '%s' to build cache", model_path)
+        model = KeyedVectors.load_word2vec_format(model_path, binary=True, unicode_errors="ignore")
+
+    os.makedirs(cache_dir, exist_ok=True)
+    meta_path = os.path.join(cache_dir, META_FILE)
+    if os.path.exists(meta_path):
+        os.remove(meta_path)
+
+    total = len(model.index_to_key)
+    count = _kept_count(keep, total)
+    vectors_path = os.path.join(cache_dir, VECTORS_FILE)
+    vectors = np.lib.format.open_memmap(vectors_path + ".tmp", mode="w+", dtype=np.float32,
+                                        shape=(count, model.vector_size))
+    vocab_path = os.path.join(cache_dir, VOCAB_FILE)
+    with open(vocab_path + ".tmp", "w", encoding="utf-8") as f:
+        position = 0
+        for rows in _chunks(keep, total):
+            vectors[position:position + len(rows)] = model.vectors[rows]
+            position += len(rows)
+            f.write("".join(f"{model.index_to_key[row]}\n" for row in rows.tolist()))
+    vectors.flush()
+    del vectors
+    os.replace(vectors_path + ".tmp", vectors_path)
+    os.replace(vocab_path + ".tmp", vocab_path)
+
+    meta = {
+        "source": model_signature(model_path),
+        "count": count,
+        "vector_size": model.vector_size
+    }
+    with open(meta_path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+    os.replace(meta_path + ".tmp", meta_path)
+    logger.info("Model cache built in %s (%d words)", cache_dir, meta["count"])
+
+
+def load_cached_model(cache_dir):
+    """
+    Memory-map the cached model read-only.
+
+    :param str cache_dir: Path to the cache directory.
+    :returns: The model backed by the memory-mapped matrix.
+    :rtype: KeyedVectors
+    """
+    vectors = np.load(os.path.join(cache_dir, VECTORS_FILE), mmap_mode="r")
+    with open(os.path.join(cache_dir, VOCAB_FILE), encoding="utf-8") as f:
+        words = f.read().split("\n")[:-1]
+
+    model = KeyedVectors(vector_size=vectors.shape[1])
+    model.vectors = vectors
+    model.index_to_key = words
+    model.key_to_index = {word: i for i, word in enumerate(words)}
+    return model
+
+
+def load_model(model_path, cache_dir=None):
+    """
+    Load the Word2Vec model, from the cache when it is fresh.
+
+    When the cache is missing or stale, the word2vec binary is parsed and the cache is
+    rebuilt so the next run can memory-map it.
+
+    :param str model_path: Path to the word2vec binary model.
+    :param str cache_dir: (Optional) Path to the cache directory. If None, the cache is not used.
+    :returns: The loaded model.
+    :rtype: KeyedVectors
+    """
+    if cache_dir and is_cache_fresh(model_path, cache_dir):
+        logger.info("Memory-mapping model cache '%s'", cache_dir)
+        return load_cached_model(cache_dir)
+
+    logger.info("Loading model '%s'", model_path)
+    model = KeyedVectors.load_word2vec_format(model_path, binary=True, unicode_errors="ignore")
+    if cache_dir:
+        logger.warning("Model cache '%s' is missing or stale, rebuilding it", cache_dir)
+        try:
+            build_model_cache(model_path, cache_dir, model)
+        except OSError as e:
+            logger.error("Failed to build model cache: %s", e)
+    return model
@@ -0,0 +1,113 @@
+##
+# @file modelTombstones.py
+# @brief Module to remove words from the model through a tombstone sidecar file.
+#
+# Rewriting the whole word2vec binary for a handful of daily invalid words is slow and
+# makes a huge git diff. Removed words are instead appended to a small sidecar file
+# (one word per line) that the solver applies at load time. The binary is only compacted
+# when the sidecar grows past a threshold, or with the ``compact`` command.
+
+import logging
+import os
+import numpy as np
+from src.configLoader import setup_logging
+from src.modelCache import build_model_cache, load_model, read_cache_meta, save_word2vec_binary
+from src.neighborTable import compact_neighbor_table
+
+logger = logging.getLogger(__name__)
+
+
+def load_tombstones(path):
+    """
+    Load the words removed from the model since the last compaction.
+
+    :param str path: Path to the tombstone sidecar file.
+    :returns: The set of removed words, empty if the file does not exist.
+    :rtype: set
+    """
+    try:
+        with open(path, encoding="utf-8") as f:
+            return {line.rstrip("\n") for line in f if line.strip()}
+    except FileNotFoundError:
+        return set()
+
+
+def append_tombstones(path, words):
+    """
+    Append removed words to the tombstone sidecar file.
+
+    :param str path: Path to the tombstone sidecar file.
+    :param iterable words: The words to remove from the model.
+    """
+    with open(path, "a", encoding="utf-8") as f:
+        for word in words:
+            f.write(f"{word}\n")
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def removed_mask(model, tombstones):
+    """
+    Compute the mask of the removed words, aligned with the model vocabulary.
+
+    :param KeyedVectors model: The Word2Vec model.
+    :param set tombstones: The removed words.
+    :returns: A boolean mask, True for removed words.
+    :rtype: numpy.ndarray
+    """
+    mask = np.zeros(len(model.index_to_key), dtype=bool)
+    for word in tombstones:
+        idx = model.key_to_index.get(word)
+        if idx is not None:
+            mask[idx] = True
+    return mask
+
+
+def clear_tombstones(path):
+    """
+    Empty the tombstone sidecar file, once the removed words are no longer in the model binary.
+
+    :param str path: Path to the tombstone sidecar file.
+    """
+    if os.path.exists(path):
+        open(path, "w", encoding="utf-8").close()
+
+
+def compact_model(model_path, cache_dir, tombstones_path, extra_words=()):
+    """
+    Rewrite the model binary without the removed words, then clear the sidecar.
+
+    :param str model_path: Path to the word2vec binary model.
+    :param str cache_dir: Path to the model cache directory, or None.
+    :param str tombstones_path: Path to the tombstone sidecar file, or None.
+    :param iterable extra_words: Other words to remove from the model.
+    """
+    tombstones = load_tombstones(tombstones_path) if tombstones_path else set()
+    tombstones.update(extra_words)
+    if not tombstones:
+        logger.info("No removed words, nothing to compact")
+        return
+
+    model = load_model(model_path, cache_dir)
+    cache_meta = read_cache_meta(cache_dir) if cache_dir else None
+    keep = ~removed_mask(model, tombstones)
+    kept_count = save_word2vec_binary(model_path, model.index_to_key, model.vectors, keep)
+    logger.info("Compacted model saved to %s with %d words (%d removed)", model_path, kept_count, int((~keep).sum()))
+
+    if cache_dir:
+        build_model_cache(model_path, cache_dir, model, keep)
+        if cache_meta:
+            compact_neighbor_table(cache_dir, keep, cache_meta["source"])
+    if tombstones_path:
+        clear_tombstones(tombstones_path)
+
+
+def compact_model_from_config(cfg):
+    """
+    Compact the model binary with the tombstone sidecar given in the config.
+
+    :param dict cfg: Configuration dictionary (see configLoader).
+    :returns: None
+    """
+    setup_logging(cfg.get("log_level", "INFO"), cfg.get("log_file", None))
+    compact_model(cfg["model_path"], cfg["model_cache_path"], cfg["tombstones_path"])
@@ -0,0 +1,210 @@
+##
+# @file neighborTable.py
+# @brief Module to precompute the nearest neighbours of every word of the model.
+#
+# ``most_similar`` costs a dot product against the whole vocabulary plus a sort. The
+# init command precomputes the top-K neighbours of every word, in parallel blocks, and
+# stores them next to the model cache as memory-mappable int32 index and float16
+# similarity arrays. The solver then gets the neighbours of a word with one lookup.
+
+import json
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from src.modelCache import read_cache_meta
+
+INDICES_FILE = "neighbors_idx.npy"
+SIMILARITIES_FILE = "neighbors_sim.npy"
+META_FILE = "neighbors.json"
+
+# Memory used by the similarity block of one worker
+BLOCK_BYTES = 64 * 1024 * 1024
+
+logger = logging.getLogger(__name__)
+
+
+class NeighborTable:
+    """
+    Memory-mapped table of the top-K neighbours of each word.
+
+    Row ``i`` holds the vocabulary indices of the neighbours of word ``i``, most similar
+    first. Entries of words removed by a compaction are set to -1.
+    """
+
+    def __init__(self, indices, similarities):
+        """
+        Wrap the table arrays.
+
+        :param numpy.ndarray indices: (vocabulary × K) int32 array of neighbour indices.
+        :param numpy.ndarray similarities: (vocabulary × K) float16 array of neighbour similarities.
+        """
+        self.indices = indices
+        self.similarities = similarities
+        self.k = indices.shape[1]
+
+    def neighbors(self, idx, topn, removed, limit=None):
+        """
+        Get the nearest neighbours of a word, skipping the removed words.
+
+        :param int idx: Vocabulary index of the word.
+        :param int topn: Number of neighbours to return.
+        :param numpy.ndarray removed: Boolean mask of the removed words.
+        :param int limit: (Optional) Only the words whose index is below ``limit`` are neighbours.
+        :returns: A tuple (indices, similarities) of arrays, or None if the table does not hold
+            enough neighbours (the caller must then compute them).
+        :rtype: tuple or None
+        """
+        row = self.indices[idx]
+        valid = (row >= 0) if limit is None else (row >= 0) & (row < limit)
+        valid[valid] = ~removed[row[valid]]
+        kept = np.flatnonzero(valid)[:topn]
+        if len(kept) < topn:
+            return None
+        return row[kept], self.similarities[idx, kept].astype(np.float32)
+
+
+def _nearest_block(vectors, norms, start, stop, k):
+    """
+    Compute the top-K neighbours of a block of rows.
+
+    :param numpy.ndarray vectors: The model matrix.
+    :param numpy.ndarray norms: The norms of the model vectors.
+    :param int start: First row of the block.
+    :param int stop: Row after the last one of the block.
+    :param int k: Number of neighbours per row.
+    :returns: A tuple (indices, similarities) of (block × K) arrays, most similar first.
+    :rtype: tuple
+    """
+    block = np.asarray(vectors[start:stop], dtype=np.float32) / norms[start:stop, None]
+    sims = np.dot(block, np.asarray(vectors, dtype=np.float32).T) / norms[None, :]
+    sims[np.arange(stop - start), np.arange(start, stop)] = -np.inf
+
+    best = np.argpartition(sims, -k, axis=1)[:, -k:]
+    best_sims = np.take_along_axis(sims, best, axis=1)
+    order = np.argsort(-best_sims, axis=1, kind="stable")
+    return np.take_along_axis(best, order, axis=1), np.take_along_axis(best_sims, order, axis=1)
+
+
+def _write_meta(cache_dir, source, k):
+    """
+    Write the table metadata, marking the table as built from the given cache.
+
+    :param str cache_dir: Path to the model cache directory.
+    :param dict source: Signature of the model the cache was built from.
+    :param int k: Number of neighbours per word.
+    """
+    meta_path = os.path.join(cache_dir, META_FILE)
+    with open(meta_path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump({"source": source, "k": k}, f)
+    os.replace(meta_path + ".tmp", meta_path)
+
+
+def build_neighbor_table(model, cache_dir, k, workers=0):
+    """
+    Precompute the top-K neighbours of every word of the model.
+
+    The rows are computed in blocks by a pool of threads (NumPy releases the GIL during the
+    matrix products) and written straight into memory-mapped output files.
+
+    :param KeyedVectors model: The Word2Vec model, matching the model cache.
+    :param str cache_dir: Path to the model cache directory, where the table is stored.
+    :param int k: Number of neighbours per word.
+    :param int workers: Number of threads, 0 to use every core.
+    """
+    cache_meta = read_cache_meta(cache_dir)
+    if cache_meta is None:
+        logger.error("No model cache in '%s', cannot build the neighbour table", cache_dir)
+        return
+
+    count = len(model.index_to_key)
+    k = min(k, count - 1)
+    if k <= 0:
+        return
+    model.fill_norms()
+    norms = model.norms
+    block_size = max(1, min(count, BLOCK_BYTES // (4 * count)))
+    workers = workers or os.cpu_count() or 1
+    logger.info("Building neighbour table: %d words, top %d, %d threads", count, k, workers)
+
+    meta_path = os.path.join(cache_dir, META_FILE)
+    if os.path.exists(meta_path):
+        os.remove(meta_path)
+    indices_path = os.path.join(cache_dir, INDICES_FILE)
+    sims_path = os.path.join(cache_dir, SIMILARITIES_FILE)
+    indices = np.lib.format.open_memmap(indices_path + ".tmp", mode="w+", dtype=np.int32, shape=(count, k))
+    sims = np.lib.format.open_memmap(sims_path + ".tmp", mode="w+", dtype=np.float16, shape=(count, k))
+
+    def fill(start):
+        stop = min(count, start + block_size)
+        block_indices, block_sims = _nearest_block(model.vectors, norms, start, stop, k)
+        indices[start:stop] = block_indices
+        sims[start:stop] = block_sims
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for i, _ in enumerate(executor.map(fill, range(0, count, block_size))):
+            if i % 100 == 0:
+                logger.info("Neighbour table progress: %.2f%%", 100 * i * block_size / count)
+
+    indices.flush()
+    sims.flush()
+    del indices, sims
+    os.replace(indices_path + ".tmp", indices_path)
+    os.replace(sims_path + ".tmp", sims_path)
+    _write_meta(cache_dir, cache_meta["source"], k)
+    logger.info("Neighbour table saved in %s", cache_dir)
+
+
+def compact_neighbor_table(cache_dir, keep, previous_source):
+    """
+    Remap the neighbour table after rows have been removed from the model and the cache rebuilt.
+
+    Neighbours pointing to removed words are set to -1, so the table stays consistent
+    without recomputing it.
+
+    :param str cache_dir: Path to the model cache directory.
+    :param numpy.ndarray keep: Boolean mask of the kept words, over the old vocabulary.
+    :param dict previous_source: Signature of the model before the compaction, the table must match it.
+    """
+    table = load_neighbor_table(cache_dir, previous_source)
+    cache_meta = read_cache_meta(cache_dir)
+    if table is None or cache_meta is None:
+        return
+    remap = np.where(keep, np.cumsum(keep) - 1, -1).astype(np.int32)
+    old_indices = np.asarray(table.indices[keep])
+    indices = np.where(old_indices >= 0, remap[np.maximum(old_indices, 0)], -1).astype(np.int32)
+    sims = np.asarray(table.similarities[keep])
+    del table
+
+    for name, array in ((INDICES_FILE, indices), (SIMILARITIES_FILE, sims)):
+        path = os.path.join(cache_dir, name)
+        with open(path + ".tmp", "wb") as f:
+            np.save(f, array)
+        os.replace(path + ".tmp", path)
+    _write_meta(cache_dir, cache_meta["source"], indices.shape[1])
+    logger.info("Neighbour table remapped (%d words removed)", int((~keep).sum()))
+
+
+def load_neighbor_table(cache_dir, source=None):
+    """
+    Memory-map the neighbour table read-only.
+
+    :param str cache_dir: Path to the model cache directory.
+    :param dict source: (Optional) Signature of the model the table must have been built from.
+        If None, the table must match the current model cache.
+    :returns: The table, or None if it is missing or was built from another model.
+    :rtype: NeighborTable or None
+    """
+    if source is None:
+        cache_meta = read_cache_meta(cache_dir)
+        source = cache_meta["source"] if cache_meta else None
+    try:
+        with open(os.path.join(cache_dir, META_FILE), encoding="utf-8") as f:
+            meta = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+    if source is None or meta.get("source") != source:
+        logger.warning("Neighbour table in '%s' is stale, run init to rebuild it", cache_dir)
+        return None
+    return NeighborTable(np.load(os.path.join(cache_dir, INDICES_FILE), mmap_mode="r"),
+                         np.load(os.path.join(cache_dir, SIMILARITIES_FILE), mmap_mode="r"))
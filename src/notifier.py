@@ -0,0 +1,95 @@
+##
+# @file notifier.py
+# @brief Contains the Notifier class, sending ntfy notifications from a background thread.
+#
+# Notifications used to shell out to the ntfy CLI, blocking the solver on a subprocess and
+# a network round trip. Messages are now queued and published by a worker thread through
+# the ntfy HTTP API, with a pooled session retrying failed requests. Pending messages are
+# sent before the program exits.
+
+import atexit
+import logging
+import queue
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from src.cemantixClient import RETRY_STATUS
+
+class Notifier:
+    """
+    Background publisher of ntfy notifications.
+    """
+
+    def __init__(self, url, subject, token=None, retries=3, backoff=0.5, timeout=30.0):
+        """
+        Start the worker thread.
+
+        :param str url: Address of the ntfy server, e.g. https://ntfy.sh.
+        :param str subject: Subject (topic) the notifications are published to.
+        :param str token: (Optional) Access token of the ntfy server.
+        :param int retries: Maximum number of retries of a failed request.
+        :param float backoff: Delay (in seconds) before the first retry, doubled at each retry.
+        :param float timeout: Timeout (in seconds) of a request.
+        """
+        self.logger = logging.getLogger(__name__)
+        self.url = f"{url.rstrip('/')}/{subject}"
+        self.timeout = timeout
+
+        self.session = requests.Session()
+        retry = Retry(total=retries, backoff_factor=backoff, status_forcelist=sorted(RETRY_STATUS),
+                      allowed_methods=None, respect_retry_after_header=True)
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=1, max_retries=retry)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        if token:
+            self.session.headers["Authorization"] = f"Bearer {token}"
+
+        self.queue = queue.Queue()
+        self.thread = threading.Thread(target=self.__run, name="notifier", daemon=True)
+        self.thread.start()
+        atexit.register(self.close)
+
+    def send(self, message):
+        """
+        Queue a notification, without waiting for it to be sent.
+
+        :param str message: The notification text.
+        """
+        if self.thread is not None:
+            self.queue.put(message)
+
+    def __publish(self, message):
+        """
+        Publish a notification. Runs in the worker thread.
+
+        :param str message: The notification text.
+        """
+        try:
+            response = self.session.post(self.url, data=message.encode("utf-8"), timeout=self.timeout)
+            response.raise_for_status()
+        except requests.RequestException as e:
+            self.logger.error("Failed to send notification to %s: %s", self.url, e)
+
+    def __run(self):
+        """
+        Publish the queued notifications until the notifier is closed.
+        """
+        while True:
+            message = self.queue.get()
+            if message is None:
+                break
+            self.__publish(message)
+
+    def close(self, timeout=None):
+        """
+        Send the pending notifications and stop the worker thread.
+
+        :param float timeout: (Optional) Maximum time (in seconds) to wait for the pending notifications.
+        """
+        if self.thread is None:
+            return
+        self.queue.put(None)
+        self.thread.join(timeout)
+        self.thread = None
+        self.session.close()
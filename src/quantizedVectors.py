@@ -0,0 +1,252 @@
+##
+# @file quantizedVectors.py
+# @brief Module to store the model vectors with a reduced precision (float16 or int8).
+#
+# The solver only needs cosine similarities, so the vectors can be stored normalized
+# and quantized next to the model cache: float16 halves the memory of the matrix, int8
+# (one float32 scale per row) divides it by four. Similarities are then computed on the
+# quantized matrix, block by block, so the float32 matrix is never read by the solver.
+
+import json
+import logging
+import os
+import numpy as np
+from src.configLoader import setup_logging
+from src.modelCache import load_model, read_cache_meta
+from src.vectorIndex import VectorIndex
+
+PRECISIONS = ("float32", "float16", "int8")
+DATA_FILE = "vectors_{precision}.npy"
+SCALES_FILE = "scales_int8.npy"
+META_FILE = "quantized.json"
+
+# Number of rows converted to float32 at once when computing similarities
+BLOCK_ROWS = 16384
+
+logger = logging.getLogger(__name__)
+
+
+class QuantizedVectors:
+    """
+    Normalized model vectors stored as float16, or as int8 with a scale per row.
+    """
+
+    def __init__(self, data, scales=None):
+        """
+        Wrap the quantized arrays.
+
+        :param numpy.ndarray data: (vocabulary × dimension) float16 or int8 array of the normalized vectors.
+        :param numpy.ndarray scales: (Optional) float32 array of the row scales, required for int8 data.
+        """
+        self.data = data
+        self.scales = scales
+        self.precision = data.dtype.name
+
+    @property
+    def nbytes(self):
+        """
+        Memory used by the quantized arrays, in bytes.
+
+        :rtype: int
+        """
+        return self.data.nbytes + (self.scales.nbytes if self.scales is not None else 0)
+
+    def unit_vectors(self, rows):
+        """
+        Get the normalized vectors of some words.
+
+        :param rows: Vocabulary indices of the words.
+        :type rows: int or numpy.ndarray
+        :returns: The float32 unit vectors, as stored with the reduced precision.
+        :rtype: numpy.ndarray
+        """
+        vectors = np.asarray(self.data[rows], dtype=np.float32)
+        if self.scales is not None:
+            vectors = vectors * np.asarray(self.scales[rows], dtype=np.float32)[..., None]
+        return vectors
+
+    def cosines(self, queries, limit=None):
+        """
+        Compute the cosine similarity between unit vectors and every word of the vocabulary.
+
+        :param numpy.ndarray queries: (queries × dimension) float32 array of unit vectors.
+        :param int limit: (Optional) Only compare the queries to the words whose index is below ``limit``.
+        :returns: (queries × vocabulary) float32 array of similarities, or (queries × limit).
+        :rtype: numpy.ndarray
+        """
+        count = len(self.data) if limit is None else limit
+        sims = np.empty((len(queries), count), dtype=np.float32)
+        for start in range(0, count, BLOCK_ROWS):
+            stop = min(count, start + BLOCK_ROWS)
+            sims[:, start:stop] = np.dot(queries, np.asarray(self.data[start:stop], dtype=np.float32).T)
+        if self.scales is not None:
+            sims *= self.scales[:count]
+        return sims
+
+
+def quantize(vectors, precision):
+    """
+    Normalize and quantize a block of vectors.
+
+    :param numpy.ndarray vectors: (rows × dimension) array of vectors.
+    :param str precision: "float16" or "int8".
+    :returns: A tuple (data, scales), scales being None for float16.
+    :rtype: tuple
+    """
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1)
+    units = vectors / np.where(norms > 0, norms, 1)[:, None]
+    if precision == "float16":
+        return units.astype(np.float16), None
+    scales = np.abs(units).max(axis=1) / 127
+    scales[scales == 0] = 1
+    return np.rint(units / scales[:, None]).astype(np.int8), scales.astype(np.float32)
+
+
+def _quantize_into(vectors, data, scales):
+    """
+    Quantize a whole matrix block by block into preallocated arrays.
+
+    :param numpy.ndarray vectors: (vocabulary × dimension) array of the model vectors.
+    :param numpy.ndarray data: Output float16 or int8 array, same shape as ``vectors``.
+    :param numpy.ndarray scales: Output float32 array of the row scales, or None for float16.
+    """
+    for start in range(0, len(vectors), BLOCK_ROWS):
+        stop = min(len(vectors), start + BLOCK_ROWS)
+        block_data, block_scales = quantize(vectors[start:stop], data.dtype.name)
+        data[start:stop] = block_data
+        if scales is not None:
+            scales[start:stop] = block_scales
+
+
+def build_quantized_vectors(model, cache_dir, precision):
+    """
+    Quantize the model vectors and store them in the model cache.
+
+    The rows are quantized block by block, straight into memory-mapped output files.
+
+    :param KeyedVectors model: The Word2Vec model, matching the model cache.
+    :param str cache_dir: Path to the model cache directory.
+    :param str precision: "float16" or "int8".
+    :raises ValueError: If the precision is unknown.
+    :returns: The quantized vectors, or None if the model cache is missing.
+    :rtype: QuantizedVectors or None
+    """
+    if precision not in PRECISIONS[1:]:
+        raise ValueError(f"Unknown vector precision '{precision}'. Available precisions: {', '.join(PRECISIONS)}")
+    cache_meta = read_cache_meta(cache_dir)
+    if cache_meta is None:
+        logger.error("No model cache in '%s', cannot quantize the vectors", cache_dir)
+        return None
+
+    meta_path = os.path.join(cache_dir, META_FILE)
+    if os.path.exists(meta_path):
+        os.remove(meta_path)
+
+    count, dimension = model.vectors.shape
+    data_path = os.path.join(cache_dir, DATA_FILE.format(precision=precision))
+    scales_path = os.path.join(cache_dir, SCALES_FILE)
+    data = np.lib.format.open_memmap(data_path + ".tmp", mode="w+", dtype=precision, shape=(count, dimension))
+    scales = None
+    if precision == "int8":
+        scales = np.lib.format.open_memmap(scales_path + ".tmp", mode="w+", dtype=np.float32, shape=(count,))
+    _quantize_into(model.vectors, data, scales)
+
+    data.flush()
+    del data
+    os.replace(data_path + ".tmp", data_path)
+    if scales is not None:
+        scales.flush()
+        del scales
+        os.replace(scales_path + ".tmp", scales_path)
+
+    with open(meta_path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump({"source": cache_meta["source"], "precision": precision}, f)
+    os.replace(meta_path + ".tmp", meta_path)
+    logger.info("Model vectors quantized to %s in %s", precision, cache_dir)
+    return load_quantized_vectors(cache_dir, precision)
+
+
+def load_quantized_vectors(cache_dir, precision):
+    """
+    Memory-map the quantized vectors read-only.
+
+    :param str cache_dir: Path to the model cache directory.
+    :param str precision: "float16" or "int8".
+    :returns: The quantized vectors, or None if they are missing, have another precision or were built from another model.
+    :rtype: QuantizedVectors or None
+    """
+    cache_meta = read_cache_meta(cache_dir)
+    try:
+        with open(os.path.join(cache_dir, META_FILE), encoding="utf-8") as f:
+            meta = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+    if cache_meta is None or meta.get("source") != cache_meta["source"] or meta.get("precision") != precision:
+        return None
+
+    data = np.load(os.path.join(cache_dir, DATA_FILE.format(precision=precision)), mmap_mode="r")
+    scales = None
+    if precision == "int8":
+        scales = np.load(os.path.join(cache_dir, SCALES_FILE), mmap_mode="r")
+    return QuantizedVectors(data, scales)
+
+
+def recall_report(model, precisions=PRECISIONS[1:], k=20, sample=1000, seed=0):
+    """
+    Measure how well each precision keeps the nearest neighbours found with float32 vectors.
+
+    :param KeyedVectors model: The Word2Vec model.
+    :param list precisions: The precisions to evaluate.
+    :param int k: Number of neighbours compared for each word.
+    :param int sample: Number of words sampled from the vocabulary.
+    :param int seed: Seed of the word sampling.
+    :returns: A dictionary mapping each precision to its mean top-K recall, and its memory in bytes and
+        relative to float32.
+    :rtype: dict
+    """
+    count = len(model.index_to_key)
+    rows = np.random.default_rng(seed).choice(count, min(sample, count), replace=False)
+    batches = [rows[start:start + 64].tolist() for start in range(0, len(rows), 64)]
+    reference = VectorIndex(model)
+    expected = [set(indices.tolist()) for batch in batches for indices, _ in reference.nearest_batch(batch, k)]
+
+    report = {"float32": {"recall": 1.0, "bytes": model.vectors.shape[0] * model.vectors.shape[1] * 4, "ratio": 1.0}}
+    for precision in precisions:
+        data = np.empty(model.vectors.shape, dtype=precision)
+        scales = np.empty(len(data), dtype=np.float32) if precision == "int8" else None
+        _quantize_into(model.vectors, data, scales)
+        quantized = QuantizedVectors(data, scales)
+        index = VectorIndex(model, quantized=quantized)
+        found = [neighbors for batch in batches for neighbors in index.nearest_batch(batch, k)]
+        recall = np.mean([len(expected_set.intersection(indices.tolist())) / max(1, len(expected_set))
+                          for expected_set, (indices, _) in zip(expected, found)])
+        report[precision] = {
+            "recall": round(float(recall), 4),
+            "bytes": quantized.nbytes,
+            "ratio": round(quantized.nbytes / report["float32"]["bytes"], 3)
+        }
+        logger.info("Precision %s: top-%d recall %.4f, %.1f MiB (%.0f%% of float32)", precision, k,
+                    report[precision]["recall"], quantized.nbytes / 2 ** 20, 100 * report[precision]["ratio"])
+    return report
+
+
+def run_recall_report(cfg, sample=1000, seed=0, output_path=None):
+    """
+    Compare the neighbour recall and memory of every precision on the configured model.
+
+    :param dict cfg: Configuration dictionary (see configLoader).
+    :param int sample: Number of words whose ``topn`` neighbours are compared.
+    :param int seed: Seed of the word sampling.
+    :param str output_path: (Optional) Path of a JSON file to write the report to.
+    :returns: The report (see recall_report).
+    :rtype: dict
+    """
+    setup_logging(cfg.get("log_level", "INFO"), cfg.get("log_file", None))
+    model = load_model(cfg["model_path"], cfg["model_cache_path"])
+    report = recall_report(model, k=cfg["topn"], sample=sample, seed=seed)
+    if output_path:
+        with open(output_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        logger.info("Precision report saved to %s", output_path)
+    return report
@@ -0,0 +1,120 @@
+##
+# @file scoreJournal.py
+# @brief Contains the ScoreJournal class, an on-disk journal of the API scores.
+#
+# Every answer of the API is written to a SQLite database as soon as it arrives, keyed by
+# (puzzle_number, strategy, word). If a solving run dies halfway, the next run of the same
+# strategy for the same puzzle replays the journal instead of paying for these requests
+# again. Other strategies start from scratch, so their statistics only count their own
+# requests.
+
+import sqlite3
+from datetime import datetime
+
+class ScoreJournal:
+    """
+    Journal of the scores returned by the API, per puzzle.
+    """
+
+    def __init__(self, path):
+        """
+        Open (and create if needed) the journal database.
+
+        :param str path: Path to the SQLite database file.
+        """
+        self.path = path
+        # The solver daemon uses the journal from several threads, one solve at a time
+        self.connection = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        columns = [row[1] for row in self.connection.execute("PRAGMA table_info(scores)")]
+        if columns and "strategy" not in columns:
+            self.__migrate()
+        self.connection.execute("""
+            CREATE TABLE IF NOT EXISTS scores (
+                puzzle_number INTEGER NOT NULL,
+                strategy TEXT NOT NULL,
+                word TEXT NOT NULL,
+                score REAL,
+                invalid INTEGER NOT NULL DEFAULT 0,
+                timestamp TEXT NOT NULL,
+                PRIMARY KEY (puzzle_number, strategy, word)
+            )
+        """)
+        self.connection.commit()
+
+    def __migrate(self):
+        """
+        Key the answers of a journal written by an older version by strategy.
+
+        Older versions did not record the strategy. Their answers are given to the default
+        beam strategy, the one the daily runs use.
+        """
+        with self.connection:
+            self.connection.execute("ALTER TABLE scores RENAME TO scores_old")
+            self.connection.execute("""
+                CREATE TABLE scores (
+                    puzzle_number INTEGER NOT NULL,
+                    strategy TEXT NOT NULL,
+                    word TEXT NOT NULL,
+                    score REAL,
+                    invalid INTEGER NOT NULL DEFAULT 0,
+                    timestamp TEXT NOT NULL,
+                    PRIMARY KEY (puzzle_number, strategy, word)
+                )
+            """)
+            self.connection.execute("""
+                INSERT INTO scores (puzzle_number, strategy, word, score, invalid, timestamp)
+                SELECT puzzle_number, 'beam', word, score, invalid, timestamp FROM scores_old ORDER BY rowid
+            """)
+            self.connection.execute("DROP TABLE scores_old")
+
+    def record(self, puzzle_number, strategy, word, score):
+        """
+        Write the answer of the API for a word, committed immediately.
+
+        :param int puzzle_number: The puzzle number.
+        :param str strategy: Name of the search strategy that sent the request.
+        :param str word: The guessed word.
+        :param float score: The similarity score, or None if the API refused the word.
+        """
+        self.connection.execute(
+            "INSERT OR REPLACE INTO scores (puzzle_number, strategy, word, score, invalid, timestamp) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (puzzle_number, strategy, word, score, int(score is None), datetime.now().isoformat())
+        )
+        self.connection.commit()
+
+    def replay(self, puzzle_number, strategy):
+        """
+        Read every answer recorded for a puzzle by a strategy, in the order they were written.
+
+        :param int puzzle_number: The puzzle number.
+        :param str strategy: Name of the search strategy.
+        :returns: A list of (word, score) tuples, score being None for words refused by the API.
+        :rtype: list
+        """
+        rows = self.connection.execute(
+            "SELECT word, score, invalid FROM scores WHERE puzzle_number = ? AND strategy = ? ORDER BY rowid",
+            (puzzle_number, strategy)
+        )
+        return [(word, None if invalid else score) for word, score, invalid in rows]
+
+    def is_solved(self, puzzle_number):
+        """
+        Tell if the hidden word of a puzzle has been found, by any strategy.
+
+        :param int puzzle_number: The puzzle number.
+        :rtype: bool
+        """
+        row = self.connection.execute(
+            "SELECT 1 FROM scores WHERE puzzle_number = ? AND score >= 1.0 LIMIT 1",
+            (puzzle_number,)
+        ).fetchone()
+        return row is not None
+
+    def close(self):
+        """
+        Close the database connection.
+        """
+        self.connection.close()
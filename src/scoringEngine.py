@@ -0,0 +1,142 @@
+##
+# @file scoringEngine.py
+# @brief Contains the asyncio scoring engine used to send guesses concurrently.
+#
+# Instead of sleeping a fixed delay after each request, a batch of guesses is sent
+# concurrently and paced by a token bucket (requests per second plus a burst size). The
+# burst size also caps the number of requests in flight.
+# The blocking API call runs in worker threads, so retries and invalid word handling
+# stay in the solver.
+
+import asyncio
+import threading
+import time
+
+class TokenBucket:
+    """
+    Token bucket rate limiter shared by the tasks of an event loop.
+
+    The bucket holds at most ``burst`` tokens and is refilled at ``rate`` tokens per second.
+    Each request consumes one token. The rate may be a function, read at each request,
+    so it can follow an adaptive rate.
+    """
+
+    def __init__(self, rate, burst):
+        """
+        Initialize a full bucket.
+
+        :param rate: Number of requests allowed per second, or function returning it. 0 or less disables the limit.
+        :type rate: float or callable
+        :param int burst: Maximum number of requests sent at once.
+        """
+        self.rate = rate if callable(rate) else (lambda: rate)
+        self.capacity = max(1, burst)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+        self.wait_time = 0.0  # Total time requests waited for a token
+
+    async def acquire(self):
+        """
+        Wait until a token is available and consume it.
+        """
+        async with self.lock:
+            while True:
+                rate = self.rate()
+                if rate <= 0:
+                    return
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                delay = (1 - self.tokens) / rate
+                self.wait_time += delay
+                await asyncio.sleep(delay)
+
+
+class ScoringEngine:
+    """
+    Concurrent scoring of a batch of words, paced by a token bucket, with at most ``burst``
+    requests in flight.
+    """
+
+    def __init__(self, score_word, rate, burst):
+        """
+        Initialize the engine.
+
+        :param callable score_word: Blocking function returning the score of a word, or None.
+        :param rate: Number of requests allowed per second, or function returning it. 0 or less disables the limit.
+        :type rate: float or callable
+        :param int burst: Maximum number of requests sent at once, and in flight.
+        """
+        self.score_word = score_word
+        self.rate = rate
+        self.burst = burst
+        self.bucket = None
+        self.in_flight = None
+        self.lock = threading.Lock()
+        self.request_count = 0
+
+    def __send(self, word):
+        """
+        Score a word, counting the request. Runs in a worker thread.
+
+        :param str word: The word to score.
+        :returns: The score of the word, or None.
+        :rtype: float or None
+        """
+        with self.lock:
+            self.request_count += 1
+        return self.score_word(word)
+
+    async def __score(self, word):
+        """
+        Wait for a free request slot and the rate limiter, then score a word in a worker thread.
+
+        :param str word: The word to score.
+        :returns: A tuple (word, score).
+        :rtype: tuple
+        """
+        async with self.in_flight:
+            await self.bucket.acquire()
+            return word, await asyncio.to_thread(self.__send, word)
+
+    @property
+    def wait_time(self):
+        """
+        Total time requests waited for the rate limiter, in seconds.
+
+        :rtype: float
+        """
+        return self.bucket.wait_time if self.bucket is not None else 0.0
+
+    async def score_batch(self, words, on_result):
+        """
+        Score words concurrently and hand every result over as soon as it arrives.
+
+        When ``on_result`` returns True (e.g. the hidden word has been found), the words still
+        waiting for the rate limiter are cancelled and results of in-flight requests are dropped.
+
+        :param list words: The words to score.
+        :param callable on_result: Function called with (word, score) for each result, score being
+            None if the request failed or the word is invalid. Returning True stops the batch.
+        :returns: True if the batch has been stopped by ``on_result``, False otherwise.
+        :rtype: bool
+        """
+        if self.bucket is None:
+            self.bucket = TokenBucket(self.rate, self.burst)
+            self.in_flight = asyncio.Semaphore(max(1, self.burst))
+
+        tasks = [asyncio.create_task(self.__score(word)) for word in words]
+        try:
+            for next_result in asyncio.as_completed(tasks):
+                word, score = await next_result
+                if on_result(word, score):
+                    return True
+            return False
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
@@ -0,0 +1,363 @@
+##
+# @file searchStrategies.py
+# @brief Contains the search strategies used by CemantixSolver to choose the next guesses.
+#
+# A strategy is fed with every scored word through ``observe`` and gives the next batch
+# of words to send to the API through ``next_guesses``. The solver owns the API calls,
+# the invalid word bookkeeping and the stop condition. Words are identified by their
+# vocabulary index: strings are only used by the solver, at the API boundary.
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+
+class SearchStrategy:
+    """
+    Base class of the search strategies.
+    """
+
+    name = None
+
+    def __init__(self, index, config, excluded):
+        """
+        Initialize the strategy.
+
+        :param VectorIndex index: The indexed Word2Vec model.
+        :param dict config: Dictionary containing configuration keys (see configLoader).
+        :param numpy.ndarray excluded: Mask of the vocabulary words that must not be guessed (removed,
+            tested or invalid). It is owned by the solver, which updates it before calling ``observe`` or ``reject``.
+        """
+        self.index = index
+        self.excluded = excluded
+
+    def observe(self, idx, score):
+        """
+        Record the score returned by the API for a word.
+
+        :param int idx: Vocabulary index of the guessed word.
+        :param float score: The similarity score returned by the API.
+        """
+        raise NotImplementedError
+
+    def reject(self, idx):
+        """
+        Record that a guessed word has been refused by the API.
+
+        :param int idx: Vocabulary index of the invalid word.
+        """
+
+    def next_guesses(self):
+        """
+        Choose the next words to send to the API.
+
+        :returns: The vocabulary indices of the words to guess, in order. An empty array means the search is exhausted.
+        :rtype: numpy.ndarray
+        """
+        raise NotImplementedError
+
+    def metrics(self):
+        """
+        Get the performance measures of the strategy for this session.
+
+        :returns: A dictionary of measures, empty if the strategy has none.
+        :rtype: dict
+        """
+        return {}
+
+    def close(self):
+        """
+        Release the resources of the strategy (e.g. worker threads).
+        """
+
+
+class BeamSearchStrategy(SearchStrategy):
+    """
+    Beam search over the nearest neighbours of the best scored words.
+
+    At each round, the ``beam_size`` best words are expanded with their ``topn`` nearest
+    neighbours in the model, and every new neighbour is guessed. The beam is expanded in
+    one batch and its neighbours are filtered with the exclusion mask, so a round costs a
+    single pass over the vocabulary whatever the beam size.
+
+    While a batch of guesses is in flight, the neighbours of each scored word that would
+    enter the next beam are computed speculatively by a worker thread, so the expansion
+    mostly consumes results computed during the API waits.
+
+    With a hot tier (``hot_vocabulary_size`` > 0), neighbours are first searched among the
+    first words of the model only, the most frequent ones once init has sorted the model.
+    The search escalates to the whole vocabulary when the best score has not improved for
+    ``hot_patience`` rounds, or when the hot tier has no new candidate.
+    """
+
+    name = "beam"
+
+    def __init__(self, index, config, excluded):
+        super().__init__(index, config, excluded)
+        self.beam_size = config["beam_size"]
+        self.topn = config["topn"]
+        self.similar_cache = {}
+        self.scores = np.full(len(index), -np.inf, dtype=np.float32)
+        self.beam = np.empty(0, dtype=np.int32)  # Scored words not expanded yet
+        self.new_candidates = []  # Words scored since the last expansion
+        self.started = False  # False until the initial guesses have been expanded
+        self.keep_beam = True  # True if the words not expanded by the next round stay in the beam
+
+        hot_size = config.get("hot_vocabulary_size", 0)
+        self.limit = hot_size if 0 < hot_size < len(index) else None  # Neighbours are searched below this index
+        self.patience = config.get("hot_patience", 3)
+        self.best_score = -np.inf
+        self.improved = False  # True if the best score improved since the last expansion
+        self.stale_rounds = 0  # Expansions in a row without improvement of the best score
+        self.rounds = 0
+        self.escalation_round = None  # Round at which the search escalated to the whole vocabulary
+        self.discarded = 0  # Speculative computations dropped by the escalation
+
+        workers = config.get("prefetch_workers", 0)
+        self.prefetcher = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="prefetch") if workers > 0 else None
+        self.prefetched = {}  # Vocabulary index -> future of (neighbours, compute time)
+        self.hidden_time = 0.0  # Speculative computation time of the consumed neighbours
+        self.wait_time = 0.0  # Time spent waiting for unfinished speculative computations
+        self.blocking_time = 0.0  # Computation time of the neighbours that were not prefetched
+
+    def observe(self, idx, score):
+        self.scores[idx] = score
+        self.new_candidates.append(idx)
+        if score > self.best_score:
+            self.best_score = score
+            self.improved = True
+        if self.prefetcher is not None and idx not in self.similar_cache and idx not in self.prefetched:
+            pool = np.concatenate([self.beam, np.asarray(self.new_candidates, dtype=np.int32)])
+            pool_scores = self.scores[pool]
+            rank = np.count_nonzero((pool_scores > score) | ((pool_scores == score) & (pool < idx)))
+            if rank < self.beam_size:
+                self.prefetched[idx] = self.prefetcher.submit(self.__compute, idx, self.limit)
+
+    def __compute(self, idx, limit):
+        """
+        Compute the nearest neighbours of a word. Runs in a prefetch thread.
+
+        :param int idx: Vocabulary index of the word to expand.
+        :param int limit: Neighbours are searched among the words whose index is below ``limit``, or in
+            the whole vocabulary if None.
+        :returns: A tuple (neighbours, compute time in seconds).
+        :rtype: tuple
+        """
+        start = time.perf_counter()
+        neighbors = self.index.nearest_batch([idx], self.topn, limit)[0][0]
+        return neighbors, time.perf_counter() - start
+
+    def __escalate(self):
+        """
+        Search the neighbours in the whole vocabulary from now on.
+
+        The neighbours computed in the hot tier are forgotten, and every scored word goes back
+        to the beam so the best ones are expanded again.
+        """
+        self.limit = None
+        self.escalation_round = self.rounds
+        for future in self.prefetched.values():
+            future.cancel()
+        self.discarded += len(self.prefetched)
+        self.prefetched = {}
+        self.similar_cache = {}
+        self.beam = np.flatnonzero(np.isfinite(self.scores)).astype(np.int32)
+        self.new_candidates = []
+        self.keep_beam = True
+
+    def __neighbors(self, indices):
+        """
+        Get the nearest neighbours of the beam words, expanding the ones missing from the session cache in one batch.
+
+        :param list indices: Vocabulary indices of the words to expand.
+        :returns: The vocabulary indices of the neighbours of each word, most similar first.
+        :rtype: list
+        """
+        missing = []
+        for idx in dict.fromkeys(indices):
+            if idx in self.similar_cache:
+                continue
+            future = self.prefetched.pop(idx, None)
+            if future is None:
+                missing.append(idx)
+                continue
+            start = time.perf_counter()
+            self.similar_cache[idx], compute_time = future.result()
+            waited = time.perf_counter() - start
+            self.wait_time += waited
+            self.hidden_time += max(0.0, compute_time - waited)
+
+        if missing:
+            start = time.perf_counter()
+            for idx, (neighbors, _) in zip(missing, self.index.nearest_batch(missing, self.topn, self.limit)):
+                self.similar_cache[idx] = neighbors
+            self.blocking_time += time.perf_counter() - start
+        return [self.similar_cache[idx] for idx in indices]
+
+    def next_guesses(self):
+        if self.limit is not None and self.started:
+            self.stale_rounds = 0 if self.improved else self.stale_rounds + 1
+            if self.stale_rounds >= self.patience or not self.new_candidates:
+                self.__escalate()
+        self.improved = False
+        self.rounds += 1
+
+        if self.started and not self.new_candidates and not self.keep_beam:
+            return np.empty(0, dtype=np.int32)
+        pool = np.concatenate([self.beam, np.asarray(self.new_candidates, dtype=np.int32)])
+        self.new_candidates = []
+
+        # Best scores first, ties broken by vocabulary index
+        pool = pool[np.lexsort((pool, -self.scores[pool]))]
+        indices = pool[:self.beam_size]
+        # Only the initial (or escalated) guesses that did not fit in the beam are kept for the next round
+        self.beam = pool[self.beam_size:] if self.keep_beam else pool[:0]
+        self.keep_beam = False
+        self.started = True
+        if not len(indices):
+            return np.empty(0, dtype=np.int32)
+
+        candidates = np.concatenate(self.__neighbors(indices.tolist()))
+        candidates = candidates[~self.excluded[candidates]]
+        if not len(candidates) and self.limit is not None:
+            # No new candidate around the best words in the hot tier
+            self.__escalate()
+            return self.next_guesses()
+        # Keep the first occurrence of each neighbour, in expansion order
+        _, first = np.unique(candidates, return_index=True)
+        return candidates[np.sort(first)]
+
+    def metrics(self):
+        """
+        Get the neighbour computation times of the session.
+
+        :returns: A dictionary with the computation time hidden behind the API calls, the time
+            spent waiting for speculative computations, the time of the computations done
+            on the critical path, and the number of speculative computations never used (in seconds).
+            With a hot tier, the round at which the search escalated to the whole vocabulary is added
+            (None if it never did).
+        :rtype: dict
+        """
+        metrics = {
+            "neighbors_hidden_time": round(self.hidden_time, 4),
+            "neighbors_wait_time": round(self.wait_time, 4),
+            "neighbors_blocking_time": round(self.blocking_time, 4),
+            "neighbors_wasted": len(self.prefetched) + self.discarded
+        }
+        if self.limit is not None or self.escalation_round is not None:
+            metrics["hot_tier_escalation_round"] = self.escalation_round
+        return metrics
+
+    def close(self):
+        if self.prefetcher is not None:
+            for future in self.prefetched.values():
+                future.cancel()
+            self.prefetcher.shutdown(wait=True)
+
+
+class PruningStrategy(SearchStrategy):
+    """
+    Candidate pruning by consistency with the observed scores.
+
+    A live candidate set is kept over the whole vocabulary. Each score returned by the
+    API is the cosine similarity between the guessed word and the hidden word, so every
+    word whose similarity to the guessed word is outside ``score ± pruning_tolerance``
+    is dropped. The next guess is the surviving candidate that best fits all the scores.
+    """
+
+    name = "pruning"
+
+    def __init__(self, index, config, excluded):
+        super().__init__(index, config, excluded)
+        self.tolerance = config["pruning_tolerance"]
+        self.alive = ~excluded
+        self.residual = np.zeros(len(self.index), dtype=np.float32)
+
+    def observe(self, idx, score):
+        sims = self.index.similarities(self.index.unit_vector(idx))
+        error = sims - score
+        self.alive &= ~self.excluded & (np.abs(error) <= self.tolerance)
+        self.residual += error * error
+
+    def reject(self, idx):
+        self.alive[idx] = False
+
+    def next_guesses(self):
+        # When no word is consistent with every score (the API model differs from ours),
+        # fall back to the guessable word with the smallest squared error.
+        pool = self.alive if self.alive.any() else ~self.excluded
+        if not pool.any():
+            return np.empty(0, dtype=np.int32)
+        residual = np.where(pool, self.residual, np.inf)
+        return np.array([np.argmin(residual)], dtype=np.int32)
+
+
+class TriangulationStrategy(SearchStrategy):
+    """
+    Estimation of the hidden word vector from the observed scores.
+
+    Each score is the cosine between the unit vector ``u`` of a guessed word and the unit
+    vector ``t`` of the hidden word, so every guess gives a linear constraint ``u · t = score``.
+    The estimate of ``t`` is the ridge regression solution of these constraints, and the
+    next guess is the guessable word nearest to this estimate.
+    """
+
+    name = "triangulation"
+
+    def __init__(self, index, config, excluded):
+        super().__init__(index, config, excluded)
+        self.ridge = config["triangulation_ridge"]
+        self.guessed = []
+        self.scores = []
+
+    def observe(self, idx, score):
+        self.guessed.append(idx)
+        self.scores.append(score)
+
+    def estimate_target(self):
+        """
+        Estimate the unit vector of the hidden word from the observed scores.
+
+        The regularized least squares problem is solved in its dual form, which only
+        needs a (guesses × guesses) linear system.
+
+        :returns: The estimated unit vector, or None if nothing was observed yet.
+        :rtype: numpy.ndarray or None
+        """
+        if not self.guessed:
+            return None
+        rows = np.asarray(self.guessed, dtype=np.int32)
+        u = self.index.unit_vectors(rows).astype(np.float64)
+        s = np.asarray(self.scores, dtype=np.float64)
+        gram = u @ u.T + self.ridge * np.eye(len(s))
+        target = u.T @ np.linalg.solve(gram, s)
+        norm = np.linalg.norm(target)
+        if norm == 0:
+            return None
+        return (target / norm).astype(np.float32)
+
+    def next_guesses(self):
+        target = self.estimate_target()
+        if target is None or self.excluded.all():
+            return np.empty(0, dtype=np.int32)
+        sims = np.where(self.excluded, -np.inf, self.index.similarities(target))
+        return np.array([np.argmax(sims)], dtype=np.int32)
+
+
+STRATEGIES = {strategy.name: strategy for strategy in (BeamSearchStrategy, PruningStrategy, TriangulationStrategy)}
+
+
+def make_strategy(index, config, excluded):
+    """
+    Build the search strategy selected in the configuration.
+
+    :param VectorIndex index: The indexed Word2Vec model.
+    :param dict config: Dictionary containing configuration keys (see configLoader).
+    :param numpy.ndarray excluded: Mask of the vocabulary words that must not be guessed.
+    :raises ValueError: If the configured strategy is unknown.
+    :returns: The search strategy.
+    :rtype: SearchStrategy
+    """
+    if config["strategy"] not in STRATEGIES:
+        raise ValueError(f"Unknown strategy '{config['strategy']}'. "
+                         f"Available strategies: {', '.join(STRATEGIES)}")
+    return STRATEGIES[config["strategy"]](index, config, excluded)
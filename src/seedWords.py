@@ -0,0 +1,173 @@
+##
+# @file seedWords.py
+# @brief Module to choose start words covering the embedding space.
+#
+# A fixed list of start words explores the same few regions of the model every day. The
+# init command clusters the most frequent words of the model with a spherical k-means and
+# stores, for each cluster, the words closest to its centroid. The solver then starts with
+# one word per cluster, so its first requests are spread over the whole vocabulary.
+
+import json
+import logging
+import os
+import numpy as np
+
+SEEDS_FILE = "seeds.json"
+
+# Number of words clustered: word2vec models are sorted by frequency, and frequent words
+# are the ones the Cemantix API knows
+SAMPLE_WORDS = 50000
+
+# Number of words stored for each cluster, closest to its centroid first
+REPRESENTATIVES = 10
+
+# Number of rows multiplied at once by the centroids
+BLOCK_ROWS = 16384
+
+logger = logging.getLogger(__name__)
+
+
+def _unit_rows(vectors):
+    """
+    Normalize the rows of a matrix.
+
+    :param numpy.ndarray vectors: (rows × dimension) array.
+    :returns: The float32 unit rows.
+    :rtype: numpy.ndarray
+    """
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1)
+    return vectors / np.where(norms > 0, norms, 1)[:, None]
+
+
+def _closest_centroids(units, centroids):
+    """
+    Find the most similar centroid of each row, block by block.
+
+    :param numpy.ndarray units: (rows × dimension) array of unit vectors.
+    :param numpy.ndarray centroids: (clusters × dimension) array of unit centroids.
+    :returns: A tuple (labels, similarities) of arrays, one entry per row.
+    :rtype: tuple
+    """
+    labels = np.empty(len(units), dtype=np.int64)
+    sims = np.empty(len(units), dtype=np.float32)
+    for start in range(0, len(units), BLOCK_ROWS):
+        block = np.dot(units[start:start + BLOCK_ROWS], centroids.T)
+        labels[start:start + BLOCK_ROWS] = block.argmax(axis=1)
+        sims[start:start + BLOCK_ROWS] = block.max(axis=1)
+    return labels, sims
+
+
+def spherical_kmeans(units, k, iterations=30, seed=0):
+    """
+    Cluster unit vectors by cosine similarity.
+
+    Centroids are initialized with k-means++ (each new centroid is drawn with a probability
+    growing with its distance to the centroids already chosen), then refined with Lloyd
+    iterations until the clusters stop changing.
+
+    :param numpy.ndarray units: (rows × dimension) float32 array of unit vectors.
+    :param int k: Number of clusters.
+    :param int iterations: Maximum number of Lloyd iterations.
+    :param int seed: Seed of the initialization.
+    :returns: (clusters × dimension) array of the unit centroids.
+    :rtype: numpy.ndarray
+    """
+    rng = np.random.default_rng(seed)
+    centroids = np.empty((k, units.shape[1]), dtype=np.float32)
+    centroids[0] = units[rng.integers(len(units))]
+    best = np.dot(units, centroids[0])
+    for i in range(1, k):
+        distances = np.maximum(1 - best, 0) ** 2
+        total = distances.sum()
+        row = rng.choice(len(units), p=distances / total) if total > 0 else rng.integers(len(units))
+        centroids[i] = units[row]
+        best = np.maximum(best, np.dot(units, centroids[i]))
+
+    labels = None
+    for _ in range(iterations):
+        new_labels, _ = _closest_centroids(units, centroids)
+        if labels is not None and np.array_equal(labels, new_labels):
+            break
+        labels = new_labels
+        sums = np.dot((labels == np.arange(k)[:, None]).astype(np.float32), units)
+        filled = np.linalg.norm(sums, axis=1) > 0
+        # Empty clusters keep their previous centroid
+        centroids[filled] = _unit_rows(sums[filled])
+    return centroids
+
+
+def build_seed_clusters(model, cache_dir, k, seed=0):
+    """
+    Cluster the most frequent words of the model and store the words closest to each centroid.
+
+    :param KeyedVectors model: The Word2Vec model.
+    :param str cache_dir: Path to the model cache directory, where the clusters are stored.
+    :param int k: Number of clusters, i.e. of start words.
+    :param int seed: Seed of the clustering.
+    :returns: The clusters, as lists of words closest to their centroid first.
+    :rtype: list
+    """
+    count = min(len(model.index_to_key), SAMPLE_WORDS)
+    k = min(k, count)
+    if k <= 0:
+        return []
+    logger.info("Clustering %d words into %d seed clusters", count, k)
+    units = _unit_rows(model.vectors[:count])
+    centroids = spherical_kmeans(units, k, seed=seed)
+
+    labels, sims = _closest_centroids(units, centroids)
+    clusters = []
+    for cluster in range(k):
+        rows = np.flatnonzero(labels == cluster)
+        rows = rows[np.argsort(-sims[rows], kind="stable")[:REPRESENTATIVES]]
+        if len(rows):
+            clusters.append([model.index_to_key[row] for row in rows.tolist()])
+
+    os.makedirs(cache_dir, exist_ok=True)
+    path = os.path.join(cache_dir, SEEDS_FILE)
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump({"k": k, "seed": seed, "clusters": clusters}, f, ensure_ascii=False)
+    os.replace(path + ".tmp", path)
+    logger.info("Seed clusters saved in %s: %s", cache_dir, ", ".join(words[0] for words in clusters))
+    return clusters
+
+
+def load_seed_clusters(cache_dir, k):
+    """
+    Read the seed clusters stored by build_seed_clusters.
+
+    Clusters are stored as words, so they stay valid when words are removed from the model.
+
+    :param str cache_dir: Path to the model cache directory.
+    :param int k: Expected number of clusters.
+    :returns: The clusters, or None if they are missing or were built with another number of clusters.
+    :rtype: list or None
+    """
+    try:
+        with open(os.path.join(cache_dir, SEEDS_FILE), encoding="utf-8") as f:
+            meta = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+    if meta.get("k") != k:
+        return None
+    return meta["clusters"]
+
+
+def choose_seed_words(clusters, usable, rng=None):
+    """
+    Choose one start word per cluster.
+
+    :param list clusters: The clusters, as lists of words closest to their centroid first.
+    :param callable usable: Function telling if a word can be guessed.
+    :param numpy.random.Generator rng: (Optional) If given, a random usable word of each cluster is
+        chosen instead of the closest to its centroid.
+    :returns: The start words.
+    :rtype: list
+    """
+    seeds = []
+    for words in clusters:
+        candidates = [word for word in words if usable(word)]
+        if candidates:
+            seeds.append(candidates[rng.integers(len(candidates))] if rng is not None else candidates[0])
+    return seeds
@@ -0,0 +1,210 @@
+##
+# @file solverDaemon.py
+# @brief Contains the SolverDaemon class, a long-running solver keeping the model warm.
+#
+# Instead of a cold process started by cron every morning, the daemon keeps one solver
+# (model, neighbour table, invalid words, HTTP connections) in memory. It solves the daily
+# puzzle as soon as a new ``data-puzzle-number`` shows up after the scheduled time, and
+# answers on-demand solve requests on a local HTTP endpoint.
+
+import json
+import logging
+import subprocess
+import threading
+from datetime import datetime, timedelta
+import requests
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+from src.CemantixSolver import CemantixSolver
+
+def request_solve(config, day=None):
+    """
+    Ask a running solver daemon to solve a puzzle.
+
+    :param dict config: Dictionary containing configuration keys (see configLoader).
+    :param int day: (Optional) Puzzle number to solve. If None, the current day's puzzle is solved.
+    :raises requests.RequestException: If the daemon cannot be reached, does not answer within
+        ``serve_solve_timeout`` seconds, or the solve failed.
+    :returns: The result: puzzle number, best word, best score and requests count.
+    :rtype: dict
+    """
+    params = {"day": day} if day is not None else {}
+    # The daemon only answers once the solve is over
+    response = requests.post(f"http://{config['serve_host']}:{config['serve_port']}/solve", params=params,
+                             timeout=(config["http_timeout"], config["serve_solve_timeout"]))
+    response.raise_for_status()
+    return response.json()
+
+
+class SolverDaemon:
+    """
+    Warm solver running the daily solve on a schedule and serving solve requests.
+
+    Endpoints:
+    - ``GET /status``: state of the daemon.
+    - ``POST /solve?day=N``: solve puzzle N (the current one if ``day`` is omitted) and return the result.
+    """
+
+    def __init__(self, config):
+        """
+        Initialize the daemon and its solver.
+
+        :param dict config: Dictionary containing configuration keys (see configLoader).
+        """
+        self.config = config
+        self.solver = CemantixSolver(config)
+        self.logger = logging.getLogger(__name__)
+        self.schedule = datetime.strptime(config["serve_schedule"], "%H:%M").time()
+        self.poll_interval = config["serve_poll_interval"]
+        self.post_solve_command = config["serve_post_solve_command"]
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.last_puzzle = None  # Last daily puzzle solved (or found already solved)
+        self.last_result = None
+        self.next_run = None
+        self.server = ThreadingHTTPServer((config["serve_host"], config["serve_port"]), self.__make_handler())
+        self.server.daemon_threads = True
+
+    def solve(self, day=None):
+        """
+        Solve a puzzle with the warm solver. Solves are run one at a time.
+
+        :param int day: (Optional) Puzzle number to solve. If None, the current day's puzzle is solved.
+        :returns: The result: puzzle number, best word, best score and requests count.
+        :rtype: dict
+        """
+        with self.lock:
+            if day is None:
+                day = self.solver.client.get_puzzle_number()
+                if day is None:
+                    return {"puzzle_number": None, "word": None, "score": None, "requests_count": 0}
+            result = self.solver.solve(day=day)
+            self.last_result = {
+                "puzzle_number": day,
+                "word": result[0] if result else None,
+                "score": result[1] if result else None,
+                "requests_count": self.solver.request_count
+            }
+            return self.last_result
+
+    def __scheduled_time(self, now):
+        """
+        Get the scheduled time of the daily solve for the day of ``now``.
+
+        :param datetime now: The current time.
+        :rtype: datetime
+        """
+        return datetime.combine(now.date(), self.schedule)
+
+    def __poll(self):
+        """
+        Solve the current puzzle if it is new.
+
+        :returns: True if the current puzzle is solved, False if it must be polled again later.
+        :rtype: bool
+        """
+        puzzle_number = self.solver.client.get_puzzle_number()
+        if puzzle_number is None:
+            return False
+        journal = self.solver.journal
+        if puzzle_number == self.last_puzzle or (journal and journal.is_solved(puzzle_number)):
+            self.last_puzzle = puzzle_number
+            return True
+
+        self.logger.info("New puzzle %d detected", puzzle_number)
+        result = self.solve(puzzle_number)
+        if result["score"] is None or result["score"] < 1.0:
+            return False
+        self.last_puzzle = puzzle_number
+        if self.post_solve_command:
+            self.logger.info("Running post-solve command")
+            completed = subprocess.run(self.post_solve_command, shell=True)
+            if completed.returncode != 0:
+                self.logger.error("Post-solve command failed with code %d", completed.returncode)
+        return True
+
+    def __make_handler(self):
+        """
+        Build the request handler class bound to this daemon.
+
+        :rtype: type
+        """
+        daemon = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                daemon.logger.debug(format, *args)
+
+            def __answer(self, status, content):
+                body = json.dumps(content, ensure_ascii=False).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                if urlparse(self.path).path != "/status":
+                    self.__answer(404, {"error": "Not found"})
+                    return
+                self.__answer(200, {
+                    "solving": daemon.lock.locked(),
+                    "last_puzzle": daemon.last_puzzle,
+                    "last_result": daemon.last_result,
+                    "next_run": daemon.next_run.isoformat(timespec="seconds") if daemon.next_run else None
+                })
+
+            def do_POST(self):
+                url = urlparse(self.path)
+                if url.path != "/solve":
+                    self.__answer(404, {"error": "Not found"})
+                    return
+                try:
+                    day = int(parse_qs(url.query)["day"][0])
+                except KeyError:
+                    day = None
+                except ValueError:
+                    self.__answer(400, {"error": "day must be a puzzle number"})
+                    return
+                try:
+                    self.__answer(200, daemon.solve(day))
+                except Exception as e:
+                    daemon.logger.exception("Solve request failed")
+                    self.__answer(500, {"error": str(e)})
+
+        return Handler
+
+    def run(self):
+        """
+        Serve solve requests and run the daily solve until ``stop`` is called.
+        """
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        host, port = self.server.server_address[:2]
+        self.logger.info("Solver daemon listening on http://%s:%d (daily solve after %s)", host, port,
+                         self.schedule.strftime("%H:%M"))
+        try:
+            while not self.stop_event.is_set():
+                now = datetime.now()
+                if now < self.__scheduled_time(now):
+                    self.next_run = self.__scheduled_time(now)
+                else:
+                    try:
+                        solved = self.__poll()
+                    except Exception:
+                        self.logger.exception("Daily solve failed")
+                        solved = False
+                    if solved:
+                        self.next_run = self.__scheduled_time(now + timedelta(days=1))
+                    else:
+                        self.next_run = now + timedelta(seconds=self.poll_interval)
+                self.stop_event.wait(max(0.0, (self.next_run - datetime.now()).total_seconds()))
+        finally:
+            self.server.shutdown()
+            self.server.server_close()
+            self.logger.info("Solver daemon stopped")
+
+    def stop(self):
+        """
+        Ask the daemon to stop. A solve in progress is finished first.
+        """
+        self.stop_event.set()
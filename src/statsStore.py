@@ -0,0 +1,217 @@
+##
+# @file statsStore.py
+# @brief Contains the StatsStore class, the SQLite store of the solving statistics.
+#
+# Each solve is a row keyed by (puzzle_number, strategy), so checking whether a puzzle is
+# already logged is an index lookup instead of parsing a whole CSV file. The daily means
+# and the rolling percentiles drawn by generateStatsGraph are computed by SQLite, and the
+# store remembers which rows have been drawn so the graphs are only redrawn when needed.
+
+import csv
+import logging
+import os
+import sqlite3
+
+# Columns of the statistics and their SQL type
+COLUMNS = {
+    "timestamp": "TEXT NOT NULL",
+    "puzzle_number": "INTEGER NOT NULL",
+    "word": "TEXT",
+    "score": "REAL",
+    "solving_time": "REAL",
+    "requests_count": "INTEGER",
+    "api_delay": "REAL",
+    "invalid_word_removed_count": "INTEGER",
+    "strategy": "TEXT NOT NULL",
+    "load_time": "REAL",
+    "puzzle_fetch_time": "REAL",
+    "latency_p50": "REAL",
+    "latency_p95": "REAL",
+    "latency_max": "REAL",
+    "sleep_time": "REAL",
+    "similarity_time": "REAL",
+    "filter_time": "REAL"
+}
+
+class StatsStore:
+    """
+    Statistics of the solves, one row per puzzle and search strategy.
+    """
+
+    def __init__(self, path, legacy_path=None):
+        """
+        Open (and create if needed) the statistics database, importing the legacy CSV file
+        if the database does not exist yet.
+
+        :param str path: Path to the SQLite database file.
+        :param str legacy_path: (Optional) Path to the CSV file used by older versions.
+        """
+        self.logger = logging.getLogger(__name__)
+        self.path = path
+        created = not os.path.exists(path)
+        # The solver daemon uses the store from several threads, one solve at a time
+        self.connection = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self.connection.row_factory = sqlite3.Row
+        columns = ",\n".join(f"{name} {sql_type}" for name, sql_type in COLUMNS.items())
+        self.connection.execute(f"""
+            CREATE TABLE IF NOT EXISTS stats (
+                {columns},
+                PRIMARY KEY (puzzle_number, strategy)
+            )
+        """)
+        self.connection.execute("""
+            CREATE TABLE IF NOT EXISTS rendered (
+                folder TEXT PRIMARY KEY,
+                last_rowid INTEGER NOT NULL
+            )
+        """)
+        self.connection.commit()
+        if created and legacy_path and os.path.exists(legacy_path):
+            self.__import_csv(legacy_path)
+
+    def __import_csv(self, legacy_path):
+        """
+        Insert every row of the legacy CSV file.
+
+        :param str legacy_path: Path to the CSV file.
+        """
+        with open(legacy_path, newline='', encoding='utf-8') as csvfile:
+            rows = list(csv.DictReader(csvfile))
+        for row in rows:
+            # Rows written before the strategy column was added come from the beam search
+            row["strategy"] = row.get("strategy") or "beam"
+        imported = sum(self.record({name: value for name, value in row.items() if value != ""}, commit=False)
+                       for row in rows)
+        self.connection.commit()
+        self.logger.info("Imported %d statistics rows from %s to %s", imported, legacy_path, self.path)
+
+    def record(self, row, commit=True):
+        """
+        Save the statistics of a solve, unless this puzzle is already logged for this strategy.
+
+        :param dict row: The statistics, keyed by column name. Unknown columns are ignored.
+        :param bool commit: Whether to commit immediately.
+        :returns: True if the row was saved, False if the puzzle was already logged.
+        :rtype: bool
+        """
+        names = [name for name in row if name in COLUMNS]
+        cursor = self.connection.execute(
+            f"INSERT OR IGNORE INTO stats ({', '.join(names)}) VALUES ({', '.join('?' * len(names))})",
+            [row[name] for name in names]
+        )
+        if commit:
+            self.connection.commit()
+        return cursor.rowcount == 1
+
+    def __check_columns(self, columns):
+        """
+        Make sure column names are statistics columns before putting them in a query.
+
+        :param list columns: The column names.
+        :raises ValueError: If a name is not a statistics column.
+        """
+        unknown = [column for column in columns if column not in COLUMNS]
+        if unknown:
+            raise ValueError(f"Unknown statistics columns: {', '.join(unknown)}")
+
+    def __query(self, sql, params=()):
+        """
+        Run a query and return its rows as dictionaries.
+
+        :param str sql: The query.
+        :param tuple params: The query parameters.
+        :rtype: list
+        """
+        return [dict(row) for row in self.connection.execute(sql, params)]
+
+    def average(self, column):
+        """
+        Get the average of a column over every solve.
+
+        :param str column: The column name.
+        :returns: The average, or None if there is no value.
+        :rtype: float or None
+        """
+        self.__check_columns([column])
+        return self.connection.execute(f"SELECT AVG({column}) FROM stats").fetchone()[0]
+
+    def daily_means(self, columns, by_strategy=True, required=()):
+        """
+        Get the daily mean of some columns.
+
+        :param list columns: The columns to average.
+        :param bool by_strategy: Whether to average each search strategy separately.
+        :param list required: (Optional) Columns that must be set for a row to be counted.
+        :returns: Rows with a ``day`` key, a ``strategy`` key if ``by_strategy`` is True, and the
+            mean of each column, ordered by day.
+        :rtype: list
+        """
+        self.__check_columns(list(columns) + list(required))
+        keys = "date(timestamp) AS day" + (", strategy" if by_strategy else "")
+        means = ", ".join(f"AVG({column}) AS {column}" for column in columns)
+        where = " AND ".join(f"{column} IS NOT NULL" for column in required) or "1"
+        group = "day" + (", strategy" if by_strategy else "")
+        return self.__query(f"SELECT {keys}, {means} FROM stats WHERE {where} GROUP BY {group} ORDER BY {group}")
+
+    def rolling_percentiles(self, column, window_days=7):
+        """
+        Get, for each day and search strategy, the mean and percentiles of a column over
+        the solves of the last ``window_days`` days.
+
+        Percentiles use the nearest-rank method.
+
+        :param str column: The column name.
+        :param int window_days: Size of the window, in days.
+        :returns: Rows with ``day``, ``strategy``, ``count``, ``mean``, ``p50``, ``p90`` and ``max`` keys,
+            ordered by day.
+        :rtype: list
+        """
+        self.__check_columns([column])
+        return self.__query(f"""
+            WITH days AS (
+                SELECT DISTINCT date(timestamp) AS day FROM stats
+            ), windows AS (
+                SELECT days.day, stats.strategy, stats.{column} AS value,
+                       ROW_NUMBER() OVER (PARTITION BY days.day, stats.strategy ORDER BY stats.{column}) AS rank,
+                       COUNT(*) OVER (PARTITION BY days.day, stats.strategy) AS count
+                FROM days JOIN stats
+                    ON date(stats.timestamp) BETWEEN date(days.day, ?) AND days.day
+                WHERE stats.{column} IS NOT NULL
+            )
+            SELECT day, strategy, count, AVG(value) AS mean,
+                   MIN(CASE WHEN rank >= 0.5 * count THEN value END) AS p50,
+                   MIN(CASE WHEN rank >= 0.9 * count THEN value END) AS p90,
+                   MAX(value) AS max
+            FROM windows
+            GROUP BY day, strategy
+            ORDER BY day, strategy
+        """, (f"-{window_days - 1} days",))
+
+    def has_new_rows(self, folder):
+        """
+        Tell if statistics were saved since the graphs of a folder were last drawn.
+
+        :param str folder: The graphs folder.
+        :rtype: bool
+        """
+        last = self.connection.execute("SELECT MAX(rowid) FROM stats").fetchone()[0] or 0
+        rendered = self.connection.execute("SELECT last_rowid FROM rendered WHERE folder = ?", (folder,)).fetchone()
+        return rendered is None or last > rendered[0]
+
+    def mark_rendered(self, folder):
+        """
+        Remember that the graphs of a folder show every statistics saved so far.
+
+        :param str folder: The graphs folder.
+        """
+        self.connection.execute(
+            "INSERT OR REPLACE INTO rendered (folder, last_rowid) SELECT ?, IFNULL(MAX(rowid), 0) FROM stats",
+            (folder,)
+        )
+        self.connection.commit()
+
+    def close(self):
+        """
+        Close the database connection.
+        """
+        self.connection.close()
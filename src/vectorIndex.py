@@ -0,0 +1,171 @@
+##
+# @file vectorIndex.py
+# @brief Contains the VectorIndex class used for vectorized similarity computations.
+#
+# The solver strategies reason over the whole vocabulary at once. This module exposes
+# the model as a matrix indexed by vocabulary position, so one NumPy pass gives the
+# cosine similarity of a vector against every word.
+
+import numpy as np
+
+class VectorIndex:
+    """
+    Vocabulary-indexed view of a Word2Vec model.
+
+    Words are identified by their row in the model matrix. The norms are computed once,
+    so similarities never need a normalized copy of the (possibly memory-mapped) matrix.
+    Removed words (see modelTombstones) keep their row but are hidden from every lookup.
+    With quantized vectors (see quantizedVectors), every similarity is computed on them
+    and the float32 matrix is never read.
+    """
+
+    def __init__(self, model, removed=None, neighbor_table=None, quantized=None):
+        """
+        Wrap a loaded model.
+
+        :param KeyedVectors model: The Word2Vec model to index.
+        :param numpy.ndarray removed: (Optional) Boolean mask of the words removed from the model.
+        :param NeighborTable neighbor_table: (Optional) Precomputed neighbours of the model words.
+        :param QuantizedVectors quantized: (Optional) Normalized vectors with a reduced precision to compute similarities on.
+        """
+        self.model = model
+        self.words = model.index_to_key
+        self.key_to_index = model.key_to_index
+        self.quantized = quantized
+        if quantized is None:
+            model.fill_norms()
+            self.norms = model.norms
+        else:
+            self.norms = None
+        self.removed = removed if removed is not None else np.zeros(len(self.words), dtype=bool)
+        self.neighbor_table = neighbor_table
+
+    def __len__(self):
+        return len(self.words)
+
+    def __contains__(self, word):
+        return self.index(word) is not None
+
+    def index(self, word):
+        """
+        Get the vocabulary index of a word.
+
+        :param str word: The word to look up.
+        :returns: The index of the word, or None if it is not in the model or has been removed.
+        :rtype: int or None
+        """
+        idx = self.key_to_index.get(word)
+        if idx is None or self.removed[idx]:
+            return None
+        return idx
+
+    def unit_vector(self, idx):
+        """
+        Get the normalized vector of a word.
+
+        :param int idx: Vocabulary index of the word.
+        :returns: The unit vector of the word.
+        :rtype: numpy.ndarray
+        """
+        return self.unit_vectors(idx)
+
+    def unit_vectors(self, rows):
+        """
+        Get the normalized vectors of several words.
+
+        :param rows: Vocabulary indices of the words.
+        :type rows: int or numpy.ndarray
+        :returns: The unit vectors of the words.
+        :rtype: numpy.ndarray
+        """
+        if self.quantized is not None:
+            return self.quantized.unit_vectors(rows)
+        return np.asarray(self.model.vectors[rows], dtype=np.float32) / np.asarray(self.norms[rows])[..., None]
+
+    def similarities(self, query):
+        """
+        Compute the cosine similarity between a unit vector and every word of the vocabulary.
+
+        :param numpy.ndarray query: Unit vector of the model dimension.
+        :returns: Array of similarities indexed by vocabulary position.
+        :rtype: numpy.ndarray
+        """
+        if self.quantized is not None:
+            return self.quantized.cosines(query[None, :])[0]
+        return np.dot(self.model.vectors, query) / self.norms
+
+    def nearest(self, idx, topn):
+        """
+        Get the nearest neighbours of a word, like ``KeyedVectors.most_similar``, without the removed words.
+
+        :param int idx: Vocabulary index of the word to expand.
+        :param int topn: Number of neighbours to return.
+        :returns: A tuple (indices, similarities) of arrays, most similar first.
+        :rtype: tuple
+        """
+        return self.nearest_batch([idx], topn)[0]
+
+    def nearest_batch(self, indices, topn, limit=None):
+        """
+        Get the nearest neighbours of several words at once, without the removed words.
+
+        The precomputed neighbour table is used for the words where it holds enough
+        neighbours that are not removed. The other words are expanded together with one
+        (words × vocabulary) matrix product and a row-wise ``argpartition``.
+
+        :param list indices: Vocabulary indices of the words to expand.
+        :param int topn: Number of neighbours to return for each word.
+        :param int limit: (Optional) Only the words whose index is below ``limit`` are neighbours, so
+            only the first ``limit`` rows of the matrix are read.
+        :returns: A list of (indices, similarities) tuples of arrays, most similar first, in the order of ``indices``.
+        :rtype: list
+        """
+        results = [None] * len(indices)
+        missing = []
+        for position, idx in enumerate(indices):
+            if self.neighbor_table is not None:
+                results[position] = self.neighbor_table.neighbors(idx, topn, self.removed, limit)
+            if results[position] is None:
+                missing.append(position)
+        if not missing:
+            return results
+
+        count = len(self.words) if limit is None else min(limit, len(self.words))
+        removed = self.removed[:count]
+        rows = np.asarray([indices[position] for position in missing], dtype=np.int64)
+        topn = min(topn, count - 1 - int(removed.sum()))
+        if topn <= 0:
+            for position in missing:
+                results[position] = (np.empty(0, dtype=np.int32), np.empty(0, dtype=np.float32))
+            return results
+
+        queries = self.unit_vectors(rows)
+        queries /= np.linalg.norm(queries, axis=1)[:, None]
+        if self.quantized is not None:
+            sims = self.quantized.cosines(queries, count)
+        else:
+            sims = np.dot(queries, np.asarray(self.model.vectors[:count], dtype=np.float32).T) / self.norms[:count]
+        sims[:, removed] = -np.inf
+        inside = rows < count
+        sims[np.flatnonzero(inside), rows[inside]] = -np.inf
+
+        best = np.argpartition(-sims, topn - 1, axis=1)[:, :topn]
+        best_sims = np.take_along_axis(sims, best, axis=1)
+        order = np.argsort(-best_sims, axis=1, kind="stable")
+        best = np.take_along_axis(best, order, axis=1).astype(np.int32)
+        best_sims = np.take_along_axis(best_sims, order, axis=1).astype(np.float32)
+        for row, position in enumerate(missing):
+            results[position] = (best[row], best_sims[row])
+        return results
+
+    def most_similar(self, word, topn):
+        """
+        Get the nearest neighbours of a word, like ``KeyedVectors.most_similar``, without the removed words.
+
+        :param str word: The word to expand.
+        :param int topn: Number of neighbours to return.
+        :returns: A list of (word, similarity) tuples, most similar first.
+        :rtype: list
+        """
+        indices, sims = self.nearest(self.index(word), topn)
+        return [(self.words[i], float(sim)) for i, sim in zip(indices, sims)]
@@ -0,0 +1,64 @@
+##
+# @file conftest.py
+# @brief Shared fixtures of the tests: a small random model and a solver configuration.
+
+import os
+import sys
+import numpy as np
+import pytest
+from gensim.models import KeyedVectors
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from src.configLoader import load_config
+from src.modelCache import save_word2vec_binary
+
+
+@pytest.fixture
+def model():
+    """
+    Small random model: 300 words of 16 dimensions.
+    """
+    rng = np.random.default_rng(0)
+    words = [f"mot{i}" for i in range(300)]
+    model = KeyedVectors(vector_size=16)
+    model.add_vectors(words, rng.standard_normal((len(words), 16)).astype(np.float32))
+    return model
+
+
+@pytest.fixture
+def solver_config(tmp_path, model):
+    """
+    Build the configuration of a solver using ``model`` and temporary resources, against a local server.
+
+    :returns: A function taking the server address and configuration overrides.
+    """
+    model_path = str(tmp_path / "model.bin")
+    save_word2vec_binary(model_path, model.index_to_key, model.vectors)
+
+    def make(url, **overrides):
+        cfg = load_config(os.path.join(ROOT, "src", "resources", "config.ini"))
+        cfg.update(
+            model_path=model_path,
+            model_cache_path=str(tmp_path / "model.cache"),
+            tombstones_path=str(tmp_path / "model.tombstones"),
+            neighbor_table_k=0,
+            invalid_dict_path=str(tmp_path / "invalid_words.txt"),
+            legacy_invalid_dict_path=None,
+            score_journal_path=None,
+            stats_file=None,
+            legacy_stats_file=None,
+            log_file="",
+            schema="http",
+            url=url,
+            rate_limit=0.0,
+            api_delay=0.001,
+            max_retries=1,
+            prefetch_workers=0,
+            start_words=["mot1", "mot2", "mot3"]
+        )
+        cfg.update(overrides)
+        return cfg
+
+    return make
@@ -0,0 +1,108 @@
+##
+# @file test_background_io.py
+# @brief Tests that the records and notifications queued for the background threads are flushed at exit.
+
+import subprocess
+import sys
+import textwrap
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+from conftest import ROOT
+
+
+def run_script(source):
+    """
+    Run a Python script from the repository root in a new interpreter, which exits at its end.
+    """
+    completed = subprocess.run([sys.executable, "-c", textwrap.dedent(source)], cwd=ROOT,
+                               capture_output=True, text=True, timeout=60)
+    assert completed.returncode == 0, completed.stderr
+    return completed
+
+
+class NtfyServer:
+    """
+    Stand-in ntfy server, slow to answer, failing the first request of each message with a 503.
+    """
+
+    def __init__(self, delay=0.05):
+        self.messages = []
+        self.attempts = {}
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def do_POST(self):
+                message = self.rfile.read(int(self.headers["Content-Length"])).decode("utf-8")
+                time.sleep(delay)
+                server.attempts[message] = server.attempts.get(message, 0) + 1
+                status = 503 if server.attempts[message] == 1 else 200
+                if status == 200:
+                    server.messages.append((self.path, self.headers.get("Authorization"), message))
+                self.send_response(status)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+@pytest.fixture
+def ntfy():
+    server = NtfyServer()
+    yield server
+    server.stop()
+
+
+@pytest.mark.parametrize("log_to_file", [True, False])
+def test_queued_log_records_are_written_at_exit(tmp_path, log_to_file):
+    log_file = str(tmp_path / "solver.log") if log_to_file else ""
+    completed = run_script(f"""
+        import logging
+        from src.configLoader import setup_logging
+        setup_logging("INFO", {log_file!r})
+        logger = logging.getLogger("test")
+        for i in range(2000):
+            logger.info("record %d", i)
+        logger.debug("hidden")
+    """)
+
+    # Records are written to stdout, and to the log file if any
+    outputs = [completed.stdout]
+    if log_to_file:
+        outputs.append((tmp_path / "solver.log").read_text(encoding="utf-8"))
+    for output in outputs:
+        lines = output.splitlines()
+        assert len(lines) == 2000
+        assert lines[-1].endswith("INFO - record 1999")
+
+
+def test_queued_notifications_are_sent_at_exit(ntfy):
+    run_script(f"""
+        from src.notifier import Notifier
+        notifier = Notifier({ntfy.url!r}, "cemantix", token="secret", backoff=0.01)
+        for i in range(5):
+            notifier.send(f"message {{i}}")
+    """)
+
+    assert ntfy.messages == [("/cemantix", "Bearer secret", f"message {i}") for i in range(5)]
+    assert all(attempts == 2 for attempts in ntfy.attempts.values())
+
+
+def test_closed_notifier_drops_new_notifications(ntfy):
+    from src.notifier import Notifier
+    notifier = Notifier(ntfy.url, "cemantix", backoff=0.01)
+    notifier.send("sent")
+    notifier.close()
+    notifier.send("dropped")
+
+    assert [message for _, _, message in ntfy.messages] == ["sent"]
@@ -0,0 +1,55 @@
+##
+# @file test_batch_solver.py
+# @brief Tests of the batch solver and of the stores shared by its workers.
+
+import pickle
+import pytest
+from src.batchSolver import solve_days
+from src.cemantixSimulator import CemantixSimulator
+from src.invalidWordStore import InvalidWordStore
+
+
+@pytest.fixture
+def simulator(model):
+    simulator = CemantixSimulator(model, ["mot250", "mot120", "mot42"], first_puzzle=1, seed=0).start()
+    yield simulator
+    simulator.stop()
+
+
+@pytest.fixture
+def legacy_path(tmp_path):
+    path = tmp_path / "invalid_words.pkl"
+    with open(path, "wb") as f:
+        pickle.dump({"mot7", "mot8"}, f)
+    return str(path)
+
+
+def test_read_only_store_does_not_import_the_legacy_file(tmp_path, legacy_path):
+    path = str(tmp_path / "invalid_words.txt")
+    store = InvalidWordStore(path, legacy_path, read_only=True)
+
+    assert len(store) == 0
+    assert not (tmp_path / "invalid_words.txt").exists()
+    with pytest.raises(RuntimeError):
+        store.add(["mot9"])
+    with pytest.raises(RuntimeError):
+        store.compact()
+
+
+def test_batch_migrates_the_legacy_store_before_the_workers(simulator, solver_config, legacy_path, tmp_path):
+    requested = []
+    score = simulator.score
+    simulator.score = lambda word, puzzle_number: requested.append(word) or score(word, puzzle_number)
+    cfg = solver_config(simulator.url, strategy="pruning", legacy_invalid_dict_path=legacy_path,
+                        score_journal_path=str(tmp_path / "journal.sqlite3"),
+                        start_words=["mot7", "mot1", "mot8", "mot2"])
+
+    results = solve_days(cfg, [1, 2, 3], workers=3)
+
+    assert [(result["word"], result["score"]) for result in results] == [
+        ("mot250", 1.0), ("mot120", 1.0), ("mot42", 1.0)]
+    assert sorted(InvalidWordStore(cfg["invalid_dict_path"])) == ["mot7", "mot8"]
+    assert [path.name for path in tmp_path.iterdir() if path.name.endswith(".tmp")] == []
+    # Every worker read the migrated invalid words
+    assert "mot1" in requested
+    assert "mot7" not in requested and "mot8" not in requested
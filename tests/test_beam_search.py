@@ -0,0 +1,52 @@
+##
+# @file test_beam_search.py
+# @brief Tests of the guesses of the beam search against the former word-keyed solving loop.
+
+import os
+import numpy as np
+import pytest
+from conftest import ROOT
+from src.configLoader import load_config
+from src.microBenchmark import index_session, word_keyed_session
+from src.modelCache import build_model_cache, save_word2vec_binary
+from src.neighborTable import build_neighbor_table, load_neighbor_table
+from src.vectorIndex import VectorIndex
+
+
+@pytest.fixture
+def neighbor_table(tmp_path, model):
+    model_path = str(tmp_path / "model.bin")
+    cache_dir = str(tmp_path / "model.cache")
+    save_word2vec_binary(model_path, model.index_to_key, model.vectors)
+    build_model_cache(model_path, cache_dir, model)
+    build_neighbor_table(model, cache_dir, 20, workers=2)
+    table = load_neighbor_table(cache_dir)
+    assert table is not None
+    return table
+
+
+@pytest.mark.parametrize("use_table", [False, True])
+@pytest.mark.parametrize("prefetch_workers", [0, 2])
+@pytest.mark.parametrize("hidden, start_words", [
+    ("mot140", ["mot1", "mot2", "mot3"]),
+    ("mot105", ["mot5"]),
+    # The hidden word is invalid: the search goes on until no new candidate is left
+    ("mot7", ["mot1", "mot2", "mot3"])
+])
+def test_beam_guesses_match_the_word_keyed_loop(model, neighbor_table, use_table, prefetch_workers, hidden, start_words):
+    cfg = dict(load_config(os.path.join(ROOT, "src", "resources", "config.ini")),
+               beam_size=4, topn=10, prefetch_workers=prefetch_workers, hot_vocabulary_size=0)
+    index = VectorIndex(model, None, neighbor_table if use_table else None)
+    scores = dict(zip(index.words, index.similarities(index.unit_vector(index.index(hidden))).tolist()))
+    scores[hidden] = 1.0
+    invalid_words = {"mot7", "mot11", "mot12", "mot13"}
+    excluded = np.zeros(len(index), dtype=bool)
+    excluded[[index.index(word) for word in invalid_words]] = True
+
+    expected = word_keyed_session(model, cfg, invalid_words, scores.__getitem__, start_words, len(index))
+    guessed = index_session(index, cfg, excluded, scores.__getitem__, start_words, len(index))
+
+    assert guessed == expected
+    assert len(guessed) > 40
+    assert guessed[-1] == hidden or hidden in invalid_words
+    assert not invalid_words & set(guessed)
@@ -0,0 +1,41 @@
+##
+# @file test_benchmark.py
+# @brief Tests of the end-to-end benchmark against the simulator.
+
+from src.benchmark import compare_seed_strategies, run_benchmark
+from src.cemantixSimulator import CemantixSimulator
+from src.modelTombstones import append_tombstones, load_tombstones
+
+
+def test_seed_strategies_are_compared_on_the_same_puzzles(solver_config, tmp_path):
+    cfg = solver_config("unused", strategy="triangulation", seed_count=3)
+
+    results = compare_seed_strategies(cfg, count=4, seed=1, output_path=str(tmp_path / "seeds.json"))
+
+    fixed, clusters = results["benchmarks"]["fixed"], results["benchmarks"]["clusters"]
+    assert [run["hidden_word"] for run in fixed["runs"]] == [run["hidden_word"] for run in clusters["runs"]]
+    assert fixed["solved_rate"] == clusters["solved_rate"] == 1.0
+    comparison = results["comparison"]["clusters"]
+    assert comparison["fewer"] + comparison["same"] + comparison["more"] == 4
+    differences = [run["requests_count"] - reference["requests_count"]
+                   for run, reference in zip(clusters["runs"], fixed["runs"])]
+    assert comparison["mean_difference"] == sum(differences) / 4
+    assert (tmp_path / "seeds.json").exists()
+
+
+def test_configured_tombstones_are_applied_read_only(solver_config, tmp_path, monkeypatch):
+    requested = []
+    score = CemantixSimulator.score
+    monkeypatch.setattr(CemantixSimulator, "score",
+                        lambda self, word, puzzle_number: requested.append(word) or score(self, word, puzzle_number))
+    tombstones = {"mot1", "mot2"} | {f"mot{i}" for i in range(100, 300)}
+    cfg = solver_config("unused", strategy="pruning")
+    append_tombstones(cfg["tombstones_path"], sorted(tombstones))
+
+    results = run_benchmark(cfg, count=3, seed=0)
+
+    assert results["config"]["tombstones"] == len(tombstones)
+    assert results["solved_rate"] == 1.0
+    assert all(run["hidden_word"] not in tombstones for run in results["runs"])
+    assert requested and not tombstones & set(requested)
+    assert load_tombstones(cfg["tombstones_path"]) == tombstones
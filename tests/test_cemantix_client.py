@@ -0,0 +1,172 @@
+##
+# @file test_cemantix_client.py
+# @brief Tests of the retries, backoff and adaptive rate of the API client.
+
+import json
+import threading
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+from src import cemantixClient
+from src.cemantixClient import CemantixClient
+
+
+class ScriptedServer:
+    """
+    Stand-in API answering the scripted (status, headers) pairs in order, then healthy scores.
+    """
+
+    def __init__(self):
+        self.answers = []
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def do_POST(self):
+                self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                status, headers = server.answers.pop(0) if server.answers else (200, {})
+                body = json.dumps({"s": 0.5}).encode("utf-8") if status == 200 else b""
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"127.0.0.1:{self.httpd.server_address[1]}"
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+@pytest.fixture
+def server():
+    server = ScriptedServer()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """
+    Delays slept before the retries, without sleeping.
+    """
+    delays = []
+    monkeypatch.setattr(cemantixClient.time, "sleep", delays.append)
+    return delays
+
+
+@pytest.fixture
+def client(server, solver_config):
+    def make(**overrides):
+        cfg = solver_config(server.url, max_retries=4, api_delay=0.1, backoff_max=10.0, rate_limit=2.0,
+                            adaptive_rate_min=0.2)
+        cfg.update(overrides)
+        client = CemantixClient(cfg)
+        return client
+
+    return make
+
+
+@pytest.mark.parametrize("status", [429, 503])
+def test_retry_after_seconds_is_waited_before_retrying(server, client, sleeps, status):
+    server.answers = [(status, {"Retry-After": "7"})]
+    client = client()
+
+    assert client.get_score("mot1", 1) == {"s": 0.5}
+    assert sleeps == [7.0]
+    metrics = client.metrics()
+    assert (metrics["retries"], metrics["throttled"], metrics["failures"]) == (1, 1, 0)
+    assert metrics["backoff_time"] == 7.0
+
+
+def test_retry_after_date_is_waited_before_retrying(server, client, sleeps):
+    server.answers = [(503, {"Retry-After": format_datetime(datetime.now(timezone.utc) + timedelta(seconds=5),
+                                                            usegmt=True)})]
+
+    assert client().get_score("mot1", 1) == {"s": 0.5}
+    assert len(sleeps) == 1 and 3.0 < sleeps[0] <= 5.0
+
+
+def test_retry_after_is_capped_by_backoff_max(server, client, sleeps):
+    server.answers = [(429, {"Retry-After": "3600"})]
+
+    assert client().get_score("mot1", 1) == {"s": 0.5}
+    assert sleeps == [10.0]
+
+
+@pytest.mark.parametrize("headers", [{}, {"Retry-After": "soon"}])
+def test_backoff_is_exponential_with_jitter_without_retry_after(server, client, sleeps, headers):
+    server.answers = [(503, headers), (429, headers), (500, headers)]
+
+    assert client().get_score("mot1", 1) == {"s": 0.5}
+    assert len(sleeps) == 3
+    for attempt, delay in enumerate(sleeps):
+        assert 0.1 * 2 ** attempt / 2 <= delay <= 0.1 * 2 ** attempt
+
+
+def test_request_fails_after_max_retries(server, client, sleeps):
+    server.answers = [(503, {})] * 4
+    client = client()
+
+    assert client.get_score("mot1", 1) is None
+    assert len(sleeps) == 3
+    assert client.metrics()["failures"] == 1
+
+
+def test_rate_is_halved_on_throttling_and_recovers_on_healthy_answers(server, client, sleeps):
+    client = client(max_retries=1)
+    rates = []
+
+    server.answers = [(429, {}), (503, {}), (500, {})]
+    for _ in range(3):
+        client.get_score("mot1", 1)
+        rates.append(client.current_rate())
+    # Server errors other than throttling leave the rate as is
+    assert rates == [1.0, 0.5, 0.5]
+
+    server.answers = [(429, {})] * 10
+    for _ in range(10):
+        client.get_score("mot1", 1)
+    assert client.current_rate() == 0.2
+
+    # Each healthy answer gives back a 20th of the configured rate, up to the configured rate
+    rates = []
+    for _ in range(20):
+        client.get_score("mot1", 1)
+        rates.append(client.current_rate())
+    assert rates[0] == pytest.approx(0.3)
+    assert rates[17] == pytest.approx(2.0)
+    assert rates[17:] == [2.0] * 3
+    assert client.metrics()["throttled"] == 12
+
+
+def test_rate_stays_unlimited_when_throttled(server, client, sleeps):
+    server.answers = [(429, {})]
+    client = client(rate_limit=0.0)
+
+    assert client.get_score("mot1", 1) == {"s": 0.5}
+    assert client.current_rate() == 0.0
+
+
+def test_concurrent_answers_never_raise_the_rate_above_the_configured_one(server, client, sleeps):
+    client = client(max_retries=1)
+    server.answers = [(429, {})] * 3
+    for _ in range(3):
+        client.get_score("mot1", 1)
+
+    threads = [threading.Thread(target=lambda: [client.get_score("mot1", 1) for _ in range(10)]) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert client.current_rate() == 2.0
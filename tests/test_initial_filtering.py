@@ -0,0 +1,110 @@
+##
+# @file test_initial_filtering.py
+# @brief Tests of the vectorized glossary filter against the former per-word checks.
+
+import numpy as np
+import pandas as pd
+import pytest
+from src.initialFiltering import filter_vocabulary, index_glossary, order_by_frequency
+
+# The empty word used to make pandas downcast an object array, which is deprecated
+pytestmark = pytest.mark.filterwarnings("error::FutureWarning")
+
+GLOSSARY = pd.DataFrame([
+    # ortho, nombre, cgram, freqfilms2, freqlivres
+    ("maison", "s", "NOM", 10.0, 20.0),
+    ("maisons", "p", "NOM", 5.0, 5.0),
+    ("été", "s", "NOM", 30.0, 10.0),
+    ("été", "", "VER", 50.0, 50.0),
+    ("ça", np.nan, "PRO:dem", 100.0, 80.0),
+    ("porte-monnaie", "s", "NOM", 1.0, 1.0),
+    ("-ab", "s", "NOM", 1.0, 1.0),
+    ("--", np.nan, "ONO", 1.0, 1.0),
+    ("a", "s", "NOM", 1.0, 1.0),
+    ("l'eau", "s", "NOM", 1.0, 1.0),
+    ("mangeons", "p", "VER", 2.0, 2.0),
+    ("avoir", np.nan, "AUX", 40.0, 40.0),
+    ("chiens", "p", "NOM", 3.0, 3.0),
+    ("chiens", "s", "NOM", 3.0, 3.0),
+    ("chien", "s", np.nan, 3.0, 3.0),
+    ("rare", "s", "ADJ", np.nan, np.nan),
+    ("oublié", "s", "ADJ", 7.0, 7.0),
+    ("1er", "s", "ADJ:num", 2.0, 2.0),
+    ("bon_jour", "s", "NOM", 1.0, 1.0),
+    (np.nan, "s", "NOM", 1.0, 1.0),
+], columns=["ortho", "nombre", "cgram", "freqfilms2", "freqlivres"])
+
+WORDS = ["maison", "maisons", "été", "ça", "porte-monnaie", "-ab", "--", "a", "", "l'eau",
+         "mangeons", "avoir", "chiens", "chien", "rare", "oublié", "1er", "bon_jour", "absent",
+         "Été"]
+
+INVALID_WORDS = {"oublié", "absent"}
+
+
+def reference_keep(df, words, invalid_words):
+    """
+    Copy of the per-word checks used before the filter was vectorized.
+    """
+    def is_valid_word(word):
+        if len(word) < 2:
+            return False
+        if not word[0].isalnum():
+            return False
+        if not word.replace("-", "").isalnum():
+            return False
+        return True
+
+    def is_plural(word):
+        word_data = df[df['ortho'] == word]
+        if not word_data.empty:
+            return word_data.iloc[0]['nombre'] == 'p'
+        return False
+
+    def is_conjugated(word):
+        word_data = df[df['ortho'] == word]
+        if not word_data.empty:
+            cgram = word_data.iloc[0]['cgram']
+            if type(cgram) != float:
+                return 'VER' in cgram or 'AUX' in cgram
+        return False
+
+    def exists(word):
+        word_data = df[df['ortho'] == word]
+        return not word_data.empty
+
+    return [word not in invalid_words and exists(word) and is_valid_word(word)
+            and not is_plural(word) and not is_conjugated(word) for word in words]
+
+
+def test_kept_words_match_the_per_word_checks():
+    keep = filter_vocabulary(WORDS, index_glossary(GLOSSARY), INVALID_WORDS)
+
+    assert keep.dtype == bool
+    assert keep.tolist() == reference_keep(GLOSSARY, WORDS, INVALID_WORDS)
+    assert [word for word, kept in zip(WORDS, keep) if kept] == [
+        "maison", "été", "ça", "porte-monnaie", "chien", "rare", "1er"]
+
+
+def test_kept_words_match_without_invalid_words():
+    keep = filter_vocabulary(WORDS, index_glossary(GLOSSARY), set())
+
+    assert keep.tolist() == reference_keep(GLOSSARY, WORDS, set())
+
+
+@pytest.mark.parametrize("columns", [["freqfilms2", "freqlivres"], ["freqlivres"]])
+def test_words_without_frequency_come_last(columns):
+    glossary = index_glossary(GLOSSARY.drop(columns=columns))
+    words = ["rare", "maison", "ça", "chien", "1er"]
+    keep = filter_vocabulary(words, glossary, set())
+
+    assert order_by_frequency(words, glossary, keep).tolist() == [0, 1, 2, 3, 4]
+
+
+def test_words_are_ordered_by_frequency():
+    glossary = index_glossary(GLOSSARY)
+    words = ["rare", "maison", "ça", "chien", "1er", "été", "l'eau"]
+    keep = filter_vocabulary(words, glossary, set())
+
+    # ça 90, été (both entries) 70, maison 15, chien 3, 1er 2, rare has no frequency
+    assert [words[i] for i in order_by_frequency(words, glossary, keep)] == [
+        "ça", "été", "maison", "chien", "1er", "rare"]
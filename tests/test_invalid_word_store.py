@@ -0,0 +1,91 @@
+##
+# @file test_invalid_word_store.py
+# @brief Tests of the invalid words log shared by several processes.
+
+import multiprocessing
+from src.invalidWordStore import InvalidWordStore
+
+
+def read_lines(path):
+    with open(path, encoding="utf-8") as f:
+        return f.read().splitlines()
+
+
+def test_lines_appended_by_other_stores_are_read(tmp_path):
+    path = str(tmp_path / "invalid_words.txt")
+    store = InvalidWordStore(path)
+    other = InvalidWordStore(path)
+
+    other.add(["mot1", "mot2"])
+    assert store.add(["mot2", "mot3"]) == 1
+
+    assert sorted(store) == ["mot1", "mot2", "mot3"]
+    assert store.line_count == 3
+    assert read_lines(path) == ["mot1", "mot2", "mot3"]
+
+
+def test_duplicates_appended_by_other_processes_trigger_compaction(tmp_path):
+    path = str(tmp_path / "invalid_words.txt")
+    words = [f"mot{i}" for i in range(10)]
+    store = InvalidWordStore(path)
+
+    # Three other processes append the same words, each without seeing the others' lines
+    with open(path, "a", encoding="utf-8") as f:
+        f.writelines(f"{word}\n" for word in words * 3)
+    assert len(read_lines(path)) == 30
+
+    store.add(["mot10"])
+
+    assert read_lines(path) == words + ["mot10"]
+    assert store.line_count == 11
+
+
+def test_store_reads_the_log_again_after_another_store_compacts_it(tmp_path):
+    path = str(tmp_path / "invalid_words.txt")
+    with open(path, "w", encoding="utf-8") as f:
+        f.writelines(f"mot{i % 3}\n" for i in range(4))
+    store = InvalidWordStore(path)
+    other = InvalidWordStore(path)
+
+    other.compact()
+    store.add(["mot3"])
+
+    assert read_lines(path) == ["mot0", "mot1", "mot2", "mot3"]
+    assert store.line_count == 4
+
+
+def test_partial_line_is_read_once_complete(tmp_path):
+    path = str(tmp_path / "invalid_words.txt")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("mot1\nmo")
+    store = InvalidWordStore(path)
+    assert sorted(store) == ["mot1"]
+
+    with open(path, "a", encoding="utf-8") as f:
+        f.write("t2\n")
+    store.add(["mot3"])
+
+    assert sorted(store) == ["mot1", "mot2", "mot3"]
+    assert store.line_count == 3
+
+
+def add_words(path, prefix, count):
+    store = InvalidWordStore(path)
+    for i in range(count):
+        store.add([f"{prefix}{i}", "commun"])
+
+
+def test_compaction_does_not_lose_lines_appended_meanwhile(tmp_path):
+    path = str(tmp_path / "invalid_words.txt")
+    context = multiprocessing.get_context("fork")
+    writers = [context.Process(target=add_words, args=(path, f"mot{n}-", 200)) for n in range(3)]
+    for writer in writers:
+        writer.start()
+    store = InvalidWordStore(path)
+    while any(writer.is_alive() for writer in writers):
+        store.compact()
+    for writer in writers:
+        writer.join()
+
+    lines = read_lines(path)
+    assert len(lines) == len(set(lines)) == 3 * 200 + 1
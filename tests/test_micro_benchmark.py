@@ -0,0 +1,39 @@
+##
+# @file test_micro_benchmark.py
+# @brief Tests of the beam sessions compared by the micro-benchmarks.
+
+import os
+import numpy as np
+from conftest import ROOT
+from src.configLoader import load_config
+from src.microBenchmark import index_session, word_keyed_session
+from src.vectorIndex import VectorIndex
+
+
+def test_word_keyed_and_index_sessions_send_the_same_guesses(model):
+    cfg = dict(load_config(os.path.join(ROOT, "src", "resources", "config.ini")),
+               prefetch_workers=0, hot_vocabulary_size=0, beam_size=5, topn=10)
+    index = VectorIndex(model)
+    scores = dict(zip(index.words, index.similarities(index.unit_vector(index.index("mot250"))).tolist()))
+    scores["mot250"] = 1.0
+    excluded = np.zeros(len(index), dtype=bool)
+    excluded[[7, 8]] = True
+    start_words = ["mot1", "mot7", "mot2", "mot3"]
+
+    words = word_keyed_session(model, cfg, {"mot7", "mot8"}, scores.__getitem__, start_words, 300)
+    indices = index_session(index, cfg, excluded, scores.__getitem__, start_words, 300)
+
+    assert words[:3] == ["mot1", "mot2", "mot3"]
+    assert words[-1] == "mot250"
+    assert "mot8" not in words
+    assert words == indices
+
+
+def test_sessions_stop_after_the_requests(model):
+    cfg = dict(load_config(os.path.join(ROOT, "src", "resources", "config.ini")),
+               prefetch_workers=0, hot_vocabulary_size=0)
+    index = VectorIndex(model)
+    scores = dict.fromkeys(index.words, 0.5)
+
+    assert len(word_keyed_session(model, cfg, set(), scores.__getitem__, ["mot1"], 20)) == 20
+    assert len(index_session(index, cfg, np.zeros(len(index), dtype=bool), scores.__getitem__, ["mot1"], 20)) == 20
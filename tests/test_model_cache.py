@@ -0,0 +1,155 @@
+##
+# @file test_model_cache.py
+# @brief Tests of the memory-mapped model cache and of the word2vec binary writer.
+
+import json
+import os
+import numpy as np
+import pytest
+from gensim.models import KeyedVectors
+from src import modelCache
+from src.modelCache import META_FILE, is_cache_fresh, load_model, model_signature, save_word2vec_binary
+
+
+@pytest.fixture
+def model_path(tmp_path, model):
+    path = str(tmp_path / "model.bin")
+    save_word2vec_binary(path, model.index_to_key, model.vectors)
+    return path
+
+
+def assert_same_model(loaded, model):
+    assert loaded.index_to_key == model.index_to_key
+    np.testing.assert_array_equal(loaded.vectors, model.vectors)
+
+
+def test_missing_cache_is_built_then_memory_mapped(model_path, tmp_path, model):
+    cache_dir = str(tmp_path / "model.cache")
+
+    assert_same_model(load_model(model_path, cache_dir), model)
+    assert is_cache_fresh(model_path, cache_dir)
+
+    cached = load_model(model_path, cache_dir)
+    assert isinstance(cached.vectors, np.memmap)
+    assert_same_model(cached, model)
+
+
+def test_cache_is_rebuilt_when_the_model_changed(model_path, tmp_path, model):
+    cache_dir = str(tmp_path / "model.cache")
+    load_model(model_path, cache_dir)
+
+    keep = np.arange(len(model.index_to_key)) % 2 == 0
+    save_word2vec_binary(model_path, model.index_to_key, model.vectors, keep)
+
+    assert not is_cache_fresh(model_path, cache_dir)
+    kept = [word for word, kept in zip(model.index_to_key, keep) if kept]
+    assert load_model(model_path, cache_dir).index_to_key == kept
+    assert is_cache_fresh(model_path, cache_dir)
+    assert load_model(model_path, cache_dir).index_to_key == kept
+
+
+def test_cache_is_rebuilt_when_the_signature_does_not_match(model_path, tmp_path, model):
+    cache_dir = str(tmp_path / "model.cache")
+    load_model(model_path, cache_dir)
+    # Same size, other modification time: the binary may have been replaced by another model
+    stat = os.stat(model_path)
+    os.utime(model_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+    assert not is_cache_fresh(model_path, cache_dir)
+    assert not isinstance(load_model(model_path, cache_dir).vectors, np.memmap)
+    with open(os.path.join(cache_dir, META_FILE), encoding="utf-8") as f:
+        assert json.load(f)["source"] == model_signature(model_path)
+    assert isinstance(load_model(model_path, cache_dir).vectors, np.memmap)
+
+
+@pytest.mark.parametrize("meta", [None, "{", json.dumps({"count": 300})])
+def test_cache_without_valid_metadata_is_rebuilt(model_path, tmp_path, model, meta):
+    cache_dir = str(tmp_path / "model.cache")
+    load_model(model_path, cache_dir)
+    meta_path = os.path.join(cache_dir, META_FILE)
+    # A build interrupted before the metadata was written, or a corrupted metadata file
+    if meta is None:
+        os.remove(meta_path)
+    else:
+        with open(meta_path, "w", encoding="utf-8") as f:
+            f.write(meta)
+
+    assert not is_cache_fresh(model_path, cache_dir)
+    assert_same_model(load_model(model_path, cache_dir), model)
+    assert is_cache_fresh(model_path, cache_dir)
+
+
+@pytest.fixture
+def small_chunks(monkeypatch):
+    """
+    Rewrite models in chunks of 7 rows, so every test crosses chunk boundaries.
+    """
+    monkeypatch.setattr(modelCache, "CHUNK_ROWS", 7)
+
+
+def test_binary_is_byte_identical_to_gensim(tmp_path, model, small_chunks):
+    path = str(tmp_path / "model.bin")
+    model.save_word2vec_format(str(tmp_path / "gensim.bin"), binary=True)
+
+    assert save_word2vec_binary(path, model.index_to_key, model.vectors) == len(model.index_to_key)
+    assert (tmp_path / "model.bin").read_bytes() == (tmp_path / "gensim.bin").read_bytes()
+
+
+@pytest.mark.parametrize("selection", ["mask", "order"])
+def test_kept_rows_round_trip_through_gensim(tmp_path, model, small_chunks, selection):
+    rng = np.random.default_rng(2)
+    model.add_vectors(["été", "porte-monnaie"], rng.standard_normal((2, 16)).astype(np.float32))
+    if selection == "mask":
+        keep = rng.random(len(model.index_to_key)) > 0.3
+        rows = np.flatnonzero(keep)
+    else:
+        keep = rows = rng.permutation(len(model.index_to_key))[:250]
+    path = str(tmp_path / "model.bin")
+
+    assert save_word2vec_binary(path, model.index_to_key, model.vectors, keep) == len(rows)
+
+    loaded = KeyedVectors.load_word2vec_format(path, binary=True)
+    assert loaded.index_to_key == [model.index_to_key[row] for row in rows]
+    np.testing.assert_array_equal(loaded.vectors, model.vectors[rows])
+
+
+def test_memory_mapped_matrix_is_rewritten(model_path, tmp_path, model, small_chunks):
+    cache_dir = str(tmp_path / "model.cache")
+    load_model(model_path, cache_dir)
+    cached = load_model(model_path, cache_dir)
+    assert isinstance(cached.vectors, np.memmap)
+    keep = np.arange(len(model.index_to_key)) >= 100
+
+    save_word2vec_binary(model_path, cached.index_to_key, cached.vectors, keep)
+
+    loaded = KeyedVectors.load_word2vec_format(model_path, binary=True)
+    assert loaded.index_to_key == model.index_to_key[100:]
+    np.testing.assert_array_equal(loaded.vectors, model.vectors[100:])
+
+
+class FailingMatrix:
+    """
+    Matrix failing when the rows after ``fail_at`` are read, as a crash in the middle of a rewrite.
+    """
+
+    def __init__(self, vectors, fail_at):
+        self.vectors = vectors
+        self.shape = vectors.shape
+        self.fail_at = fail_at
+
+    def __getitem__(self, rows):
+        if np.max(rows) >= self.fail_at:
+            raise MemoryError("crash")
+        return self.vectors[rows]
+
+
+def test_failed_rewrite_leaves_the_model_untouched(model_path, model, small_chunks):
+    with open(model_path, "rb") as f:
+        before = f.read()
+
+    with pytest.raises(MemoryError):
+        save_word2vec_binary(model_path, model.index_to_key, FailingMatrix(model.vectors, 150))
+
+    with open(model_path, "rb") as f:
+        assert f.read() == before
+    assert_same_model(KeyedVectors.load_word2vec_format(model_path, binary=True), model)
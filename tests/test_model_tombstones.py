@@ -0,0 +1,109 @@
+##
+# @file test_model_tombstones.py
+# @brief Tests of the words removed from the model through the tombstone sidecar.
+
+import numpy as np
+import pytest
+from gensim.models import KeyedVectors
+from src.CemantixSolver import CemantixSolver
+from src.cemantixSimulator import CemantixSimulator
+from src.invalidWordStore import InvalidWordStore
+from src.modelCache import build_model_cache, is_cache_fresh, load_cached_model
+from src.modelTombstones import append_tombstones, compact_model, load_tombstones
+from src.neighborTable import build_neighbor_table, load_neighbor_table
+
+
+@pytest.fixture
+def simulator(model):
+    simulator = CemantixSimulator(model, ["mot140"], first_puzzle=1, seed=0).start()
+    yield simulator
+    simulator.stop()
+
+
+@pytest.fixture
+def tombstones(model):
+    """
+    Removed words: a start word, neighbours of the hidden word and some other words.
+    """
+    neighbors = [word for word, _ in model.most_similar("mot140", topn=3)]
+    return {"mot1", *neighbors, *(f"mot{i}" for i in range(200, 220))}
+
+
+def remove_words(cfg, words):
+    """
+    Remove words from the model as a solve does: persist them as invalid words and tombstone them.
+    """
+    InvalidWordStore(cfg["invalid_dict_path"]).add(words)
+    append_tombstones(cfg["tombstones_path"], sorted(words))
+
+
+def solve(simulator, cfg):
+    """
+    Solve the simulated puzzle with a fresh solver.
+
+    :returns: The result of the solve and the guessed words, in order.
+    """
+    guessed = []
+    score = simulator.score
+    simulator.score = lambda word, puzzle_number: guessed.append(word) or score(word, puzzle_number)
+    try:
+        result = CemantixSolver(cfg, notify=False).solve(day=1)
+    finally:
+        simulator.score = score
+    return result, guessed
+
+
+def test_tombstoned_words_are_hidden_before_compaction(simulator, solver_config, tombstones, model):
+    cfg = solver_config(simulator.url, strategy="beam", compaction_threshold=10 ** 6)
+    build_model_cache(cfg["model_path"], cfg["model_cache_path"])
+    build_neighbor_table(load_cached_model(cfg["model_cache_path"]), cfg["model_cache_path"], 20, workers=2)
+    remove_words(cfg, tombstones)
+
+    result, guessed = solve(simulator, cfg)
+
+    assert result[0] == "mot140"
+    assert guessed and not tombstones & set(guessed)
+    # The words are only hidden: the binary and the cache still hold them
+    assert KeyedVectors.load_word2vec_format(cfg["model_path"], binary=True).index_to_key == model.index_to_key
+    assert load_cached_model(cfg["model_cache_path"]).index_to_key == model.index_to_key
+    assert load_tombstones(cfg["tombstones_path"]) == tombstones
+
+
+def test_compaction_keeps_the_binary_the_cache_and_the_neighbour_table_in_agreement(
+        simulator, solver_config, tombstones, model, tmp_path):
+    # One request at a time, so both solves send their guesses in the same order
+    cfg = solver_config(simulator.url, strategy="beam", compaction_threshold=10 ** 6, rate_burst=1)
+    build_model_cache(cfg["model_path"], cfg["model_cache_path"])
+    build_neighbor_table(load_cached_model(cfg["model_cache_path"]), cfg["model_cache_path"], 20, workers=2)
+    remove_words(cfg, tombstones)
+    _, guessed_before = solve(simulator, cfg)
+
+    compact_model(cfg["model_path"], cfg["model_cache_path"], cfg["tombstones_path"])
+
+    kept = [word for word in model.index_to_key if word not in tombstones]
+    binary = KeyedVectors.load_word2vec_format(cfg["model_path"], binary=True)
+    assert binary.index_to_key == kept
+    np.testing.assert_array_equal(binary.vectors, model[kept])
+    assert is_cache_fresh(cfg["model_path"], cfg["model_cache_path"])
+    cache = load_cached_model(cfg["model_cache_path"])
+    assert cache.index_to_key == kept
+    np.testing.assert_array_equal(cache.vectors, binary.vectors)
+    assert load_tombstones(cfg["tombstones_path"]) == set()
+
+    # The remapped table holds the neighbours of a fresh table, without the removed ones
+    table = load_neighbor_table(cfg["model_cache_path"])
+    assert table is not None
+    fresh_dir = str(tmp_path / "fresh.cache")
+    build_model_cache(cfg["model_path"], fresh_dir, binary)
+    build_neighbor_table(binary, fresh_dir, 20, workers=2)
+    fresh = load_neighbor_table(fresh_dir)
+    for row, fresh_row, sims, fresh_sims in zip(table.indices, fresh.indices, table.similarities, fresh.similarities):
+        valid = row >= 0
+        assert row[valid].tolist() == fresh_row[:valid.sum()].tolist()
+        np.testing.assert_array_equal(sims[valid], fresh_sims[:valid.sum()])
+
+    # The compacted model is searched exactly as the model with its tombstones was, until the
+    # hidden word is found (a request already sent by then may or may not reach the server)
+    _, guessed_after = solve(simulator, cfg)
+    found = guessed_before.index("mot140") + 1
+    assert guessed_after[:found] == guessed_before[:found]
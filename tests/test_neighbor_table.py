@@ -0,0 +1,81 @@
+##
+# @file test_neighbor_table.py
+# @brief Tests of the precomputed neighbour table against gensim and against a fresh build.
+
+import numpy as np
+import pytest
+from src.modelCache import build_model_cache, load_cached_model, read_cache_meta, save_word2vec_binary
+from src.neighborTable import build_neighbor_table, compact_neighbor_table, load_neighbor_table
+
+
+def build(tmp_path, name, model, k=20, workers=2):
+    """
+    Write the model, its cache and its neighbour table in a folder.
+
+    :returns: The model path and the cache folder.
+    """
+    model_path = str(tmp_path / f"{name}.bin")
+    cache_dir = str(tmp_path / f"{name}.cache")
+    save_word2vec_binary(model_path, model.index_to_key, model.vectors)
+    build_model_cache(model_path, cache_dir, model)
+    build_neighbor_table(model, cache_dir, k, workers)
+    return model_path, cache_dir
+
+
+@pytest.mark.parametrize("workers", [1, 3])
+def test_table_holds_the_gensim_neighbours(tmp_path, model, workers):
+    _, cache_dir = build(tmp_path, "model", model, workers=workers)
+    table = load_neighbor_table(cache_dir)
+
+    assert table.k == 20
+    for idx in (0, 42, 299):
+        expected = model.most_similar(model.index_to_key[idx], topn=20)
+        assert [model.index_to_key[i] for i in table.indices[idx]] == [word for word, _ in expected]
+        np.testing.assert_allclose(table.similarities[idx], [sim for _, sim in expected], atol=1e-3)
+
+
+def test_remapped_table_matches_a_fresh_build(tmp_path, model):
+    model_path, cache_dir = build(tmp_path, "model", model)
+    previous_source = read_cache_meta(cache_dir)["source"]
+    keep = np.random.default_rng(1).random(len(model.index_to_key)) > 0.2
+    kept = [word for word, kept in zip(model.index_to_key, keep) if kept]
+
+    # Compaction: the binary is rewritten and the cache rebuilt from the kept rows, then the table remapped
+    save_word2vec_binary(model_path, model.index_to_key, model.vectors, keep)
+    build_model_cache(model_path, cache_dir, model, keep)
+    compact_neighbor_table(cache_dir, keep, previous_source)
+
+    table = load_neighbor_table(cache_dir)
+    assert table is not None and table.indices.shape == (len(kept), 20)
+    _, fresh_dir = build(tmp_path, "fresh", load_cached_model(cache_dir))
+    fresh = load_neighbor_table(fresh_dir)
+    removed = np.zeros(len(kept), dtype=bool)
+    for idx in range(len(kept)):
+        row = table.indices[idx]
+        valid = row >= 0
+        # Neighbours removed by the compaction are dropped, the others keep their rank
+        neighbors = [word for word, _ in model.most_similar(kept[idx], topn=20)]
+        assert valid.sum() == sum(keep[model.get_index(word)] for word in neighbors)
+        assert row[valid].tolist() == fresh.indices[idx][:valid.sum()].tolist()
+        np.testing.assert_array_equal(table.similarities[idx][valid], fresh.similarities[idx][:valid.sum()])
+        # The solver lookup falls back to a full search when too many neighbours were removed
+        result = table.neighbors(idx, 10, removed)
+        if valid.sum() >= 10:
+            assert result[0].tolist() == fresh.indices[idx][:10].tolist()
+        else:
+            assert result is None
+
+
+def test_table_of_another_model_is_not_remapped(tmp_path, model):
+    _, cache_dir = build(tmp_path, "model", model)
+    other_path, other_dir = build(tmp_path, "other", model)
+    keep = np.ones(len(model.index_to_key), dtype=bool)
+    keep[:10] = False
+    stale_source = read_cache_meta(other_dir)["source"]
+    stale_source["size"] += 1
+
+    compact_neighbor_table(cache_dir, keep, stale_source)
+
+    table = load_neighbor_table(cache_dir)
+    assert table.indices.shape == (len(model.index_to_key), 20)
+    assert (table.indices >= 0).all()
@@ -0,0 +1,104 @@
+##
+# @file test_score_journal.py
+# @brief Tests of the score journal: resuming a crashed solve, and strategies solving the same puzzle.
+
+import sqlite3
+import pytest
+from src.cemantixSimulator import CemantixSimulator
+from src.CemantixSolver import CemantixSolver
+from src.scoreJournal import ScoreJournal
+
+
+class Crash(Exception):
+    pass
+
+
+@pytest.fixture
+def simulator(model):
+    simulator = CemantixSimulator(model, ["mot250"], first_puzzle=1, seed=0).start()
+    yield simulator
+    simulator.stop()
+
+
+def record_requests(simulator):
+    requested = []
+    score = simulator.score
+    simulator.score = lambda word, puzzle_number: requested.append(word) or score(word, puzzle_number)
+    return requested
+
+
+def crash_after(solver, answers):
+    """
+    Make the solver die once ``answers`` answers are journaled.
+    """
+    record = solver.journal.record
+
+    def crashing_record(*args):
+        record(*args)
+        crashing_record.count += 1
+        if crashing_record.count >= answers:
+            raise Crash()
+
+    crashing_record.count = 0
+    solver.journal.record = crashing_record
+
+
+def test_crashed_solve_resumes_from_the_journal(simulator, solver_config, tmp_path):
+    cfg = solver_config(simulator.url, strategy="triangulation", score_journal_path=str(tmp_path / "scores.sqlite3"))
+    clean = CemantixSolver(solver_config(simulator.url, strategy="triangulation"), notify=False)
+    assert clean.solve(day=1) == ("mot250", 1.0)
+    requested = record_requests(simulator)
+
+    crashed = CemantixSolver(cfg, notify=False)
+    crash_after(crashed, 5)
+    with pytest.raises(Crash):
+        crashed.solve(day=1)
+    journaled = [word for word, _ in crashed.journal.replay(1, "triangulation")]
+    assert len(journaled) == 5
+    sent_before_crash = len(requested)
+
+    resumed = CemantixSolver(cfg, notify=False)
+    assert resumed.solve(day=1) == ("mot250", 1.0)
+
+    # No journaled word is requested again, and the replayed answers count as requests of the puzzle
+    assert not set(journaled) & set(requested[sent_before_crash:])
+    assert resumed.replayed_count == 5
+    assert resumed.request_count == len(requested) - sent_before_crash + 5
+    assert resumed.request_count == clean.request_count
+
+
+def test_other_strategy_does_not_replay_the_journal(simulator, solver_config, tmp_path):
+    journal_path = str(tmp_path / "scores.sqlite3")
+    beam = CemantixSolver(solver_config(simulator.url, strategy="beam", score_journal_path=journal_path), notify=False)
+    assert beam.solve(day=1) == ("mot250", 1.0)
+    clean = CemantixSolver(solver_config(simulator.url, strategy="triangulation"), notify=False)
+    assert clean.solve(day=1) == ("mot250", 1.0)
+
+    triangulation = CemantixSolver(solver_config(simulator.url, strategy="triangulation",
+                                                 score_journal_path=journal_path), notify=False)
+
+    assert triangulation.solve(day=1) == ("mot250", 1.0)
+    assert triangulation.replayed_count == 0
+    assert triangulation.request_count == clean.request_count
+    assert triangulation.last_stats["requests_count"] == clean.request_count
+
+
+def test_journal_of_an_older_version_is_given_to_the_beam_strategy(tmp_path):
+    path = str(tmp_path / "scores.sqlite3")
+    connection = sqlite3.connect(path)
+    connection.execute("""
+        CREATE TABLE scores (puzzle_number INTEGER NOT NULL, word TEXT NOT NULL, score REAL,
+                             invalid INTEGER NOT NULL DEFAULT 0, timestamp TEXT NOT NULL,
+                             PRIMARY KEY (puzzle_number, word))
+    """)
+    connection.executemany("INSERT INTO scores VALUES (?, ?, ?, ?, ?)",
+                           [(1, "mot2", 0.3, 0, "t"), (1, "mot1", None, 1, "t"), (2, "mot3", 1.0, 0, "t")])
+    connection.commit()
+    connection.close()
+
+    journal = ScoreJournal(path)
+
+    assert journal.replay(1, "beam") == [("mot2", 0.3), ("mot1", None)]
+    assert journal.replay(1, "pruning") == []
+    assert journal.is_solved(2)
+    journal.close()
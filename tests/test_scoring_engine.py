@@ -0,0 +1,123 @@
+##
+# @file test_scoring_engine.py
+# @brief Tests of the scoring engine against a local stand-in of the Cemantix API.
+
+import asyncio
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+from conftest import ROOT
+from src.cemantixClient import CemantixClient
+from src.configLoader import load_config
+from src.scoringEngine import ScoringEngine
+
+
+class StandInServer:
+    """
+    Score API answering every word after ``delay`` seconds, counting the requests in flight.
+    """
+
+    def __init__(self, delay):
+        self.delay = delay
+        self.lock = threading.Lock()
+        self.received = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def do_POST(self):
+                self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                with server.lock:
+                    server.received += 1
+                    server.in_flight += 1
+                    server.max_in_flight = max(server.max_in_flight, server.in_flight)
+                time.sleep(server.delay)
+                with server.lock:
+                    server.in_flight -= 1
+                body = json.dumps({"s": 0.5}).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f"{host}:{port}"
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def server():
+    server = StandInServer(delay=0.05)
+    yield server
+    server.stop()
+
+
+def make_engine(server, rate, burst):
+    cfg = load_config(os.path.join(ROOT, "src", "resources", "config.ini"))
+    cfg.update(schema="http", url=server.url, max_retries=1, http_pool_size=8)
+    client = CemantixClient(cfg)
+    return ScoringEngine(lambda word: client.get_score(word, 1)["s"], rate, burst)
+
+
+def score_words(engine, words, stop_after=None):
+    results = []
+
+    def on_result(word, score):
+        results.append((word, score))
+        return stop_after is not None and len(results) >= stop_after
+
+    stopped = asyncio.run(engine.score_batch(words, on_result))
+    return results, stopped
+
+
+def test_burst_caps_requests_in_flight(server):
+    engine = make_engine(server, rate=0, burst=3)
+
+    results, stopped = score_words(engine, [f"mot{i}" for i in range(12)])
+
+    assert not stopped
+    assert len(results) == 12
+    assert server.max_in_flight == 3
+    assert engine.request_count == server.received == 12
+
+
+def test_rate_limits_requests_per_second(server):
+    engine = make_engine(server, rate=20, burst=1)
+
+    start = time.monotonic()
+    score_words(engine, [f"mot{i}" for i in range(6)])
+
+    # The first token is available at once, then one every 1/20 s
+    assert time.monotonic() - start >= 5 / 20
+    assert server.received == 6
+
+
+def test_cancelled_requests_are_not_counted(server):
+    engine = make_engine(server, rate=0, burst=2)
+
+    results, stopped = score_words(engine, [f"mot{i}" for i in range(20)], stop_after=1)
+
+    assert stopped
+    assert len(results) == 1
+    # Requests already sent when the batch stops are counted, the cancelled ones are not. Each of the
+    # 2 first answers frees a slot, which may be taken before the stop is seen
+    time.sleep(2 * server.delay)
+    assert engine.request_count == server.received
+    assert engine.request_count <= 4
@@ -0,0 +1,111 @@
+##
+# @file test_search_failures.py
+# @brief Tests of the solver when the API stops answering during a solve.
+
+import pytest
+from src.cemantixSimulator import CemantixSimulator
+from src.CemantixSolver import CemantixSolver, MAX_FAILED_ROUNDS, MAX_GUESS_FAILURES
+
+
+def fail_after(simulator, count):
+    """
+    Make every answer of the simulator a server error after ``count`` scored guesses.
+    """
+    score = simulator.score
+    calls = [0]
+
+    def failing_score(word, puzzle_number):
+        calls[0] += 1
+        if calls[0] > count:
+            simulator.error_rate = 1.0
+        return score(word, puzzle_number)
+
+    simulator.score = failing_score
+    return calls
+
+
+@pytest.fixture
+def simulator(model):
+    simulator = CemantixSimulator(model, ["mot250"], first_puzzle=1, seed=0).start()
+    yield simulator
+    simulator.stop()
+
+
+def test_pruning_stops_when_the_api_fails_after_the_start_words(simulator, solver_config):
+    calls = fail_after(simulator, 3)
+    solver = CemantixSolver(solver_config(simulator.url, strategy="pruning"), notify=False)
+
+    best_word, best_score = solver.solve(day=1)
+
+    assert best_word in ("mot1", "mot2", "mot3")
+    assert best_score < 1.0
+    # One guess per round: the search stops after MAX_FAILED_ROUNDS rounds without answer
+    assert calls[0] == 3 + MAX_FAILED_ROUNDS
+    assert solver.request_count == calls[0]
+
+
+def fail_first_guess(simulator, times):
+    """
+    Make the answers to the first guess after the start words server errors, ``times`` times.
+    """
+    requested = []
+    score = simulator.score
+
+    def flaky_score(word, puzzle_number):
+        requested.append(word)
+        guesses = [w for w in requested if w not in ("mot1", "mot2", "mot3")]
+        simulator.error_rate = 1.0 if guesses and word == guesses[0] and guesses.count(word) <= times else 0.0
+        return score(word, puzzle_number)
+
+    simulator.score = flaky_score
+    return requested
+
+
+def test_failed_guess_is_guessed_again(simulator, solver_config):
+    requested = fail_first_guess(simulator, MAX_GUESS_FAILURES - 1)
+    solver = CemantixSolver(solver_config(simulator.url, strategy="pruning"), notify=False)
+
+    assert solver.solve(day=1) == ("mot250", 1.0)
+    assert requested.count(requested[3]) == MAX_GUESS_FAILURES
+
+
+def test_failing_guess_is_given_up(simulator, solver_config):
+    requested = fail_first_guess(simulator, len(simulator.model.index_to_key))
+    solver = CemantixSolver(solver_config(simulator.url, strategy="pruning"), notify=False)
+
+    best_word, best_score = solver.solve(day=1)
+
+    assert best_score < 1.0
+    assert requested.count(requested[3]) == MAX_GUESS_FAILURES
+    assert len(requested) == len(set(requested)) + MAX_GUESS_FAILURES - 1
+
+
+def drop_network_after(simulator, count):
+    """
+    Close the connections without answering after ``count`` scored guesses.
+    """
+    score = simulator.score
+    calls = [0]
+
+    def dropping_score(word, puzzle_number):
+        calls[0] += 1
+        if calls[0] > count:
+            raise ConnectionResetError("simulated network drop")
+        return score(word, puzzle_number)
+
+    simulator.score = dropping_score
+    return calls
+
+
+# Number of guesses answered before the failures, less than each strategy needs to find mot250
+@pytest.mark.parametrize("strategy, answered", [("pruning", 3), ("triangulation", 7)])
+@pytest.mark.parametrize("inject", [fail_after, drop_network_after])
+def test_search_stops_when_the_api_fails_partway(simulator, solver_config, strategy, answered, inject):
+    inject(simulator, answered)
+    solver = CemantixSolver(solver_config(simulator.url, strategy=strategy), notify=False)
+
+    best_word, best_score = solver.solve(day=1)
+
+    assert best_score < 1.0
+    # One guess per round: the first failing guess is sent twice, then the next one fails too
+    assert solver.request_count == answered + MAX_FAILED_ROUNDS
@@ -0,0 +1,163 @@
+##
+# @file test_search_strategies.py
+# @brief Tests of the neighbour prefetching and of the hot tier of the beam search.
+
+import time
+import numpy as np
+import pytest
+from src.searchStrategies import BeamSearchStrategy
+from src.vectorIndex import VectorIndex
+
+# Computation time of the neighbours of one word
+DELAY = 0.05
+
+
+class SlowIndex(VectorIndex):
+    """
+    Index whose neighbour computations take DELAY seconds per word.
+    """
+
+    def nearest_batch(self, indices, topn, limit=None):
+        time.sleep(DELAY * len(indices))
+        return super().nearest_batch(indices, topn, limit)
+
+
+def make_beam(index, **config):
+    config = dict(dict(beam_size=4, topn=10, prefetch_workers=0, hot_vocabulary_size=0, hot_patience=3), **config)
+    return BeamSearchStrategy(index, config, np.zeros(len(index), dtype=bool))
+
+
+def observe_start_words(strategy, scores):
+    for idx, score in scores.items():
+        strategy.observe(idx, score)
+
+
+START_SCORES = {1: 0.2, 2: 0.4, 3: 0.1, 4: 0.3}
+
+
+def test_prefetched_neighbours_are_hidden_behind_the_api_wait(model):
+    reference = make_beam(SlowIndex(model))
+    observe_start_words(reference, START_SCORES)
+    expected = reference.next_guesses()
+    reference.close()
+
+    strategy = make_beam(SlowIndex(model), prefetch_workers=2)
+    observe_start_words(strategy, START_SCORES)
+    # The API answers of the next guesses take longer than the speculative computations
+    time.sleep(4 * DELAY)
+    guesses = strategy.next_guesses()
+    metrics = strategy.metrics()
+    strategy.close()
+
+    np.testing.assert_array_equal(guesses, expected)
+    assert metrics["neighbors_hidden_time"] >= 0.9 * 4 * DELAY
+    assert metrics["neighbors_wait_time"] < DELAY / 2
+    assert metrics["neighbors_blocking_time"] == 0.0
+    assert metrics["neighbors_wasted"] == 0
+
+
+def test_unfinished_prefetch_is_waited_for_and_not_counted_as_hidden(model):
+    strategy = make_beam(SlowIndex(model), prefetch_workers=1)
+    observe_start_words(strategy, START_SCORES)
+    # No API wait: the 4 computations run one after the other on the only worker, in the order they
+    # were scored (1, 2, 3, 4) while they are consumed in the beam order (2, 4, 1, 3)
+    strategy.next_guesses()
+    metrics = strategy.metrics()
+    strategy.close()
+
+    # Waiting for the neighbours of 2 then of 4, which only finish after those of 1 and 3
+    assert 0.9 * 4 * DELAY <= metrics["neighbors_wait_time"] < 6 * DELAY
+    assert 0.9 * 2 * DELAY <= metrics["neighbors_hidden_time"] <= 2 * DELAY + DELAY / 2
+    assert metrics["neighbors_blocking_time"] == 0.0
+
+
+def test_neighbours_are_computed_on_the_critical_path_without_prefetch(model):
+    strategy = make_beam(SlowIndex(model))
+    observe_start_words(strategy, START_SCORES)
+    time.sleep(4 * DELAY)
+    strategy.next_guesses()
+    metrics = strategy.metrics()
+    strategy.close()
+
+    assert metrics["neighbors_hidden_time"] == 0.0
+    assert metrics["neighbors_wait_time"] == 0.0
+    assert metrics["neighbors_blocking_time"] >= 0.9 * 4 * DELAY
+
+
+def test_prefetch_of_a_word_pushed_out_of_the_beam_is_wasted(model):
+    strategy = make_beam(SlowIndex(model), beam_size=1, prefetch_workers=2)
+    # Both words are in the beam when they are scored, only the best one is expanded
+    strategy.observe(1, 0.1)
+    strategy.observe(2, 0.5)
+    time.sleep(2 * DELAY)
+    strategy.next_guesses()
+    metrics = strategy.metrics()
+    strategy.close()
+
+    assert metrics["neighbors_wasted"] == 1
+    assert metrics["neighbors_hidden_time"] >= 0.9 * DELAY
+
+
+def play_round(strategy, score):
+    """
+    Guess the next words, scored by ``score``.
+
+    :returns: The guesses of the round.
+    """
+    guesses = strategy.next_guesses()
+    for idx in guesses.tolist():
+        strategy.observe(idx, score(idx))
+    return guesses
+
+
+@pytest.mark.parametrize("patience", [1, 3])
+def test_hot_tier_escalates_after_hot_patience_rounds_without_improvement(model, patience):
+    strategy = make_beam(VectorIndex(model), beam_size=2, topn=5, hot_vocabulary_size=100, hot_patience=patience)
+    observe_start_words(strategy, START_SCORES)
+
+    # The start words hold the best score: no round improves it
+    for _ in range(patience):
+        assert (play_round(strategy, lambda idx: 0.0) < 100).all()
+        assert strategy.metrics()["hot_tier_escalation_round"] is None
+    guesses = play_round(strategy, lambda idx: 0.0)
+    strategy.close()
+
+    assert strategy.metrics()["hot_tier_escalation_round"] == patience
+    assert (guesses >= 100).any()
+
+
+def test_improving_rounds_keep_the_search_in_the_hot_tier(model):
+    strategy = make_beam(VectorIndex(model), beam_size=2, topn=5, hot_vocabulary_size=100, hot_patience=2)
+    observe_start_words(strategy, START_SCORES)
+    best = [0.4]
+
+    def improving(idx):
+        best[0] += 0.01
+        return best[0]
+
+    for _ in range(6):
+        assert (play_round(strategy, improving) < 100).all()
+    assert strategy.metrics()["hot_tier_escalation_round"] is None
+
+    # Improvements reset the count of rounds without improvement: 2 more rounds are needed
+    for _ in range(2):
+        play_round(strategy, lambda idx: 0.0)
+        assert strategy.metrics()["hot_tier_escalation_round"] is None
+    play_round(strategy, lambda idx: 0.0)
+    strategy.close()
+    assert strategy.metrics()["hot_tier_escalation_round"] == 8
+
+
+def test_hot_tier_without_new_candidates_escalates_at_once(model):
+    index = VectorIndex(model)
+    excluded = np.zeros(len(index), dtype=bool)
+    excluded[:100] = True
+    config = dict(beam_size=4, topn=10, prefetch_workers=0, hot_vocabulary_size=100, hot_patience=3)
+    strategy = BeamSearchStrategy(index, config, excluded)
+    observe_start_words(strategy, START_SCORES)
+
+    guesses = strategy.next_guesses()
+    strategy.close()
+
+    assert len(guesses) and (guesses >= 100).all()
+    assert strategy.metrics()["hot_tier_escalation_round"] == 1
@@ -0,0 +1,173 @@
+##
+# @file test_solver_daemon.py
+# @brief Tests of the solver daemon and of the client asking it to solve.
+
+import socket
+import threading
+import time
+from datetime import date, datetime, time as day_time, timedelta
+import pytest
+import requests
+from src.cemantixSimulator import CemantixSimulator
+from src.solverDaemon import SolverDaemon, request_solve
+
+
+@pytest.fixture
+def simulator(model):
+    simulator = CemantixSimulator(model, ["mot250", "mot120"], first_puzzle=1, seed=0).start()
+    yield simulator
+    simulator.stop()
+
+
+@pytest.fixture
+def daemon_config(simulator, solver_config, tmp_path):
+    """
+    Configuration of a daemon listening on a free port, journaling its solves.
+    """
+    return solver_config(simulator.url, strategy="pruning", serve_host="127.0.0.1", serve_port=0,
+                         serve_poll_interval=0.05, score_journal_path=str(tmp_path / "journal.sqlite3"))
+
+
+def served(daemon):
+    """
+    Point the configuration of the daemon to the port it listens on.
+
+    :returns: The configuration of the clients of the daemon.
+    """
+    return dict(daemon.config, serve_port=daemon.server.server_address[1])
+
+
+def status(cfg):
+    response = requests.get(f"http://{cfg['serve_host']}:{cfg['serve_port']}/status", timeout=5)
+    response.raise_for_status()
+    return response.json()
+
+
+def wait_for(condition, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+@pytest.fixture
+def stuck_daemon():
+    """
+    Stand-in daemon accepting connections and reading requests, but never answering.
+    """
+    server = socket.socket()
+    server.bind(("127.0.0.1", 0))
+    server.listen()
+    connections = []
+    stop = threading.Event()
+
+    def accept():
+        server.settimeout(0.1)
+        while not stop.is_set():
+            try:
+                connection, _ = server.accept()
+            except socket.timeout:
+                continue
+            connection.recv(65536)
+            connections.append(connection)
+
+    thread = threading.Thread(target=accept, daemon=True)
+    thread.start()
+    yield server.getsockname()
+    stop.set()
+    thread.join()
+    for connection in connections:
+        connection.close()
+    server.close()
+
+
+def test_request_solve_times_out_on_a_stuck_daemon(stuck_daemon, solver_config):
+    host, port = stuck_daemon
+    cfg = solver_config("unused", serve_host=host, serve_port=port, serve_solve_timeout=0.5)
+
+    with pytest.raises(requests.Timeout):
+        request_solve(cfg, day=1)
+
+
+@pytest.fixture
+def serving(daemon_config):
+    """
+    Daemon answering requests, without its daily schedule.
+    """
+    daemon = SolverDaemon(daemon_config)
+    thread = threading.Thread(target=daemon.server.serve_forever, daemon=True)
+    thread.start()
+    yield daemon
+    daemon.server.shutdown()
+    daemon.server.server_close()
+
+
+def test_solve_requests_are_answered_with_the_result(serving, simulator):
+    cfg = served(serving)
+    assert status(cfg) == {"solving": False, "last_puzzle": None, "last_result": None, "next_run": None}
+
+    result = request_solve(cfg, day=2)
+    assert result["puzzle_number"] == 2
+    assert (result["word"], result["score"]) == ("mot120", 1.0)
+    assert result["requests_count"] > 0
+    assert status(cfg)["last_result"] == result
+
+    # Without a day, the current puzzle is solved
+    simulator.puzzle_number = 1
+    assert request_solve(cfg)["word"] == "mot250"
+
+
+def test_invalid_requests_are_refused(serving):
+    cfg = served(serving)
+    base = f"http://{cfg['serve_host']}:{cfg['serve_port']}"
+
+    assert requests.post(f"{base}/solve", params={"day": "demain"}, timeout=5).status_code == 400
+    assert requests.post(f"{base}/unknown", timeout=5).status_code == 404
+    assert requests.get(f"{base}/solve", timeout=5).status_code == 404
+    with pytest.raises(requests.HTTPError):
+        request_solve(cfg, day="demain")
+
+
+def test_status_reports_a_solve_in_progress(serving, simulator):
+    cfg = served(serving)
+    release = threading.Event()
+    score = simulator.score
+    simulator.score = lambda word, puzzle_number: release.wait(10) and score(word, puzzle_number)
+    solving = threading.Thread(target=request_solve, args=(cfg, 1))
+    solving.start()
+
+    try:
+        wait_for(lambda: status(cfg)["solving"])
+    finally:
+        release.set()
+        solving.join()
+    assert status(cfg)["solving"] is False
+    assert status(cfg)["last_result"]["word"] == "mot250"
+
+
+def test_new_puzzle_is_solved_once_after_the_schedule(daemon_config, simulator, tmp_path):
+    marker = tmp_path / "post_solve.txt"
+    requested = []
+    score = simulator.score
+    simulator.score = lambda word, puzzle_number: requested.append(puzzle_number) or score(word, puzzle_number)
+    daemon = SolverDaemon(dict(daemon_config, serve_schedule="00:00",
+                               serve_post_solve_command=f"echo solved >> {marker}"))
+    thread = threading.Thread(target=daemon.run)
+    thread.start()
+
+    try:
+        cfg = served(daemon)
+        tomorrow = datetime.combine(date.today() + timedelta(days=1), day_time()).isoformat()
+        wait_for(lambda: status(cfg)["next_run"] == tomorrow)
+        assert daemon.last_puzzle == 1
+        assert daemon.last_result["word"] == "mot250"
+        assert marker.read_text() == "solved\n"
+        count = len(requested)
+
+        # The next puzzle is only polled for on the next day
+        simulator.puzzle_number = 2
+        time.sleep(0.2)
+        assert len(requested) == count and daemon.last_puzzle == 1
+    finally:
+        daemon.stop()
+        thread.join()
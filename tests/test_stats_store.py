@@ -0,0 +1,124 @@
+##
+# @file test_stats_store.py
+# @brief Tests of the SQLite statistics store: legacy CSV import and rolling percentiles.
+
+import math
+import random
+import statistics
+from datetime import date, datetime, timedelta
+import pytest
+from src.statsStore import StatsStore
+
+LEGACY_CSV = """timestamp,puzzle_number,word,score,solving_time,requests_count,api_delay,invalid_word_removed_count
+2025-09-05T18:04:16.227173,1283,détention,1.0,223.42,329,0.5,7
+2025-09-06T03:11:02.837007,1284,aveugle,1.0,660.19,1005,0.5,16
+2025-09-06T09:00:00.000000,1284,aveugle,1.0,12.0,20,0.5,0
+2025-09-07T03:00:00.000000,1285,,,30.5,,0.5,
+"""
+
+
+@pytest.fixture
+def legacy_path(tmp_path):
+    path = tmp_path / "stats.csv"
+    path.write_text(LEGACY_CSV, encoding="utf-8")
+    return str(path)
+
+
+def rows(store):
+    return [dict(row) for row in store.connection.execute("SELECT * FROM stats ORDER BY puzzle_number")]
+
+
+def test_legacy_csv_is_imported_once(tmp_path, legacy_path):
+    path = str(tmp_path / "stats.sqlite3")
+    store = StatsStore(path, legacy_path)
+    imported = rows(store)
+    store.close()
+
+    assert [row["puzzle_number"] for row in imported] == [1283, 1284, 1285]
+    assert imported[0] == {
+        "timestamp": "2025-09-05T18:04:16.227173", "puzzle_number": 1283, "word": "détention", "score": 1.0,
+        "solving_time": 223.42, "requests_count": 329, "api_delay": 0.5, "invalid_word_removed_count": 7,
+        "strategy": "beam", "load_time": None, "puzzle_fetch_time": None, "latency_p50": None,
+        "latency_p95": None, "latency_max": None, "sleep_time": None, "similarity_time": None, "filter_time": None
+    }
+    # The first row of a puzzle is kept, empty values are missing values
+    assert imported[1]["requests_count"] == 1005
+    assert (imported[2]["word"], imported[2]["score"], imported[2]["requests_count"]) == (None, None, None)
+
+    with open(legacy_path, "a", encoding="utf-8") as f:
+        f.write("2025-09-08T03:00:00.000000,1286,chat,1.0,10.0,12,0.5,0\n")
+    store = StatsStore(path, legacy_path)
+    assert rows(store) == imported
+    store.close()
+
+
+def test_csv_written_after_the_strategy_column_keeps_its_strategies(tmp_path):
+    legacy_path = tmp_path / "stats.csv"
+    legacy_path.write_text("timestamp,puzzle_number,word,score,requests_count,strategy\n"
+                           "2025-09-05T18:04:16,1283,détention,1.0,329,pruning\n"
+                           "2025-09-05T19:00:00,1283,détention,1.0,1200,beam\n"
+                           "2025-09-06T03:00:00,1284,aveugle,1.0,15,\n", encoding="utf-8")
+    store = StatsStore(str(tmp_path / "stats.sqlite3"), str(legacy_path))
+
+    assert [(row["puzzle_number"], row["strategy"], row["requests_count"]) for row in rows(store)] == [
+        (1283, "beam", 1200), (1283, "pruning", 329), (1284, "beam", 15)]
+    assert not store.record({"timestamp": "2025-09-07T03:00:00", "puzzle_number": 1283, "strategy": "pruning"})
+    store.close()
+
+
+def reference_percentiles(solves, window_days):
+    """
+    Rolling mean and nearest-rank percentiles computed in Python.
+    """
+    results = []
+    for day in sorted({solve_day for solve_day, _, _ in solves}):
+        start = day - timedelta(days=window_days - 1)
+        for strategy in sorted({strategy for _, strategy, _ in solves}):
+            values = sorted(value for solve_day, solve_strategy, value in solves
+                            if start <= solve_day <= day and solve_strategy == strategy and value is not None)
+            if not values:
+                continue
+            results.append({
+                "day": day.isoformat(), "strategy": strategy, "count": len(values),
+                "mean": statistics.fmean(values),
+                "p50": values[math.ceil(0.5 * len(values)) - 1],
+                "p90": values[math.ceil(0.9 * len(values)) - 1],
+                "max": values[-1]
+            })
+    return results
+
+
+@pytest.mark.parametrize("window_days", [1, 7])
+def test_rolling_percentiles_match_a_reference(tmp_path, window_days):
+    rng = random.Random(0)
+    store = StatsStore(str(tmp_path / "stats.sqlite3"))
+    solves = []
+    first_day = date(2025, 9, 1)
+    for puzzle_number in range(60):
+        # Days without a solve, several solves on some days, and solves without requests count
+        day = first_day + timedelta(days=rng.choice([0, 1, 1, 2, 4]) + puzzle_number // 3)
+        for strategy in ("beam", "pruning"):
+            if rng.random() < 0.2:
+                continue
+            value = None if rng.random() < 0.1 else rng.randint(5, 1500)
+            solves.append((day, strategy, value))
+            store.record({"timestamp": datetime.combine(day, datetime.min.time()).isoformat(),
+                          "puzzle_number": puzzle_number, "strategy": strategy, "requests_count": value})
+
+    rolling = store.rolling_percentiles("requests_count", window_days)
+    store.close()
+
+    expected = reference_percentiles(solves, window_days)
+    assert len(rolling) == len(expected)
+    for row, reference in zip(rolling, expected):
+        assert row == dict(reference, mean=pytest.approx(reference["mean"]))
+
+
+def test_unknown_columns_are_refused(tmp_path):
+    store = StatsStore(str(tmp_path / "stats.sqlite3"))
+
+    with pytest.raises(ValueError):
+        store.rolling_percentiles("requests_count) FROM stats; --")
+    with pytest.raises(ValueError):
+        store.daily_means(["score"], required=["unknown"])
+    store.close()